@@ -0,0 +1,107 @@
+"""
+Per-user agency access context
+Resolves which agency a user owns, the agencies they are an active team
+member of and their role in each, once per request. The resolved memberships
+are cached per user and invalidated by the signals in agencies/signals.py
+"""
+
+from django.core.cache import cache
+
+ACCESS_CONTEXT_KEY = 'agency_access:{}'
+ACCESS_CONTEXT_TIMEOUT = 600
+
+ADMIN_ROLES = ('owner', 'admin')
+
+
+class AccessContext:
+    """Agency roles for one user, resolved from two queries (or the cache)"""
+
+    def __init__(self, user, owned_agency_id=None, memberships=None):
+        self.user = user
+        self.owned_agency_id = owned_agency_id
+        # {agency_id: role} for active team memberships, oldest first
+        self.memberships = memberships or {}
+        self._agency = None
+
+    @property
+    def agency_id(self):
+        """The user's agency: the one they own, else their first membership"""
+        if self.owned_agency_id:
+            return self.owned_agency_id
+        return next(iter(self.memberships), None)
+
+    def get_agency(self):
+        """Agency instance for agency_id, loaded once per context"""
+        if self._agency is None and self.agency_id:
+            from .models import Agency
+            self._agency = Agency.objects.filter(pk=self.agency_id).first()
+        return self._agency
+
+    def role_for(self, agency_id):
+        if agency_id is None:
+            return None
+        if agency_id == self.owned_agency_id:
+            return 'owner'
+        return self.memberships.get(agency_id)
+
+    def has_access(self, agency_id):
+        return self.role_for(agency_id) is not None
+
+    def is_admin(self, agency_id):
+        return self.role_for(agency_id) in ADMIN_ROLES
+
+    def permissions_for(self, agency_id):
+        from .permissions import get_role_permissions
+        return get_role_permissions(self.role_for(agency_id))
+
+    @property
+    def role(self):
+        return self.role_for(self.agency_id)
+
+    @property
+    def permissions(self):
+        return self.permissions_for(self.agency_id)
+
+
+def _load_access_data(user_id):
+    from .models import Agency, AgencyTeamMember
+
+    owned_agency_id = Agency.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+    memberships = dict(
+        AgencyTeamMember.objects.filter(user_id=user_id, is_active=True)
+        .order_by('joined_at', 'id')
+        .values_list('agency_id', 'role')
+    )
+    return {'owned_agency_id': owned_agency_id, 'memberships': memberships}
+
+
+def get_access_context(user):
+    """
+    Access context for a user. Memoized on the user instance (request.user
+    lives for one request) and cached across requests per user id.
+    """
+    context = getattr(user, '_agency_access_context', None)
+    if context is not None:
+        return context
+
+    if not getattr(user, 'is_authenticated', False):
+        context = AccessContext(user)
+    else:
+        key = ACCESS_CONTEXT_KEY.format(user.pk)
+        data = cache.get(key)
+        if data is None:
+            data = _load_access_data(user.pk)
+            cache.set(key, data, ACCESS_CONTEXT_TIMEOUT)
+        context = AccessContext(
+            user,
+            owned_agency_id=data['owned_agency_id'],
+            # JSON-serializing cache backends turn int keys into strings
+            memberships={int(agency_id): role for agency_id, role in data['memberships'].items()},
+        )
+
+    user._agency_access_context = context
+    return context
+
+
+def invalidate_access_context(user_id):
+    cache.delete(ACCESS_CONTEXT_KEY.format(user_id))
@@ -157,7 +157,10 @@ class AgencySubscriptionAdmin(admin.ModelAdmin):
             'fields': ('start_date', 'end_date', 'trial_end_date')
         }),
         (_('Usage Limits'), {
-            'fields': ('max_campaigns', 'max_influencer_searches', 'max_team_members', 'max_reports_per_month')
+            'fields': (
+                'max_campaigns', 'max_influencer_searches', 'max_team_members', 'max_reports_per_month',
+                'max_influencers_per_campaign',
+            )
         }),
         (_('Billing'), {
             'fields': ('monthly_price', 'currency')
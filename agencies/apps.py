@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class AgenciesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'agencies'
-    verbose_name = 'Agencies'
\ No newline at end of file
+    verbose_name = 'Agencies'
+    
+    def ready(self):
+        import agencies.signals
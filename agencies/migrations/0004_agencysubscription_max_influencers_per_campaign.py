@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agencies", "0003_alter_agency_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="agencysubscription",
+            name="max_influencers_per_campaign",
+            field=models.PositiveIntegerField(default=50),
+        ),
+    ]
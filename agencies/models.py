@@ -333,6 +333,7 @@ class AgencySubscription(models.Model):
     max_influencer_searches = models.PositiveIntegerField(default=50)
     max_team_members = models.PositiveIntegerField(default=999)
     max_reports_per_month = models.PositiveIntegerField(default=10)
+    max_influencers_per_campaign = models.PositiveIntegerField(default=50)
     
     # Billing
     monthly_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
@@ -20,34 +20,33 @@ def require_agency_role(allowed_roles):
         @login_required
         def _wrapped_view(request, *args, **kwargs):
             # Import here to avoid circular imports
-            from agencies.models import Agency, AgencyTeamMember
+            from agencies.models import Agency
+            from agencies.access import get_access_context
+            
+            access = get_access_context(request.user)
             
             # Get agency from URL parameter or user
             agency_pk = kwargs.get('pk') 
             if agency_pk:
                 agency = get_object_or_404(Agency, pk=agency_pk)
             else:
-                try:
-                    agency = Agency.objects.get(user=request.user)
-                except Agency.DoesNotExist:
+                if not access.owned_agency_id:
                     messages.error(request, _('No agency found for your account.'))
                     return redirect('accounts:dashboard')
+                agency = access.get_agency()
+            
+            role = access.role_for(agency.pk)
             
             # Check if user is owner
-            if request.user == agency.user:
+            if role == 'owner':
                 request.user_agency_role = 'owner'
                 request.user_agency = agency
                 return view_func(request, *args, **kwargs)
             
             # Check if user is team member with required role
-            try:
-                team_member = AgencyTeamMember.objects.get(
-                    agency=agency, 
-                    user=request.user, 
-                    is_active=True
-                )
-                if team_member.role in allowed_roles:
-                    request.user_agency_role = team_member.role
+            if role is not None:
+                if role in allowed_roles:
+                    request.user_agency_role = role
                     request.user_agency = agency
                     return view_func(request, *args, **kwargs)
                 else:
@@ -55,8 +54,6 @@ def require_agency_role(allowed_roles):
                         f'This action requires {" or ".join(allowed_roles)} role.'
                     ))
                     return redirect('agencies:agency_detail', pk=agency.pk)
-            except AgencyTeamMember.DoesNotExist:
-                pass
             
             messages.error(request, _('You do not have permission to perform this action.'))
             return redirect('agencies:agency_detail', pk=agency.pk)
@@ -83,20 +80,10 @@ def require_active_subscription(view_func):
             messages.error(request, _('No agency found for your account.'))
             return redirect('accounts:dashboard')
         
-        subscription = getattr(agency, 'subscription', None)
-        
-        if not subscription:
-            messages.error(request, _('No subscription found. Please set up your subscription.'))
-            return redirect('agencies:subscription', pk=agency.pk)
-        
         # Check if subscription is active
-        if subscription.status == 'trial':
-            # Check if trial expired
-            if subscription.trial_end_date and subscription.trial_end_date < timezone.now():
-                messages.error(request, _('Your trial has expired. Please upgrade to continue.'))
-                return redirect('agencies:subscription', pk=agency.pk)
-        elif subscription.status != 'active':
-            messages.error(request, _('Your subscription is not active. Please update your payment.'))
+        error = get_subscription_error(agency)
+        if error:
+            messages.error(request, error)
             return redirect('agencies:subscription', pk=agency.pk)
         
         return view_func(request, *args, **kwargs)
@@ -110,8 +97,9 @@ def check_subscription_limits(agency, feature_type, current_count=None):
     
     Args:
         agency: Agency instance
-        feature_type: 'campaigns', 'searches', 'team_members'
-        current_count: Optional current usage count
+        feature_type: 'campaigns', 'searches', 'team_members', 'campaign_influencers'
+        current_count: Optional current usage count (required for
+            'campaign_influencers', which is counted per campaign)
     
     Returns:
         tuple: (can_use: bool, limit: int, current: int)
@@ -125,6 +113,7 @@ def check_subscription_limits(agency, feature_type, current_count=None):
         'campaigns': subscription.max_campaigns,
         'searches': subscription.max_influencer_searches,
         'team_members': subscription.max_team_members,
+        'campaign_influencers': subscription.max_influencers_per_campaign,
     }
     
     limit = limits.get(feature_type, 0)
@@ -139,25 +128,35 @@ def check_subscription_limits(agency, feature_type, current_count=None):
             # You'd need to track search usage
             current_count = 0  # Placeholder
     
+    current_count = current_count or 0
     can_use = current_count < limit if limit > 0 else True
     
     return can_use, limit, current_count
 
 
+def get_subscription_error(agency):
+    """
+    Reason the agency cannot use paid features, or None when its subscription
+    is active (non-expired trial or paid plan)
+    """
+    subscription = getattr(agency, 'subscription', None)
+    
+    if not subscription:
+        return _('No subscription found. Please set up your subscription.')
+    
+    if subscription.status == 'trial':
+        if subscription.trial_end_date and subscription.trial_end_date < timezone.now():
+            return _('Your trial has expired. Please upgrade to continue.')
+    elif subscription.status != 'active':
+        return _('Your subscription is not active. Please update your payment.')
+    
+    return None
+
+
 def get_user_role(user, agency):
     """Get user's role in agency"""
-    if user == agency.user:
-        return 'owner'
-    try:
-        from agencies.models import AgencyTeamMember
-        team_member = AgencyTeamMember.objects.get(
-            agency=agency, 
-            user=user, 
-            is_active=True
-        )
-        return team_member.role
-    except AgencyTeamMember.DoesNotExist:
-        return None
+    from agencies.access import get_access_context
+    return get_access_context(user).role_for(agency.pk)
 
 
 def get_role_permissions(role):
@@ -258,16 +257,20 @@ def enforce_subscription_limit(agency, feature_type):
     can_use, limit, current = check_subscription_limits(agency, feature_type)
     
     if not can_use:
-        feature_names = {
-            'campaigns': _('campaigns'),
-            'team_members': _('team members'),
-            'searches': _('influencer searches'),
-        }
-        
-        feature_name = feature_names.get(feature_type, feature_type)
-        
-        raise SubscriptionLimitReached(
-            _('You have reached your limit of {} {}. Please upgrade your plan.').format(
-                limit, feature_name
-            )
-        )
+        raise SubscriptionLimitReached(subscription_limit_message(feature_type, limit))
+
+
+def subscription_limit_message(feature_type, limit):
+    """Upgrade prompt for a reached subscription limit"""
+    feature_names = {
+        'campaigns': _('campaigns'),
+        'team_members': _('team members'),
+        'searches': _('influencer searches'),
+        'campaign_influencers': _('influencers per campaign'),
+    }
+    
+    feature_name = feature_names.get(feature_type, feature_type)
+    
+    return _('You have reached your limit of {} {}. Please upgrade your plan.').format(
+        limit, feature_name
+    )
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Agency, AgencyTeamMember
+from .access import invalidate_access_context
+
+
+@receiver(post_save, sender=Agency)
+@receiver(post_delete, sender=Agency)
+def invalidate_owner_access(sender, instance, **kwargs):
+    """Drop the owner's cached access context when their agency changes"""
+    if instance.user_id:
+        invalidate_access_context(instance.user_id)
+
+
+@receiver(post_save, sender=AgencyTeamMember)
+@receiver(post_delete, sender=AgencyTeamMember)
+def invalidate_member_access(sender, instance, **kwargs):
+    """Drop a member's cached access context when their membership changes"""
+    invalidate_access_context(instance.user_id)
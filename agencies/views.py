@@ -38,6 +38,7 @@ except ImportError:
     except ImportError:
         Subscription = None
 
+from .access import get_access_context
 from .serializers import (
     AgencySerializer,
     AgencyDetailSerializer,
@@ -101,33 +102,11 @@ def api_current_agency(request):
     GET /api/agencies/me/
     Get the current user's agency
     """
-    # Check if user owns an agency (try both 'user' and 'owner' fields)
-    try:
-        agency = Agency.objects.get(user=request.user)
-        serializer = AgencyDetailSerializer(agency)
-        return Response(serializer.data)
-    except Agency.DoesNotExist:
-        pass
-    except Exception:
-        pass
-    
-    try:
-        agency = Agency.objects.get(owner=request.user)
+    # Owned agency first, then team membership
+    agency = get_access_context(request.user).get_agency()
+    if agency:
         serializer = AgencyDetailSerializer(agency)
         return Response(serializer.data)
-    except Agency.DoesNotExist:
-        pass
-    except Exception:
-        pass
-    
-    # Check if user is a team member
-    if TeamMember:
-        try:
-            team_member = TeamMember.objects.get(user=request.user, is_active=True)
-            serializer = AgencyDetailSerializer(team_member.agency)
-            return Response(serializer.data)
-        except Exception:
-            pass
     
     return Response(
         {'error': 'No agency found for this user'},
@@ -142,8 +121,8 @@ def api_create_agency(request):
     POST /api/agencies/create/
     Create a new agency
     """
-    # Check if user already has an agency (try both 'user' and 'owner' fields)
-    if Agency.objects.filter(user=request.user).exists() or Agency.objects.filter(owner=request.user).exists():
+    # Check if user already has an agency
+    if get_access_context(request.user).owned_agency_id:
         return Response(
             {'error': 'You already have an agency'},
             status=status.HTTP_400_BAD_REQUEST
@@ -183,28 +162,12 @@ def api_update_agency(request, pk):
     """
     agency = get_object_or_404(Agency, pk=pk)
     
-    # Check permission - try both 'user' and 'owner' fields
-    is_owner = False
-    if hasattr(agency, 'user') and agency.user == request.user:
-        is_owner = True
-    elif hasattr(agency, 'owner') and agency.owner == request.user:
-        is_owner = True
-    
-    if not is_owner:
-        # Check if user is admin team member
-        is_admin = False
-        if TeamMember:
-            is_admin = TeamMember.objects.filter(
-                agency=agency, 
-                user=request.user, 
-                role='admin',
-                is_active=True
-            ).exists()
-        if not is_admin:
-            return Response(
-                {'error': 'Permission denied'},
-                status=status.HTTP_403_FORBIDDEN
-            )
+    # Check permission (only owner or admin)
+    if not _is_agency_admin(request.user, agency):
+        return Response(
+            {'error': 'Permission denied'},
+            status=status.HTTP_403_FORBIDDEN
+        )
     
     serializer = AgencyCreateUpdateSerializer(
         agency, 
@@ -343,7 +306,7 @@ def api_remove_team_member(request, pk, member_pk):
         )
     
     # Can't remove the owner
-    if member.user == agency.owner:
+    if member.user_id == agency.user_id:
         return Response(
             {'error': 'Cannot remove agency owner'},
             status=status.HTTP_400_BAD_REQUEST
@@ -576,7 +539,7 @@ def api_update_subscription(request, pk):
     """
     agency = get_object_or_404(Agency, pk=pk)
     
-    if agency.owner != request.user:
+    if get_access_context(request.user).role_for(agency.id) != 'owner':
         return Response(
             {'error': 'Only agency owner can manage subscription'},
             status=status.HTTP_403_FORBIDDEN
@@ -605,22 +568,9 @@ def api_update_subscription(request, pk):
 
 def _has_agency_access(user, agency):
     """Check if user has any access to agency"""
-    if agency.owner == user:
-        return True
-    return TeamMember.objects.filter(
-        agency=agency,
-        user=user,
-        is_active=True
-    ).exists()
+    return get_access_context(user).has_access(agency.id)
 
 
 def _is_agency_admin(user, agency):
     """Check if user is owner or admin of agency"""
-    if agency.owner == user:
-        return True
-    return TeamMember.objects.filter(
-        agency=agency,
-        user=user,
-        role__in=['admin', 'owner'],
-        is_active=True
-    ).exists()
+    return get_access_context(user).is_admin(agency.id)
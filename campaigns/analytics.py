@@ -0,0 +1,311 @@
+"""
+Campaign analytics engine
+Full recomputes aggregate in the database (one grouped query per metric
+source, any number of campaigns); single content updates apply F() deltas
+to the stored totals instead of re-reading every content row
+"""
+
+import logging
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Campaign, CampaignAnalytics, CampaignContent, InfluencerCollaboration
+
+logger = logging.getLogger(__name__)
+
+# CampaignContent metric -> CampaignAnalytics total it feeds
+CONTENT_METRIC_FIELDS = {
+    'likes_count': 'total_likes',
+    'comments_count': 'total_comments',
+    'shares_count': 'total_shares',
+    'views_count': 'total_reach',
+}
+
+# Estimated media value of one engagement (likes + comments + shares)
+ENGAGEMENT_VALUE = Decimal('0.50')
+
+SCORE_FIELDS = [
+    'performance_score', 'engagement_score', 'reach_score', 'roi_score', 'completion_score',
+]
+
+DERIVED_FIELDS = [
+    'total_impressions', 'avg_engagement_rate', 'cost_per_engagement',
+    'estimated_value', 'roi_percentage',
+] + SCORE_FIELDS
+
+TOTAL_FIELDS = list(CONTENT_METRIC_FIELDS.values()) + ['total_spent']
+
+
+def apply_derived_metrics(analytics):
+    """Recompute ratio/ROI fields from the stored totals (in memory, no save)"""
+    total_engagement = analytics.total_likes + analytics.total_comments + analytics.total_shares
+    total_spent = Decimal(analytics.total_spent or 0)
+
+    analytics.total_impressions = analytics.total_reach  # Simplified
+    analytics.avg_engagement_rate = (
+        (total_engagement / analytics.total_reach) * 100 if analytics.total_reach > 0 else 0.0
+    )
+    analytics.cost_per_engagement = (
+        (total_spent / total_engagement).quantize(Decimal('0.01'))
+        if total_engagement > 0 else Decimal('0.00')
+    )
+    analytics.estimated_value = total_engagement * ENGAGEMENT_VALUE
+    analytics.roi_percentage = (
+        float(((analytics.estimated_value - total_spent) / total_spent) * 100)
+        if total_spent > 0 else 0.0
+    )
+    apply_performance_score(analytics)
+    return analytics
+
+
+def _tier_points(value, tiers):
+    """Points for the first (threshold, points) tier the value reaches"""
+    for threshold, points in tiers:
+        if value >= threshold:
+            return points
+    return 0
+
+
+def apply_performance_score(analytics, collaborations=None, completed=None):
+    """
+    Score components (engagement 40, reach 25, ROI 25, completion 10) and
+    their total. Completion only changes with collaboration counts, so the
+    stored component is kept when no counts are passed.
+    """
+    analytics.engagement_score = _tier_points(
+        analytics.avg_engagement_rate, [(5.0, 40), (3.0, 32), (1.5, 24)]
+    )
+    analytics.reach_score = _tier_points(
+        analytics.total_reach, [(100000, 25), (50000, 20), (10000, 15)]
+    )
+    analytics.roi_score = _tier_points(
+        analytics.roi_percentage, [(100, 25), (50, 20), (0, 15)]
+    )
+    if collaborations is not None:
+        completion_rate = (completed / collaborations) * 100 if collaborations else 0
+        analytics.completion_score = _tier_points(completion_rate, [(90, 10), (75, 8)])
+
+    analytics.performance_score = min(
+        analytics.engagement_score + analytics.reach_score
+        + analytics.roi_score + analytics.completion_score,
+        100,
+    )
+    return analytics
+
+
+def _content_totals(campaign_ids):
+    rows = CampaignContent.objects.filter(
+        collaboration__campaign_id__in=campaign_ids
+    ).order_by().values('collaboration__campaign_id').annotate(**{
+        total: Coalesce(Sum(field), 0) for field, total in CONTENT_METRIC_FIELDS.items()
+    })
+    return {row.pop('collaboration__campaign_id'): row for row in rows}
+
+
+def _collaboration_totals(campaign_ids):
+    completed = Q(status='completed')
+    rows = InfluencerCollaboration.objects.filter(
+        campaign_id__in=campaign_ids
+    ).order_by().values('campaign_id').annotate(
+        spent=Sum('agreed_rate', filter=completed),
+        collaborations=Count('id'),
+        completed=Count('id', filter=completed),
+    )
+    return {row.pop('campaign_id'): row for row in rows}
+
+
+def recompute_campaigns_analytics(campaign_ids):
+    """
+    Full recompute for several campaigns with two grouped queries
+    (content metrics; collaboration spend and completion),
+    written back with bulk_create/bulk_update. Returns {campaign_id: analytics}.
+    """
+    campaign_ids = list(set(campaign_ids))
+    if not campaign_ids:
+        return {}
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        stored_ids = set(CampaignAnalytics.objects.filter(
+            campaign_id__in=campaign_ids
+        ).values_list('campaign_id', flat=True))
+        missing = [campaign_id for campaign_id in campaign_ids if campaign_id not in stored_ids]
+        if missing:
+            CampaignAnalytics.objects.bulk_create(
+                [CampaignAnalytics(campaign_id=campaign_id) for campaign_id in missing],
+                ignore_conflicts=True,
+            )
+        # Lock the rows before aggregating so concurrent F() deltas are not lost
+        rows = {
+            analytics.campaign_id: analytics
+            for analytics in CampaignAnalytics.objects.select_for_update().filter(
+                campaign_id__in=campaign_ids
+            ).order_by('campaign_id')
+        }
+        content_totals = _content_totals(campaign_ids)
+        collaboration_totals = _collaboration_totals(campaign_ids)
+
+        for campaign_id, analytics in rows.items():
+            totals = content_totals.get(campaign_id, {})
+            for total in CONTENT_METRIC_FIELDS.values():
+                setattr(analytics, total, totals.get(total, 0))
+            collaborations = collaboration_totals.get(campaign_id, {})
+            analytics.total_spent = collaborations.get('spent') or Decimal('0.00')
+            apply_derived_metrics(analytics)
+            apply_performance_score(
+                analytics,
+                collaborations=collaborations.get('collaborations', 0),
+                completed=collaborations.get('completed', 0),
+            )
+            # bulk_update skips auto_now
+            analytics.last_calculated = now
+
+        CampaignAnalytics.objects.bulk_update(
+            list(rows.values()), TOTAL_FIELDS + DERIVED_FIELDS + ['last_calculated']
+        )
+
+    record_analytics_points(rows.values(), now)
+    return rows
+
+
+def record_analytics_points(analytics_rows, timestamp=None):
+    """
+    Add recomputed totals to each campaign's metric time series. A failure
+    is logged and never fails the recompute that called it.
+    """
+    from reports.timeseries import record_points
+
+    analytics_rows = list(analytics_rows)
+    try:
+        agencies = dict(Campaign.objects.filter(
+            id__in=[analytics.campaign_id for analytics in analytics_rows]
+        ).values_list('id', 'agency_id'))
+        # Savepoint: a failed insert must not break a caller's transaction
+        with transaction.atomic():
+            return record_points('campaign', [
+                (
+                    agencies[analytics.campaign_id],
+                    analytics.campaign_id,
+                    {field: float(getattr(analytics, field) or 0) for field in TOTAL_FIELDS + DERIVED_FIELDS},
+                )
+                for analytics in analytics_rows if analytics.campaign_id in agencies
+            ], timestamp)
+    except Exception as e:
+        logger.error(f"Failed to record campaign analytics points: {str(e)}")
+        return 0
+
+
+def recompute_campaign_analytics(campaign):
+    """Full recompute for one campaign"""
+    campaign_id = getattr(campaign, 'pk', campaign)
+    return recompute_campaigns_analytics([campaign_id])[campaign_id]
+
+
+def get_campaign_analytics(campaign):
+    """
+    Read the stored analytics row. Only a campaign that has never been
+    computed gets a one-off full recompute to initialise its row.
+    """
+    campaign_id = getattr(campaign, 'pk', campaign)
+    analytics = CampaignAnalytics.objects.filter(campaign_id=campaign_id).first()
+    if analytics is None:
+        analytics = recompute_campaign_analytics(campaign_id)
+    return analytics
+
+
+def snapshot_content_metrics(content):
+    """Current metric values of a content item, to diff against after an update"""
+    return {field: getattr(content, field) or 0 for field in CONTENT_METRIC_FIELDS}
+
+
+def content_metric_deltas(before, content):
+    """Non-zero metric changes between a snapshot and the content's current values"""
+    deltas = {}
+    for field in CONTENT_METRIC_FIELDS:
+        delta = (getattr(content, field) or 0) - before.get(field, 0)
+        if delta:
+            deltas[field] = delta
+    return deltas
+
+
+def apply_content_metric_deltas(campaign_id, deltas):
+    """
+    Add per-content metric changes to the campaign totals with F() expressions.
+    The UPDATE locks the row, so derived fields are refreshed from the new
+    totals in the same transaction without racing concurrent deltas.
+    """
+    if not deltas:
+        return None
+
+    with transaction.atomic():
+        updated = CampaignAnalytics.objects.filter(campaign_id=campaign_id).update(**{
+            CONTENT_METRIC_FIELDS[field]: F(CONTENT_METRIC_FIELDS[field]) + Value(delta)
+            for field, delta in deltas.items()
+        })
+        if not updated:
+            # No stored totals to adjust yet
+            return recompute_campaign_analytics(campaign_id)
+
+        analytics = CampaignAnalytics.objects.get(campaign_id=campaign_id)
+        apply_derived_metrics(analytics)
+        analytics.save(update_fields=DERIVED_FIELDS + ['last_calculated'])
+    return analytics
+
+
+# ===========================================
+# DEBOUNCED RECOMPUTE
+# ===========================================
+
+DIRTY_KEY = 'campaign_analytics:dirty:{}'
+LOCK_KEY = 'campaign_analytics:lock:{}'
+LOCK_TIMEOUT = 300
+
+
+def _recompute_window():
+    return getattr(settings, 'CAMPAIGN_ANALYTICS_RECOMPUTE_WINDOW', 60)
+
+
+def mark_campaign_dirty(campaign_id):
+    """
+    Flag a campaign for a full recompute. The first mark in a window schedules
+    the Celery task; later marks in the same window are absorbed by the flag.
+    """
+    window = _recompute_window()
+    if not cache.add(DIRTY_KEY.format(campaign_id), True, timeout=window + LOCK_TIMEOUT):
+        return False
+
+    from .tasks import recompute_dirty_campaign_analytics
+    try:
+        recompute_dirty_campaign_analytics.apply_async(args=[campaign_id], countdown=window)
+    except Exception as e:
+        # Let the next change try to schedule again
+        cache.delete(DIRTY_KEY.format(campaign_id))
+        logger.error(f"Could not schedule analytics recompute for campaign {campaign_id}: {str(e)}")
+        return False
+    return True
+
+
+def recompute_if_dirty(campaign_id):
+    """
+    Run a scheduled recompute under a per-campaign lock. Returns True if the
+    campaign was recomputed, False if another worker held the lock.
+    """
+    # Changes from here on schedule a new run
+    cache.delete(DIRTY_KEY.format(campaign_id))
+
+    lock_key = LOCK_KEY.format(campaign_id)
+    if not cache.add(lock_key, True, timeout=LOCK_TIMEOUT):
+        mark_campaign_dirty(campaign_id)
+        return False
+    try:
+        recompute_campaigns_analytics([campaign_id])
+    finally:
+        cache.delete(lock_key)
+    return True
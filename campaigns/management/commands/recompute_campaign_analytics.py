@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from campaigns.analytics import recompute_campaigns_analytics
+from campaigns.models import Campaign
+
+
+class Command(BaseCommand):
+    help = 'Fully recompute stored CampaignAnalytics (totals, ratios and performance score)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ids',
+            type=str,
+            default='',
+            help='Comma-separated campaign IDs (default: all campaigns)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Campaigns per batch (default: 500)'
+        )
+    
+    def handle(self, *args, **options):
+        if options['ids']:
+            campaign_ids = [int(value) for value in options['ids'].split(',') if value.strip()]
+        else:
+            campaign_ids = list(Campaign.objects.order_by('id').values_list('id', flat=True))
+        
+        batch_size = max(options['batch_size'], 1)
+        for start in range(0, len(campaign_ids), batch_size):
+            recompute_campaigns_analytics(campaign_ids[start:start + batch_size])
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Recomputed analytics for {len(campaign_ids)} campaigns')
+        )
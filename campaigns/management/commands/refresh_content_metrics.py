@@ -0,0 +1,68 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+from campaigns.metrics_refresh import JsonMetricsFetcher, refresh_published_metrics
+
+
+class Command(BaseCommand):
+    help = 'Fetch current metrics for published content and refresh campaign analytics'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ids',
+            type=str,
+            default='',
+            help='Comma-separated content IDs (default: all published content)'
+        )
+        parser.add_argument(
+            '--endpoint',
+            type=str,
+            default=None,
+            help="Metrics endpoint http(s) template with '{url}' (default: CONTENT_METRICS_ENDPOINT)"
+        )
+        parser.add_argument(
+            '--fetcher',
+            type=str,
+            default=None,
+            help='Dotted path of a fetcher class (default: CONTENT_METRICS_FETCHER)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Concurrent fetches (default: CONTENT_METRICS_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--domain-interval',
+            type=float,
+            default=None,
+            help='Minimum seconds between requests to one host (default: CONTENT_METRICS_DOMAIN_INTERVAL)'
+        )
+    
+    def handle(self, *args, **options):
+        content_ids = None
+        if options['ids']:
+            content_ids = [int(value) for value in options['ids'].split(',') if value.strip()]
+        
+        try:
+            fetcher = None
+            if options['fetcher']:
+                fetcher = import_string(options['fetcher'])()
+            elif options['endpoint'] is not None:
+                fetcher = JsonMetricsFetcher(endpoint=options['endpoint'])
+            
+            summary = refresh_published_metrics(
+                content_ids,
+                fetcher=fetcher,
+                concurrency=options['concurrency'],
+                domain_interval=options['domain_interval'],
+            )
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Fetched {summary['fetched']}/{summary['posts']} posts "
+                f"({summary['failed']} failed), updated {summary['campaigns']} campaigns"
+            )
+        )
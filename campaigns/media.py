@@ -0,0 +1,149 @@
+"""
+Derived media for campaign content
+Image thumbnails, video poster frames and web renditions, so review screens
+load small files instead of creators' originals. Video work shells out to
+ffmpeg; images use Pillow
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+
+THUMBNAIL_SIZE = (480, 480)
+POSTER_WIDTH = 960
+RENDITION_MAX_HEIGHT = 720
+FFMPEG_TIMEOUT = 30 * 60
+DERIVED_FIELDS = ('image_thumbnail', 'video_poster', 'video_web')
+
+logger = logging.getLogger(__name__)
+
+
+class MediaProcessingError(Exception):
+    """Raised when a derived file cannot be produced"""
+    pass
+
+
+def _ffmpeg():
+    binary = shutil.which(getattr(settings, 'FFMPEG_BINARY', 'ffmpeg'))
+    if not binary:
+        raise MediaProcessingError('ffmpeg is not installed')
+    return binary
+
+
+@contextmanager
+def local_path(field_file):
+    """
+    Filesystem path for a stored file. Remote storages are copied to a
+    temporary file chunk by chunk, since ffmpeg needs a seekable input.
+    """
+    try:
+        path = field_file.path
+    except NotImplementedError:
+        path = None
+    if path is not None:
+        yield path
+        return
+
+    suffix = os.path.splitext(field_file.name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix) as tmp:
+        with field_file.open('rb') as source:
+            for chunk in source.chunks():
+                tmp.write(chunk)
+        tmp.flush()
+        yield tmp.name
+
+
+def _jpeg(image, quality=82):
+    buffer = BytesIO()
+    image.convert('RGB').save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def make_image_thumbnail(field_file, size=THUMBNAIL_SIZE):
+    """JPEG thumbnail bytes for a stored image"""
+    from PIL import Image, ImageOps
+
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        # Let the JPEG decoder downscale while decoding, much cheaper on large photos
+        image.draft('RGB', (size[0] * 2, size[1] * 2))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(size, Image.LANCZOS)
+        return _jpeg(image)
+
+
+def make_video_poster(path, width=POSTER_WIDTH):
+    """JPEG poster frame bytes, taken one second in (or the first frame for short clips)"""
+    ffmpeg = _ffmpeg()
+    for seek in ('1', '0'):
+        result = subprocess.run(
+            [
+                ffmpeg, '-v', 'error', '-ss', seek, '-i', path, '-frames:v', '1',
+                '-vf', f"scale='min({width},iw)':-2", '-f', 'image2', '-c:v', 'mjpeg', '-q:v', '4', 'pipe:1',
+            ],
+            capture_output=True, timeout=FFMPEG_TIMEOUT,
+        )
+        if result.returncode == 0 and result.stdout:
+            return result.stdout
+    raise MediaProcessingError(f'Could not extract poster frame: {result.stderr.decode(errors="ignore")[:500]}')
+
+
+def make_video_rendition(path, output_path, max_height=RENDITION_MAX_HEIGHT):
+    """H.264/AAC MP4 capped at max_height with faststart, for in-browser review"""
+    result = subprocess.run(
+        [
+            _ffmpeg(), '-v', 'error', '-y', '-i', path,
+            '-vf', f"scale=-2:'min({max_height},ih)'",
+            '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '26', '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac', '-b:a', '128k', '-movflags', '+faststart',
+            output_path,
+        ],
+        capture_output=True, timeout=FFMPEG_TIMEOUT,
+    )
+    if result.returncode != 0:
+        raise MediaProcessingError(f'Rendition failed: {result.stderr.decode(errors="ignore")[:500]}')
+
+
+def process_content_media(content):
+    """
+    Generate every derived file the content's media needs (no save).
+    Returns {field: old name} for the derived files that were replaced, to
+    pass to delete_replaced_media() once the content is saved.
+    """
+    base_name = f'content_{content.pk}'
+    previous = {field: getattr(content, field).name for field in DERIVED_FIELDS}
+
+    if content.image:
+        content.image_thumbnail.save(f'{base_name}.jpg', ContentFile(make_image_thumbnail(content.image)), save=False)
+
+    if content.video:
+        with local_path(content.video) as source:
+            content.video_poster.save(f'{base_name}.jpg', ContentFile(make_video_poster(source)), save=False)
+
+            with tempfile.TemporaryDirectory() as workdir:
+                output_path = os.path.join(workdir, f'{base_name}.mp4')
+                make_video_rendition(source, output_path)
+                with open(output_path, 'rb') as rendition:
+                    content.video_web.save(f'{base_name}.mp4', File(rendition), save=False)
+
+    return {
+        field: name for field, name in previous.items()
+        if name and name != getattr(content, field).name
+    }
+
+
+def delete_replaced_media(content, replaced):
+    """Delete superseded derived files; a failure only leaves an orphan behind"""
+    for field, name in replaced.items():
+        try:
+            getattr(content, field).storage.delete(name)
+        except Exception as e:
+            logger.warning(f"Could not delete replaced media {name}: {str(e)}")
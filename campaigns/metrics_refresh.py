@@ -0,0 +1,268 @@
+"""
+Published content metrics refresh
+Collects published content with a post URL and fetches current metrics
+through a pluggable fetcher on a bounded thread pool, with a minimum interval
+between requests to the same host. Posts are processed in batches: each
+batch's changes are written with one bulk_update and its campaigns are
+marked for the debounced analytics recompute before the next batch is
+fetched, so a run cut short by the task time limit keeps what it fetched
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .analytics import CONTENT_METRIC_FIELDS, mark_campaign_dirty
+from .models import POST_URL_SCHEMES, CampaignContent
+
+logger = logging.getLogger(__name__)
+
+# Fetcher payload key -> CampaignContent field
+FETCHED_METRIC_FIELDS = {
+    'likes': 'likes_count',
+    'comments': 'comments_count',
+    'shares': 'shares_count',
+    'views': 'views_count',
+}
+
+APPLY_BATCH_SIZE = 500
+
+# Posts fetched before their metrics are applied
+FETCH_BATCH_SIZE = 100
+
+
+class MetricsFetchError(Exception):
+    """Raised by a fetcher when a post's metrics cannot be read"""
+
+
+def is_http_url(url):
+    """True for an absolute http(s) URL; anything else is never requested"""
+    parts = urlsplit(url or '')
+    return parts.scheme in POST_URL_SCHEMES and bool(parts.netloc)
+
+
+class PostMetricsFetcher:
+    """
+    Base fetcher. Subclasses return {'likes', 'comments', 'shares', 'views'}
+    (any subset) for a post URL, or raise MetricsFetchError.
+    fetch() is called from worker threads, so implementations must be thread-safe.
+    """
+
+    def request_url(self, post_url):
+        """URL actually requested for a post; rate limiting is per host of this URL"""
+        return post_url
+
+    def fetch(self, post_url):
+        raise NotImplementedError
+
+
+class JsonMetricsFetcher(PostMetricsFetcher):
+    """
+    Reads metrics as JSON from a metrics endpoint, an http(s) template such
+    as 'https://metrics.example.com/posts?url={url}' into which the quoted
+    post URL is substituted. Post URLs are user input, so they are never
+    requested themselves; ImproperlyConfigured without a valid endpoint.
+    """
+
+    def __init__(self, endpoint=None, timeout=None):
+        self.endpoint = endpoint if endpoint is not None else getattr(settings, 'CONTENT_METRICS_ENDPOINT', '')
+        if not is_http_url(self.endpoint) or '{url}' not in self.endpoint:
+            raise ImproperlyConfigured(
+                "CONTENT_METRICS_ENDPOINT must be an http(s) URL template containing '{url}'"
+            )
+        self.timeout = timeout or getattr(settings, 'CONTENT_METRICS_TIMEOUT', 10)
+
+    def request_url(self, post_url):
+        return self.endpoint.format(url=quote(post_url, safe=''))
+
+    def fetch(self, post_url):
+        if not is_http_url(post_url):
+            raise MetricsFetchError('Post URL is not an http(s) URL')
+        request = Request(self.request_url(post_url), headers={'Accept': 'application/json'})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                payload = json.load(response)
+        except (OSError, ValueError) as e:
+            raise MetricsFetchError(str(e)) from e
+        if not isinstance(payload, dict):
+            raise MetricsFetchError('Metrics response is not a JSON object')
+        return payload
+
+
+def get_metrics_fetcher():
+    """Fetcher configured by CONTENT_METRICS_FETCHER (a dotted class path)"""
+    path = getattr(settings, 'CONTENT_METRICS_FETCHER', 'campaigns.metrics_refresh.JsonMetricsFetcher')
+    return import_string(path)()
+
+
+class DomainRateLimiter:
+    """
+    Spaces requests to the same host at least min_interval seconds apart.
+    Each caller reserves the next free slot under the lock and sleeps outside
+    it, so requests to other hosts are not held up.
+    """
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if self.min_interval <= 0:
+            return
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _normalize_metrics(payload):
+    """Keep the known metrics that are non-negative integers"""
+    metrics = {}
+    for key, field in FETCHED_METRIC_FIELDS.items():
+        value = payload.get(key)
+        if isinstance(value, bool):
+            continue
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            continue
+        if value >= 0:
+            metrics[field] = value
+    return metrics
+
+
+def fetch_metrics(posts, fetcher=None, concurrency=None, domain_interval=None, executor=None, limiter=None):
+    """
+    Fetch metrics for [(content_id, post_url), ...] concurrently. A failing
+    post is logged and counted, never fails the others.
+    Pass executor and limiter to share them across batches.
+    Returns ({content_id: {field: value}}, failed_count).
+    """
+    fetcher = fetcher or get_metrics_fetcher()
+    if limiter is None:
+        if domain_interval is None:
+            domain_interval = getattr(settings, 'CONTENT_METRICS_DOMAIN_INTERVAL', 1.0)
+        limiter = DomainRateLimiter(domain_interval)
+
+    def fetch_one(post):
+        content_id, post_url = post
+        try:
+            limiter.wait(fetcher.request_url(post_url))
+            return content_id, _normalize_metrics(fetcher.fetch(post_url))
+        except Exception as e:
+            logger.warning(f"Could not fetch metrics for content {content_id}: {str(e)}")
+            return content_id, None
+
+    if executor is None:
+        concurrency = concurrency or getattr(settings, 'CONTENT_METRICS_CONCURRENCY', 8)
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+            return fetch_metrics(posts, fetcher=fetcher, executor=executor, limiter=limiter)
+
+    results = {}
+    failed = 0
+    for content_id, metrics in executor.map(fetch_one, posts):
+        if metrics is None:
+            failed += 1
+        elif metrics:
+            results[content_id] = metrics
+    return results, failed
+
+
+def apply_fetched_metrics(fetched):
+    """
+    Write fetched metrics in bulk and return the ids of campaigns whose
+    totals changed. Rows are locked so a concurrent manual update is not lost.
+    """
+    if not fetched:
+        return set()
+
+    changed = []
+    campaign_ids = set()
+    with transaction.atomic():
+        contents = CampaignContent.objects.select_for_update(of=('self',)).filter(
+            id__in=fetched
+        ).select_related('collaboration').order_by('id')
+        for content in contents:
+            dirty = False
+            for field, value in fetched[content.id].items():
+                if getattr(content, field) != value:
+                    setattr(content, field, value)
+                    dirty = True
+            if dirty:
+                changed.append(content)
+                campaign_ids.add(content.collaboration.campaign_id)
+
+        if changed:
+            # bulk_update skips auto_now; report cache watermarks read updated_at
+            now = timezone.now()
+            for content in changed:
+                content.updated_at = now
+            CampaignContent.objects.bulk_update(
+                changed, [*CONTENT_METRIC_FIELDS, 'updated_at'], batch_size=APPLY_BATCH_SIZE
+            )
+    return campaign_ids
+
+
+def published_posts(content_ids=None):
+    """(content_id, post_url) for published content that has a post URL"""
+    queryset = CampaignContent.objects.filter(status='published').filter(
+        Q(post_url__istartswith='http://') | Q(post_url__istartswith='https://')
+    )
+    if content_ids is not None:
+        queryset = queryset.filter(id__in=content_ids)
+    return list(queryset.order_by('id').values_list('id', 'post_url'))
+
+
+def refresh_published_metrics(content_ids=None, fetcher=None, concurrency=None, domain_interval=None,
+                              batch_size=None):
+    """
+    Fetch and apply in batches of batch_size posts, marking each batch's
+    campaigns dirty. Network I/O happens outside any transaction.
+    Returns a summary dict; raises ImproperlyConfigured when no fetcher
+    can be built (e.g. CONTENT_METRICS_ENDPOINT is not set).
+    """
+    fetcher = fetcher or get_metrics_fetcher()
+    posts = published_posts(content_ids)
+    concurrency = concurrency or getattr(settings, 'CONTENT_METRICS_CONCURRENCY', 8)
+    if domain_interval is None:
+        domain_interval = getattr(settings, 'CONTENT_METRICS_DOMAIN_INTERVAL', 1.0)
+    limiter = DomainRateLimiter(domain_interval)
+    batch_size = max(batch_size or FETCH_BATCH_SIZE, 1)
+
+    fetched_count = failed = 0
+    campaign_ids = set()
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        for offset in range(0, len(posts), batch_size):
+            fetched, batch_failed = fetch_metrics(
+                posts[offset:offset + batch_size], fetcher=fetcher, executor=executor, limiter=limiter,
+            )
+            fetched_count += len(fetched)
+            failed += batch_failed
+
+            batch_campaign_ids = apply_fetched_metrics(fetched)
+            # Debounced: campaigns touched by several batches are recomputed once
+            for campaign_id in batch_campaign_ids - campaign_ids:
+                mark_campaign_dirty(campaign_id)
+            campaign_ids |= batch_campaign_ids
+
+    return {
+        'posts': len(posts),
+        'fetched': fetched_count,
+        'failed': failed,
+        'campaigns': len(campaign_ids),
+    }
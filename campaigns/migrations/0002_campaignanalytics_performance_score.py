@@ -0,0 +1,38 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="campaignanalytics",
+            name="performance_score",
+            field=models.PositiveSmallIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name="campaignanalytics",
+            name="engagement_score",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="campaignanalytics",
+            name="reach_score",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="campaignanalytics",
+            name="roi_score",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="campaignanalytics",
+            name="completion_score",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
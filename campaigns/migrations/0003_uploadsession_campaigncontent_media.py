@@ -0,0 +1,131 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("campaigns", "0002_campaignanalytics_performance_score"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="campaigncontent",
+            name="image_thumbnail",
+            field=models.ImageField(
+                blank=True, null=True, upload_to="campaign_content/thumbnails/"
+            ),
+        ),
+        migrations.AddField(
+            model_name="campaigncontent",
+            name="video_poster",
+            field=models.ImageField(
+                blank=True, null=True, upload_to="campaign_content/posters/"
+            ),
+        ),
+        migrations.AddField(
+            model_name="campaigncontent",
+            name="video_web",
+            field=models.FileField(
+                blank=True, null=True, upload_to="campaign_content/renditions/"
+            ),
+        ),
+        migrations.AddField(
+            model_name="campaigncontent",
+            name="media_status",
+            field=models.CharField(
+                choices=[
+                    ("none", "No Media"),
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("ready", "Ready"),
+                    ("failed", "Failed"),
+                ],
+                default="none",
+                max_length=20,
+            ),
+        ),
+        migrations.CreateModel(
+            name="UploadSession",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "target",
+                    models.CharField(
+                        choices=[
+                            ("content_image", "Content Image"),
+                            ("content_video", "Content Video"),
+                            ("brief_document", "Campaign Brief"),
+                            ("brand_assets", "Brand Assets"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                ("filename", models.CharField(max_length=255)),
+                (
+                    "content_type",
+                    models.CharField(blank=True, default="", max_length=100),
+                ),
+                ("total_size", models.PositiveBigIntegerField()),
+                ("received_bytes", models.PositiveBigIntegerField(default=0)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("uploading", "Uploading"),
+                            ("complete", "Complete"),
+                            ("failed", "Failed"),
+                            ("expired", "Expired"),
+                        ],
+                        default="uploading",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "file_path",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Stored path once complete",
+                        max_length=500,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Upload Session",
+                "verbose_name_plural": "Upload Sessions",
+                "db_table": "campaigns_upload_session",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "updated_at"],
+                        name="campaigns_u_status_911d99_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.11 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0003_uploadsession_campaigncontent_media"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="uploadsession",
+            name="chunks",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name="uploadsession",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("uploading", "Uploading"),
+                    ("assembling", "Assembling"),
+                    ("complete", "Complete"),
+                    ("failed", "Failed"),
+                    ("expired", "Expired"),
+                ],
+                default="uploading",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.11 on 2026-10-19 13:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0004_uploadsession_chunks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="campaigncontent",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="influencercollaboration",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
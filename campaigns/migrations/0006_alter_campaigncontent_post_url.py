@@ -0,0 +1,26 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:00
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0005_collaboration_content_updated_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="campaigncontent",
+            name="post_url",
+            field=models.URLField(
+                blank=True,
+                help_text="URL of the published content",
+                null=True,
+                validators=[
+                    django.core.validators.URLValidator(schemes=("http", "https"))
+                ],
+            ),
+        ),
+    ]
@@ -1,7 +1,38 @@
 from django.db import models
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.core.validators import URLValidator
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
+import uuid
+
+# Post URLs are user input that the metrics refresh passes to its endpoint
+POST_URL_SCHEMES = ('http', 'https')
+
+
+class CampaignQuerySet(models.QuerySet):
+    """Campaign queryset with list-level aggregates"""
+    
+    def with_budget_totals(self):
+        """
+        Annotate collaborations_count, spent_total and remaining_budget_total
+        in the same query (one join on collaborations)
+        """
+        spent = Coalesce(
+            Sum('collaborations__agreed_rate', filter=Q(collaborations__status='completed')),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+        return self.annotate(
+            collaborations_count=Count('collaborations'),
+            spent_total=spent,
+        ).annotate(
+            remaining_budget_total=models.ExpressionWrapper(
+                F('total_budget') - F('spent_total'),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            )
+        )
 
 
 class Campaign(models.Model):
@@ -59,6 +90,8 @@ class Campaign(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = CampaignQuerySet.as_manager()
+    
     class Meta:
         db_table = 'campaigns_campaign'
         verbose_name = _('Campaign')
@@ -70,13 +103,17 @@ class Campaign(models.Model):
     
     def get_total_spent(self):
         """Calculate total amount spent on this campaign"""
-        return sum(
-            collaboration.agreed_rate 
-            for collaboration in self.collaborations.filter(status='completed')
-        )
+        # Annotated by CampaignQuerySet.with_budget_totals()
+        if hasattr(self, 'spent_total'):
+            return self.spent_total
+        return self.collaborations.filter(status='completed').aggregate(
+            total=Coalesce(Sum('agreed_rate'), Value(Decimal('0.00')))
+        )['total']
     
     def get_remaining_budget(self):
         """Calculate remaining budget"""
+        if hasattr(self, 'remaining_budget_total'):
+            return self.remaining_budget_total
         return self.total_budget - self.get_total_spent()
 
 
@@ -145,6 +182,8 @@ class InfluencerCollaboration(models.Model):
         default='pending'
     )
     
+    updated_at = models.DateTimeField(auto_now=True)
+    
     class Meta:
         db_table = 'campaigns_collaboration'
         verbose_name = _('Influencer Collaboration')
@@ -177,8 +216,25 @@ class CampaignContent(models.Model):
     image = models.ImageField(upload_to='campaign_content/images/', blank=True, null=True)
     video = models.FileField(upload_to='campaign_content/videos/', blank=True, null=True)
     
+    # Derived media for review screens (generated by campaigns.tasks.process_content_media)
+    MEDIA_STATUS_CHOICES = (
+        ('none', _('No Media')),
+        ('pending', _('Pending')),
+        ('processing', _('Processing')),
+        ('ready', _('Ready')),
+        ('failed', _('Failed')),
+    )
+    
+    image_thumbnail = models.ImageField(upload_to='campaign_content/thumbnails/', blank=True, null=True)
+    video_poster = models.ImageField(upload_to='campaign_content/posters/', blank=True, null=True)
+    video_web = models.FileField(upload_to='campaign_content/renditions/', blank=True, null=True)
+    media_status = models.CharField(max_length=20, choices=MEDIA_STATUS_CHOICES, default='none')
+    
     # External Content
-    post_url = models.URLField(blank=True, null=True, help_text=_('URL of the published content'))
+    post_url = models.URLField(
+        blank=True, null=True, validators=[URLValidator(schemes=POST_URL_SCHEMES)],
+        help_text=_('URL of the published content')
+    )
     
     # Review Process
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
@@ -194,6 +250,7 @@ class CampaignContent(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     submitted_at = models.DateTimeField(blank=True, null=True)
     published_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'campaigns_content'
@@ -233,6 +290,13 @@ class CampaignAnalytics(models.Model):
     estimated_value = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
     roi_percentage = models.FloatField(default=0.0)
     
+    # Performance score (0-100) and its components, maintained with the totals
+    performance_score = models.PositiveSmallIntegerField(default=0, db_index=True)
+    engagement_score = models.PositiveSmallIntegerField(default=0)
+    reach_score = models.PositiveSmallIntegerField(default=0)
+    roi_score = models.PositiveSmallIntegerField(default=0)
+    completion_score = models.PositiveSmallIntegerField(default=0)
+    
     # Last updated
     last_calculated = models.DateTimeField(auto_now=True)
     
@@ -242,4 +306,55 @@ class CampaignAnalytics(models.Model):
         verbose_name_plural = _('Campaign Analytics')
     
     def __str__(self):
-        return f"{self.campaign.name} - Analytics"
\ No newline at end of file
+        return f"{self.campaign.name} - Analytics"
+
+
+class UploadSession(models.Model):
+    """Chunked, resumable upload of a campaign file"""
+    
+    TARGET_CHOICES = (
+        ('content_image', _('Content Image')),
+        ('content_video', _('Content Video')),
+        ('brief_document', _('Campaign Brief')),
+        ('brand_assets', _('Brand Assets')),
+    )
+    
+    STATUS_CHOICES = (
+        ('uploading', _('Uploading')),
+        ('assembling', _('Assembling')),
+        ('complete', _('Complete')),
+        ('failed', _('Failed')),
+        ('expired', _('Expired')),
+    )
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    
+    # What the assembled file is attached to (CampaignContent id or Campaign id)
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    object_id = models.PositiveIntegerField()
+    
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    total_size = models.PositiveBigIntegerField()
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    # Storage names of the accepted chunks, in offset order
+    chunks = models.JSONField(default=list, blank=True)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    file_path = models.CharField(max_length=500, blank=True, default='', help_text=_('Stored path once complete'))
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'campaigns_upload_session'
+        verbose_name = _('Upload Session')
+        verbose_name_plural = _('Upload Sessions')
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
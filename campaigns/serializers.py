@@ -1,6 +1,9 @@
 # campaigns/serializers.py
+import os
+
+from django.core.validators import URLValidator, get_available_image_extensions
 from rest_framework import serializers
-from .models import Campaign, InfluencerCollaboration, CampaignContent, CampaignAnalytics
+from .models import POST_URL_SCHEMES, Campaign, InfluencerCollaboration, CampaignContent, CampaignAnalytics, UploadSession
 
 # Flexible import for InfluencerListSerializer
 try:
@@ -27,6 +30,12 @@ class CampaignContentSerializer(serializers.ModelSerializer):
     submittedAt = serializers.DateTimeField(source='submitted_at', read_only=True, allow_null=True)
     publishedAt = serializers.DateTimeField(source='published_at', read_only=True, allow_null=True)
     
+    # Derived media for review screens
+    thumbnailUrl = serializers.ImageField(source='image_thumbnail', read_only=True)
+    posterUrl = serializers.ImageField(source='video_poster', read_only=True)
+    videoWebUrl = serializers.FileField(source='video_web', read_only=True)
+    mediaStatus = serializers.CharField(source='media_status', read_only=True)
+    
     # Add type field for frontend compatibility
     type = serializers.SerializerMethodField()
     
@@ -34,6 +43,7 @@ class CampaignContentSerializer(serializers.ModelSerializer):
         model = CampaignContent
         fields = [
             'id', 'collaborationId', 'type', 'title', 'caption', 'image', 'video', 'postUrl',
+            'thumbnailUrl', 'posterUrl', 'videoWebUrl', 'mediaStatus',
             'status', 'feedback', 'likesCount', 'commentsCount', 'sharesCount', 'viewsCount',
             'createdAt', 'submittedAt', 'publishedAt',
         ]
@@ -48,7 +58,10 @@ class CampaignContentSerializer(serializers.ModelSerializer):
 class CampaignContentCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating content - accepts camelCase"""
     
-    postUrl = serializers.URLField(source='post_url', required=False, allow_null=True, allow_blank=True)
+    postUrl = serializers.URLField(
+        source='post_url', required=False, allow_null=True, allow_blank=True,
+        validators=[URLValidator(schemes=POST_URL_SCHEMES)],
+    )
     likesCount = serializers.IntegerField(source='likes_count', required=False, default=0)
     commentsCount = serializers.IntegerField(source='comments_count', required=False, default=0)
     sharesCount = serializers.IntegerField(source='shares_count', required=False, default=0)
@@ -62,6 +75,65 @@ class CampaignContentCreateSerializer(serializers.ModelSerializer):
         ]
 
 
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for chunked upload sessions"""
+    
+    uploadId = serializers.UUIDField(source='id', read_only=True)
+    objectId = serializers.IntegerField(source='object_id', read_only=True)
+    contentType = serializers.CharField(source='content_type', read_only=True)
+    totalSize = serializers.IntegerField(source='total_size', read_only=True)
+    receivedBytes = serializers.IntegerField(source='received_bytes', read_only=True)
+    filePath = serializers.CharField(source='file_path', read_only=True)
+    createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+    completedAt = serializers.DateTimeField(source='completed_at', read_only=True, allow_null=True)
+    
+    class Meta:
+        model = UploadSession
+        fields = [
+            'uploadId', 'target', 'objectId', 'filename', 'contentType',
+            'totalSize', 'receivedBytes', 'status', 'filePath', 'createdAt', 'completedAt',
+        ]
+
+
+class UploadSessionCreateSerializer(serializers.ModelSerializer):
+    """Serializer for starting a chunked upload - accepts camelCase"""
+    
+    objectId = serializers.IntegerField(source='object_id')
+    contentType = serializers.CharField(source='content_type', required=False, allow_blank=True, default='')
+    totalSize = serializers.IntegerField(source='total_size', min_value=1)
+    
+    class Meta:
+        model = UploadSession
+        fields = ['target', 'objectId', 'filename', 'contentType', 'totalSize']
+    
+    def validate(self, attrs):
+        # Same rules the non-chunked image upload gets from ImageField
+        if attrs['target'] == 'content_image':
+            extension = os.path.splitext(attrs['filename'])[1].lower().lstrip('.')
+            if extension not in get_available_image_extensions():
+                raise serializers.ValidationError({'filename': f'Unsupported image file extension: .{extension}'})
+            if attrs.get('content_type') and not attrs['content_type'].startswith('image/'):
+                raise serializers.ValidationError({'contentType': 'Content images must have an image/* content type'})
+        elif attrs['target'] == 'content_video':
+            if attrs.get('content_type') and not attrs['content_type'].startswith('video/'):
+                raise serializers.ValidationError({'contentType': 'Content videos must have a video/* content type'})
+        return attrs
+
+
+class ContentMetricsUpdateSerializer(serializers.Serializer):
+    """One row of a bulk content metrics update - accepts camelCase"""
+    
+    contentId = serializers.IntegerField(source='content_id')
+    likes = serializers.IntegerField(source='likes_count', min_value=0, required=False)
+    comments = serializers.IntegerField(source='comments_count', min_value=0, required=False)
+    shares = serializers.IntegerField(source='shares_count', min_value=0, required=False)
+    views = serializers.IntegerField(source='views_count', min_value=0, required=False)
+    postUrl = serializers.URLField(
+        source='post_url', required=False, allow_null=True, allow_blank=True,
+        validators=[URLValidator(schemes=POST_URL_SCHEMES)],
+    )
+
+
 class CampaignAnalyticsSerializer(serializers.ModelSerializer):
     """Serializer for CampaignAnalytics"""
     
@@ -79,6 +151,11 @@ class CampaignAnalyticsSerializer(serializers.ModelSerializer):
     totalSpent = serializers.DecimalField(source='total_spent', max_digits=12, decimal_places=2)
     estimatedValue = serializers.DecimalField(source='estimated_value', max_digits=12, decimal_places=2)
     roiPercentage = serializers.FloatField(source='roi_percentage')
+    performanceScore = serializers.IntegerField(source='performance_score', read_only=True)
+    engagementScore = serializers.IntegerField(source='engagement_score', read_only=True)
+    reachScore = serializers.IntegerField(source='reach_score', read_only=True)
+    roiScore = serializers.IntegerField(source='roi_score', read_only=True)
+    completionScore = serializers.IntegerField(source='completion_score', read_only=True)
     lastCalculated = serializers.DateTimeField(source='last_calculated', read_only=True)
     
     class Meta:
@@ -88,7 +165,8 @@ class CampaignAnalyticsSerializer(serializers.ModelSerializer):
             'totalLikes', 'totalComments', 'totalShares', 'totalSaves',
             'avgEngagementRate', 'costPerEngagement', 'websiteClicks',
             'conversions', 'conversionRate', 'totalSpent', 'estimatedValue',
-            'roiPercentage', 'lastCalculated',
+            'roiPercentage', 'performanceScore', 'engagementScore', 'reachScore',
+            'roiScore', 'completionScore', 'lastCalculated',
         ]
 
 
@@ -184,9 +262,11 @@ class CampaignListSerializer(serializers.ModelSerializer):
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
     updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
     
-    # Computed fields
+    # Computed fields (annotated by Campaign.objects.with_budget_totals())
     collaborationsCount = serializers.SerializerMethodField()
     totalSpent = serializers.SerializerMethodField()
+    remainingBudget = serializers.SerializerMethodField()
+    performanceScore = serializers.SerializerMethodField()
     
     class Meta:
         model = Campaign
@@ -194,14 +274,27 @@ class CampaignListSerializer(serializers.ModelSerializer):
             'id', 'agencyId', 'name', 'description', 'campaignType',
             'brandName', 'status', 'totalBudget', 'budgetCurrency',
             'startDate', 'endDate', 'createdById', 'createdAt', 'updatedAt',
-            'collaborationsCount', 'totalSpent',
+            'collaborationsCount', 'totalSpent', 'remainingBudget', 'performanceScore',
         ]
     
     def get_collaborationsCount(self, obj):
+        if hasattr(obj, 'collaborations_count'):
+            return obj.collaborations_count
         return obj.collaborations.count()
     
     def get_totalSpent(self, obj):
         return obj.get_total_spent()
+    
+    def get_remainingBudget(self, obj):
+        return obj.get_remaining_budget()
+    
+    def get_performanceScore(self, obj):
+        if hasattr(obj, 'performance_score'):
+            return obj.performance_score
+        analytics = CampaignAnalytics.objects.filter(campaign_id=obj.pk).values_list(
+            'performance_score', flat=True
+        ).first()
+        return analytics or 0
 
 
 class CampaignDetailSerializer(serializers.ModelSerializer):
@@ -0,0 +1,102 @@
+# campaigns/tasks.py
+# Celery tasks for campaign background processing
+
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def recompute_dirty_campaign_analytics(campaign_id):
+    """
+    Debounced full analytics recompute, scheduled by mark_campaign_dirty()
+    """
+    try:
+        from .analytics import recompute_if_dirty
+
+        if recompute_if_dirty(campaign_id):
+            return f"Campaign {campaign_id} analytics recomputed"
+        return f"Campaign {campaign_id} analytics locked, rescheduled"
+
+    except Exception as e:
+        logger.error(f"Error recomputing analytics for campaign {campaign_id}: {str(e)}")
+        return f"Failed to recompute campaign analytics: {str(e)}"
+
+
+@shared_task
+def process_content_media(content_id):
+    """
+    Generate thumbnails, poster frames and web renditions for uploaded content
+    """
+    from .models import CampaignContent
+    from .media import delete_replaced_media, process_content_media as generate_media
+
+    try:
+        content = CampaignContent.objects.get(pk=content_id)
+    except CampaignContent.DoesNotExist:
+        return f"Content {content_id} not found"
+
+    CampaignContent.objects.filter(pk=content_id).update(media_status='processing')
+    try:
+        replaced = generate_media(content)
+        content.media_status = 'ready'
+        content.save(update_fields=['image_thumbnail', 'video_poster', 'video_web', 'media_status'])
+        delete_replaced_media(content, replaced)
+        return f"Media processed for content {content_id}"
+
+    except Exception as e:
+        logger.error(f"Error processing media for content {content_id}: {str(e)}")
+        CampaignContent.objects.filter(pk=content_id).update(media_status='failed')
+        return f"Media processing failed: {str(e)}"
+
+
+@shared_task
+def cleanup_stale_uploads(max_age_hours=24):
+    """
+    Discard chunked uploads that have not received data for max_age_hours,
+    including completions interrupted while assembling
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from .models import UploadSession
+    from .uploads import discard_upload
+
+    cutoff = timezone.now() - timedelta(hours=max_age_hours)
+    stale = UploadSession.objects.filter(status__in=['uploading', 'assembling'], updated_at__lt=cutoff)
+
+    discarded_count = 0
+    for session in stale.iterator():
+        try:
+            discard_upload(session)
+            discarded_count += 1
+        except Exception as e:
+            logger.error(f"Error discarding upload {session.pk}: {str(e)}")
+
+    return f"Discarded {discarded_count} stale uploads"
+
+
+@shared_task
+def refresh_published_content_metrics(content_ids=None):
+    """
+    Pull current metrics for published content from its post URLs and
+    refresh the analytics of the affected campaigns. Scheduled via beat.
+    """
+    from django.core.exceptions import ImproperlyConfigured
+
+    try:
+        from .metrics_refresh import refresh_published_metrics
+
+        summary = refresh_published_metrics(content_ids)
+        return (
+            f"Refreshed metrics for {summary['fetched']}/{summary['posts']} posts "
+            f"({summary['failed']} failed), {summary['campaigns']} campaigns updated"
+        )
+
+    except ImproperlyConfigured as e:
+        logger.warning(f"Skipping content metrics refresh: {str(e)}")
+        return f"Skipped content metrics refresh: {str(e)}"
+
+    except Exception as e:
+        logger.error(f"Error refreshing published content metrics: {str(e)}")
+        return f"Failed to refresh content metrics: {str(e)}"
@@ -1,3 +1,482 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from agencies.models import Agency
+from influencers.models import Influencer
+
+from .metrics_refresh import (
+    JsonMetricsFetcher, MetricsFetchError, apply_fetched_metrics, refresh_published_metrics,
+)
+from .models import Campaign, CampaignAnalytics, CampaignContent, InfluencerCollaboration, UploadSession
+from .tasks import process_content_media, refresh_published_content_metrics
+from .uploads import UploadError, complete_upload, staging_dir
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def create_agency(email):
+    """Agency users get their agency, owner membership and trial on signup"""
+    user = get_user_model().objects.create_user(username=email, email=email, password='password')
+    return user, Agency.objects.get(user=user)
+
+
+def create_campaign(agency, name='Launch', budget='10000.00'):
+    return Campaign.objects.create(
+        agency=agency, name=name, campaign_type='brand_awareness', brand_name='Brand',
+        target_audience='Everyone', campaign_objectives='Reach', total_budget=Decimal(budget),
+        start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), created_by=agency.user,
+    )
+
+
+def create_collaboration(campaign, username, status='in_progress', rate='500.00'):
+    influencer, _ = Influencer.objects.get_or_create(
+        username=username, defaults={'full_name': username.title(), 'primary_category': 'fashion'},
+    )
+    return InfluencerCollaboration.objects.create(
+        campaign=campaign, influencer=influencer, content_type='post',
+        agreed_rate=Decimal(rate), deadline=date(2026, 6, 30), status=status,
+    )
+
+
+def create_content(collaboration, **metrics):
+    return CampaignContent.objects.create(collaboration=collaboration, title='Post', status='published', **metrics)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BulkContentMetricsTests(TestCase):
+
+    def setUp(self):
+        self.user, self.agency = create_agency('owner@example.com')
+        _, self.other_agency = create_agency('other@example.com')
+        self.campaign = create_campaign(self.agency)
+        collaboration = create_collaboration(self.campaign, 'alice')
+        self.content = create_content(collaboration, likes_count=10, comments_count=2)
+        self.second = create_content(collaboration, likes_count=5)
+        other_campaign = create_campaign(self.other_agency, name='Other')
+        self.foreign = create_content(create_collaboration(other_campaign, 'bob'), likes_count=7)
+        CampaignAnalytics.objects.create(campaign=self.campaign, total_likes=15, total_comments=2)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('campaigns:api_bulk_update_content_metrics')
+
+    def post(self, updates):
+        with mock.patch('campaigns.views.mark_campaign_dirty') as mark_dirty:
+            response = self.client.post(self.url, {'updates': updates}, format='json')
+        return response, mark_dirty
+
+    def test_reports_per_row_results(self):
+        response, _ = self.post([
+            {'contentId': self.content.id, 'likes': 20},
+            {'contentId': self.foreign.id, 'likes': 100},
+            {'contentId': 999999, 'likes': 1},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        statuses = {row['contentId']: row['status'] for row in response.data['results']}
+        self.assertEqual(statuses, {
+            self.content.id: 'updated',
+            self.foreign.id: 'permission_denied',
+            999999: 'not_found',
+        })
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['failed'], 2)
+
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.likes_count, 7)
+
+    def test_applies_summed_deltas_once_per_campaign(self):
+        response, mark_dirty = self.post([
+            {'contentId': self.content.id, 'likes': 25, 'comments': 4},
+            {'contentId': self.second.id, 'likes': 8, 'views': 300},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.content.refresh_from_db()
+        self.assertEqual((self.content.likes_count, self.content.comments_count), (25, 4))
+
+        analytics = CampaignAnalytics.objects.get(campaign=self.campaign)
+        self.assertEqual(analytics.total_likes, 15 + 15 + 3)
+        self.assertEqual(analytics.total_comments, 4)
+        mark_dirty.assert_called_once_with(self.campaign.id)
+
+    def test_later_rows_for_same_content_win(self):
+        self.post([
+            {'contentId': self.content.id, 'likes': 30},
+            {'contentId': self.content.id, 'likes': 12},
+        ])
+        self.content.refresh_from_db()
+        self.assertEqual(self.content.likes_count, 12)
+
+    def test_invalid_rows_reject_the_request(self):
+        response, mark_dirty = self.post([
+            {'contentId': self.content.id, 'likes': 40},
+            {'contentId': self.second.id, 'likes': -1},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('errors', response.data)
+        self.content.refresh_from_db()
+        self.assertEqual(self.content.likes_count, 10)
+        mark_dirty.assert_not_called()
+
+    def test_rejects_empty_and_oversized_batches(self):
+        response, _ = self.post([])
+        self.assertEqual(response.status_code, 400)
+
+        with mock.patch('campaigns.views.MAX_BULK_METRIC_UPDATES', 1):
+            response, _ = self.post([{'contentId': self.content.id}, {'contentId': self.second.id}])
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CollaborationStatusTests(TestCase):
+
+    def setUp(self):
+        self.user, self.agency = create_agency('owner@example.com')
+        self.campaign = create_campaign(self.agency)
+        self.collaboration = create_collaboration(self.campaign, 'alice', status='invited')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('campaigns:api_update_collaboration_status', args=[self.collaboration.id])
+
+    def test_any_status_change_marks_campaign_dirty(self):
+        for new_status in ('accepted', 'in_progress', 'declined'):
+            with mock.patch('campaigns.views.mark_campaign_dirty') as mark_dirty:
+                response = self.client.post(self.url, {'status': new_status}, format='json')
+            self.assertEqual(response.status_code, 200)
+            mark_dirty.assert_called_once_with(self.campaign.id)
+
+    def test_unchanged_status_does_not_mark_dirty(self):
+        with mock.patch('campaigns.views.mark_campaign_dirty') as mark_dirty:
+            self.client.post(self.url, {'status': 'invited'}, format='json')
+        mark_dirty.assert_not_called()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class InviteInfluencerTests(TestCase):
+
+    def setUp(self):
+        self.user, self.agency = create_agency('owner@example.com')
+        self.campaign = create_campaign(self.agency)
+        self.influencers = [
+            Influencer.objects.create(full_name=name.title(), username=name, primary_category='fashion')
+            for name in ('alice', 'bob', 'carol')
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.terms = {'contentType': 'post', 'deliverablesCount': 2, 'agreedRate': '750.00', 'deadline': '2026-06-30'}
+
+    def test_bulk_invite_marks_campaign_dirty_once(self):
+        url = reverse('campaigns:api_bulk_invite_influencers', args=[self.campaign.id])
+        ids = [influencer.id for influencer in self.influencers] + [999999]
+        with mock.patch('campaigns.views.mark_campaign_dirty') as mark_dirty:
+            response = self.client.post(url, {'terms': self.terms, 'influencerIds': ids}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['invited'], 3)
+        self.assertEqual(response.data['results'][-1]['status'], 'not_found')
+        mark_dirty.assert_called_once_with(self.campaign.id)
+
+    def test_bulk_invite_without_new_rows_does_not_mark_dirty(self):
+        create_collaboration(self.campaign, 'alice')
+        url = reverse('campaigns:api_bulk_invite_influencers', args=[self.campaign.id])
+        with mock.patch('campaigns.views.mark_campaign_dirty') as mark_dirty:
+            response = self.client.post(
+                url, {'terms': self.terms, 'influencerIds': [self.influencers[0].id]}, format='json',
+            )
+
+        self.assertEqual(response.data['results'][0]['status'], 'already_invited')
+        mark_dirty.assert_not_called()
+
+    def test_bulk_invite_respects_plan_influencer_limit(self):
+        self.agency.subscription.max_influencers_per_campaign = 2
+        self.agency.subscription.save()
+        create_collaboration(self.campaign, 'existing')
+        url = reverse('campaigns:api_bulk_invite_influencers', args=[self.campaign.id])
+        ids = [influencer.id for influencer in self.influencers[:2]]
+
+        with mock.patch('campaigns.views.mark_campaign_dirty') as mark_dirty:
+            response = self.client.post(url, {'terms': self.terms, 'influencerIds': ids}, format='json')
+            self.assertEqual(response.status_code, 403)
+            self.assertIn('limit of 2', response.data['error'])
+            self.assertEqual(self.campaign.collaborations.count(), 1)
+
+            response = self.client.post(url, {'terms': self.terms, 'influencerIds': ids[:1]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        mark_dirty.assert_called_once_with(self.campaign.id)
+
+    def test_single_invite_marks_campaign_dirty(self):
+        url = reverse('campaigns:api_invite_influencer', args=[self.campaign.id])
+        with mock.patch('campaigns.views.mark_campaign_dirty') as mark_dirty:
+            response = self.client.post(url, {**self.terms, 'influencerId': self.influencers[1].id}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        mark_dirty.assert_called_once_with(self.campaign.id)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ChunkedUploadTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        self.user, self.agency = create_agency('owner@example.com')
+        self.campaign = create_campaign(self.agency)
+        self.content = create_content(create_collaboration(self.campaign, 'alice'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.body = b'0123456789' * 10
+
+        patcher = mock.patch('campaigns.tasks.process_content_media.delay')
+        self.process_media = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_upload(self, **overrides):
+        data = {
+            'target': 'content_video', 'objectId': self.content.id, 'filename': 'clip.mp4',
+            'contentType': 'video/mp4', 'totalSize': len(self.body), **overrides,
+        }
+        return self.client.post(reverse('campaigns:api_create_upload'), data, format='json')
+
+    def put_chunk(self, upload_id, start, end):
+        return self.client.put(
+            reverse('campaigns:api_upload_detail', args=[upload_id]),
+            data=self.body[start:end + 1],
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.body)}',
+        )
+
+    def test_resume_and_complete(self):
+        upload_id = self.create_upload().data['uploadId']
+        self.assertEqual(self.put_chunk(upload_id, 0, 39).data['receivedBytes'], 40)
+
+        # A chunk at the wrong offset is refused with the offset to resume from
+        response = self.put_chunk(upload_id, 60, 99)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['receivedBytes'], 40)
+
+        status_response = self.client.get(reverse('campaigns:api_upload_detail', args=[upload_id]))
+        self.assertEqual(status_response.data['receivedBytes'], 40)
+        self.assertEqual(self.put_chunk(upload_id, 40, 99).data['receivedBytes'], 100)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(reverse('campaigns:api_complete_upload', args=[upload_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'complete')
+
+        # Media processing is queued only once the new file is committed
+        self.process_media.assert_not_called()
+        for callback in callbacks:
+            callback()
+        self.process_media.assert_called_once_with(self.content.id)
+
+        self.content.refresh_from_db()
+        with self.content.video.open('rb') as stored:
+            self.assertEqual(stored.read(), self.body)
+        self.assertEqual(self.content.media_status, 'pending')
+
+        session = UploadSession.objects.get(pk=upload_id)
+        self.assertFalse(any(default_storage.exists(name) for name in session.chunks))
+        self.assertEqual(default_storage.listdir(staging_dir(session))[1], [])
+
+    def test_second_complete_is_rejected(self):
+        upload_id = self.create_upload().data['uploadId']
+        self.put_chunk(upload_id, 0, 99)
+        stale_session = UploadSession.objects.get(pk=upload_id)
+
+        first = self.client.post(reverse('campaigns:api_complete_upload', args=[upload_id]))
+        second = self.client.post(reverse('campaigns:api_complete_upload', args=[upload_id]))
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 409)
+
+        # A caller holding an outdated session object is refused under the row lock
+        with self.assertRaises(UploadError):
+            complete_upload(stale_session)
+
+    def test_incomplete_upload_cannot_complete(self):
+        upload_id = self.create_upload().data['uploadId']
+        self.put_chunk(upload_id, 0, 49)
+        response = self.client.post(reverse('campaigns:api_complete_upload', args=[upload_id]))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['receivedBytes'], 50)
+
+    def test_image_uploads_are_validated(self):
+        response = self.create_upload(target='content_image', filename='payload.exe', contentType='image/png')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('filename', response.data)
+
+        response = self.create_upload(target='content_image', filename='photo.png', contentType='text/html')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('contentType', response.data)
+
+        response = self.create_upload(target='content_image', filename='photo.png', contentType='image/png')
+        self.assertEqual(response.status_code, 201)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ContentMediaTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        _, agency = create_agency('owner@example.com')
+        self.content = create_content(create_collaboration(create_campaign(agency), 'alice'))
+
+    def test_reprocessing_deletes_replaced_thumbnail(self):
+        buffer = BytesIO()
+        Image.new('RGB', (800, 600), 'red').save(buffer, format='PNG')
+        self.content.image.save('photo.png', ContentFile(buffer.getvalue()))
+
+        process_content_media(self.content.id)
+        self.content.refresh_from_db()
+        first_thumbnail = self.content.image_thumbnail.name
+        self.assertTrue(default_storage.exists(first_thumbnail))
+
+        process_content_media(self.content.id)
+        self.content.refresh_from_db()
+        self.assertEqual(self.content.media_status, 'ready')
+        self.assertNotEqual(self.content.image_thumbnail.name, first_thumbnail)
+        self.assertTrue(default_storage.exists(self.content.image_thumbnail.name))
+        self.assertFalse(default_storage.exists(first_thumbnail))
+
+
+class FakeMetricsHandler(BaseHTTPRequestHandler):
+    """Metrics endpoint: likes are the digits of the post URL, '/broken' posts fail"""
+
+    def do_GET(self):
+        post_url = parse_qs(urlsplit(self.path).query)['url'][0]
+        self.server.request_times.append(time.monotonic())
+        if post_url.endswith('/broken'):
+            self.send_error(500)
+            return
+        body = json.dumps({'likes': int(post_url.rsplit('/', 1)[-1]), 'views': 1000}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RefreshPublishedMetricsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeMetricsHandler)
+        cls.server.request_times = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.fetcher = JsonMetricsFetcher(endpoint=f'http://127.0.0.1:{cls.server.server_port}/posts?url={{url}}')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.request_times.clear()
+        _, agency = create_agency('owner@example.com')
+        self.campaigns = [create_campaign(agency, name='First'), create_campaign(agency, name='Second')]
+        self.contents = []
+        for index, post in enumerate(['11', '12', 'broken', '14', '15']):
+            collaboration = create_collaboration(self.campaigns[index % 2], f'creator{index}')
+            content = create_content(collaboration)
+            # Distinct post domains; every request still goes to the one endpoint host
+            content.post_url = f'https://site{index}.example.com/p/{post}'
+            content.save(update_fields=['post_url'])
+            self.contents.append(content)
+
+    def refresh(self, **kwargs):
+        kwargs.setdefault('domain_interval', 0)
+        return refresh_published_metrics(fetcher=self.fetcher, concurrency=4, **kwargs)
+
+    def test_applies_and_marks_dirty_per_batch(self):
+        with mock.patch('campaigns.metrics_refresh.apply_fetched_metrics', wraps=apply_fetched_metrics) as apply, \
+                mock.patch('campaigns.metrics_refresh.mark_campaign_dirty') as mark_dirty:
+            summary = self.refresh(batch_size=2)
+
+        self.assertEqual([len(call.args[0]) for call in apply.call_args_list], [2, 1, 1])
+        # Marked as soon as the first batch touching each campaign is applied
+        self.assertEqual([call.args[0] for call in mark_dirty.call_args_list],
+                         [self.campaigns[0].id, self.campaigns[1].id])
+        self.assertEqual(summary, {'posts': 5, 'fetched': 4, 'failed': 1, 'campaigns': 2})
+
+    def test_failing_post_does_not_fail_others(self):
+        with mock.patch('campaigns.metrics_refresh.mark_campaign_dirty'):
+            self.refresh()
+
+        likes = dict(CampaignContent.objects.values_list('id', 'likes_count'))
+        self.assertEqual([likes[content.id] for content in self.contents], [11, 12, 0, 14, 15])
+        self.assertEqual(CampaignContent.objects.get(pk=self.contents[0].pk).views_count, 1000)
+
+    def test_rate_limit_keys_on_requested_host(self):
+        with mock.patch('campaigns.metrics_refresh.mark_campaign_dirty'):
+            self.refresh(domain_interval=0.1)
+
+        times = sorted(self.server.request_times)
+        self.assertEqual(len(times), 5)
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        self.assertGreaterEqual(min(gaps), 0.09)
+
+    def test_non_http_post_urls_are_never_requested(self):
+        CampaignContent.objects.filter(pk=self.contents[0].pk).update(post_url='file:///etc/passwd')
+        with mock.patch('campaigns.metrics_refresh.mark_campaign_dirty'):
+            summary = self.refresh()
+        self.assertEqual(summary['posts'], 4)
+        self.assertEqual(len(self.server.request_times), 4)
+
+        with self.assertRaises(MetricsFetchError):
+            self.fetcher.fetch('http://')
+
+    @override_settings(CONTENT_METRICS_ENDPOINT='')
+    def test_refresh_is_skipped_without_endpoint(self):
+        result = refresh_published_content_metrics()
+        self.assertIn('Skipped', result)
+        self.assertEqual(self.server.request_times, [])
+
+        with self.assertRaises(ImproperlyConfigured):
+            JsonMetricsFetcher(endpoint='file:///tmp/{url}')
+
+    def test_update_content_rejects_non_http_post_url(self):
+        user = self.campaigns[0].agency.user
+        client = APIClient()
+        client.force_authenticate(user)
+        content = self.contents[0]
+        url = reverse('campaigns:api_update_content', args=[self.campaigns[0].id, content.id])
+
+        response = client.patch(url, {'post_url': 'file:///etc/passwd'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = client.patch(url, {'post_url': 'https://instagram.com/p/abc'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        content.refresh_from_db()
+        self.assertEqual(content.post_url, 'https://instagram.com/p/abc')
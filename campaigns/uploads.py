@@ -0,0 +1,241 @@
+"""
+Chunked, resumable uploads for campaign files
+Each accepted chunk is stored as its own object in the default storage
+backend, so any app instance can take the next chunk of an upload and a
+client can resume from received_bytes after a dropped connection. The chunk
+body is read before the session row is locked; the lock only covers the
+offset check and advancing received_bytes. On completion the chunks are
+streamed in order into the target's FileField, never loaded whole into memory
+"""
+
+import io
+import os
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Campaign, CampaignContent, UploadSession
+
+UPLOAD_CHUNK_SIZE = getattr(settings, 'CHUNKED_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+MAX_UPLOAD_SIZE = getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 4 * 1024 * 1024 * 1024)
+STAGING_PREFIX = 'chunked_uploads'
+
+# Stream copy block size for reading request bodies and stored chunks
+READ_BLOCK_SIZE = 64 * 1024
+# Chunk bodies larger than this are buffered in a temporary file instead of memory
+SPOOL_SIZE = 1024 * 1024
+
+# target -> (model, file field)
+UPLOAD_TARGETS = {
+    'content_image': (CampaignContent, 'image'),
+    'content_video': (CampaignContent, 'video'),
+    'brief_document': (Campaign, 'brief_document'),
+    'brand_assets': (Campaign, 'brand_assets'),
+}
+
+
+class UploadError(Exception):
+    """Raised when a chunk or completion request cannot be applied"""
+
+    def __init__(self, message, received_bytes=None):
+        super().__init__(message)
+        self.received_bytes = received_bytes
+
+
+def staging_dir(session):
+    return f'{STAGING_PREFIX}/{session.pk}'
+
+
+def chunk_name(session, start):
+    # Unique per attempt: a retried chunk never collides with an abandoned one
+    return f'{staging_dir(session)}/{start:015d}-{uuid.uuid4().hex}.part'
+
+
+class StoredChunksReader(io.RawIOBase):
+    """Read-only, forward-only file object over stored chunks in order"""
+
+    def __init__(self, names, size, storage=None):
+        self.names = list(names)
+        self.size = size
+        self.storage = storage or default_storage
+        self._index = 0
+        self._current = None
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # Storage backends rewind before reading; any other seek is unsupported
+        if whence == os.SEEK_SET and offset == self._position:
+            return self._position
+        if whence == os.SEEK_SET and offset == 0:
+            self._close_current()
+            self._index = 0
+            self._position = 0
+            return 0
+        raise io.UnsupportedOperation('StoredChunksReader only supports rewinding')
+
+    def readinto(self, buffer):
+        while self._index < len(self.names):
+            if self._current is None:
+                self._current = self.storage.open(self.names[self._index], 'rb')
+            data = self._current.read(len(buffer))
+            if data:
+                buffer[:len(data)] = data
+                self._position += len(data)
+                return len(data)
+            self._close_current()
+            self._index += 1
+        return 0
+
+    def _close_current(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+    def close(self):
+        self._close_current()
+        super().close()
+
+
+def get_target_object(target, object_id):
+    model, _ = UPLOAD_TARGETS[target]
+    return model.objects.filter(pk=object_id).first()
+
+
+def target_campaign(obj):
+    """Campaign that owns the upload target, for access checks"""
+    if isinstance(obj, CampaignContent):
+        return obj.collaboration.campaign
+    return obj
+
+
+def parse_content_range(header):
+    """
+    Parse 'bytes <start>-<end>/<total>' into (start, end, total).
+    Returns None when the header is missing or malformed.
+    """
+    if not header or not header.startswith('bytes '):
+        return None
+    try:
+        byte_range, total = header[6:].split('/', 1)
+        start, end = byte_range.split('-', 1)
+        return int(start), int(end), int(total)
+    except ValueError:
+        return None
+
+
+def _check_chunk(session, start, length):
+    if session.status != 'uploading':
+        raise UploadError('Upload is not in progress', session.received_bytes)
+    if start != session.received_bytes:
+        raise UploadError('Unexpected chunk offset', session.received_bytes)
+    if length > UPLOAD_CHUNK_SIZE or start + length > session.total_size:
+        raise UploadError('Chunk too large', session.received_bytes)
+
+
+def write_chunk(session, stream, start, length):
+    """
+    Store one chunk and advance the session. Only the next expected offset is
+    accepted, so a retried chunk after a timeout is either rejected or a
+    clean resume. The body is read and stored before the row lock is taken.
+    """
+    # Fail fast before reading the body; re-checked under the lock below
+    _check_chunk(session, start, length)
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as buffer:
+        written = 0
+        while written < length:
+            block = stream.read(min(READ_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            buffer.write(block)
+            written += len(block)
+        if written != length:
+            raise UploadError('Incomplete chunk body', session.received_bytes)
+        buffer.seek(0)
+        name = default_storage.save(chunk_name(session, start), File(buffer))
+
+    try:
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(pk=session.pk)
+            _check_chunk(session, start, length)
+            session.chunks = session.chunks + [name]
+            session.received_bytes = start + length
+            session.save(update_fields=['chunks', 'received_bytes', 'updated_at'])
+    except Exception:
+        # Lost the race for this offset (or the save failed): drop our copy
+        default_storage.delete(name)
+        raise
+    return session
+
+
+def complete_upload(session):
+    """
+    Stream the stored chunks into the target's FileField and drop them.
+    The session is claimed under a row lock first, so concurrent completes
+    cannot both attach the file. Returns the object the file was attached to.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status != 'uploading':
+            raise UploadError('Upload is not in progress', session.received_bytes)
+        if session.received_bytes != session.total_size:
+            raise UploadError('Upload is incomplete', session.received_bytes)
+        session.status = 'assembling'
+        session.save(update_fields=['status', 'updated_at'])
+
+    try:
+        obj = get_target_object(session.target, session.object_id)
+        if obj is None:
+            raise UploadError('Upload target no longer exists')
+
+        _, field_name = UPLOAD_TARGETS[session.target]
+        with StoredChunksReader(session.chunks, session.total_size) as chunks:
+            # FieldFile.save copies in File.chunks() blocks, so memory stays flat
+            getattr(obj, field_name).save(session.filename, File(chunks, name=session.filename), save=False)
+
+        update_fields = [field_name]
+        if isinstance(obj, CampaignContent):
+            obj.media_status = 'pending'
+            update_fields.append('media_status')
+        obj.save(update_fields=update_fields)
+    except Exception:
+        # Let the client retry the completion
+        UploadSession.objects.filter(pk=session.pk).update(status='uploading', updated_at=timezone.now())
+        raise
+
+    session.status = 'complete'
+    session.file_path = getattr(obj, field_name).name
+    session.completed_at = timezone.now()
+    session.save(update_fields=['status', 'file_path', 'completed_at', 'updated_at'])
+
+    delete_chunks(session)
+    return obj
+
+
+def delete_chunks(session):
+    """Delete the session's stored chunks, including ones never accepted"""
+    names = set(session.chunks or [])
+    try:
+        _, files = default_storage.listdir(staging_dir(session))
+        names.update(f'{staging_dir(session)}/{name}' for name in files)
+    except (FileNotFoundError, NotImplementedError):
+        pass
+    for name in names:
+        default_storage.delete(name)
+
+
+def discard_upload(session, status='expired'):
+    delete_chunks(session)
+    session.status = status
+    session.save(update_fields=['status', 'updated_at'])
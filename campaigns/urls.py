@@ -18,6 +18,7 @@ urlpatterns = [
     # Collaborations
     path('<int:pk>/collaborations/', views.api_collaborations, name='api_collaborations'),
     path('<int:pk>/invite-influencer/', views.api_invite_influencer, name='api_invite_influencer'),
+    path('<int:pk>/invite-influencers/', views.api_bulk_invite_influencers, name='api_bulk_invite_influencers'),
     path('<int:campaign_pk>/collaborations/<int:pk>/', views.api_update_collaboration, name='api_update_collaboration'),
     path('collaboration/<int:pk>/', views.api_collaboration_detail, name='api_collaboration_detail'),
     path('collaboration/<int:pk>/update-status/', views.api_update_collaboration_status, name='api_update_collaboration_status'),
@@ -28,6 +29,12 @@ urlpatterns = [
     path('<int:campaign_pk>/content/<int:pk>/', views.api_update_content, name='api_update_content'),
     path('content/<int:pk>/review/', views.api_review_content, name='api_review_content'),
     path('content/<int:pk>/update-metrics/', views.api_update_content_metrics, name='api_update_content_metrics'),
+    path('content/bulk-update-metrics/', views.api_bulk_update_content_metrics, name='api_bulk_update_content_metrics'),
+    
+    # Chunked uploads
+    path('uploads/', views.api_create_upload, name='api_create_upload'),
+    path('uploads/<uuid:upload_id>/', views.api_upload_detail, name='api_upload_detail'),
+    path('uploads/<uuid:upload_id>/complete/', views.api_complete_upload, name='api_complete_upload'),
     
     # Analytics
     path('<int:pk>/analytics/', views.api_campaign_analytics, name='api_campaign_analytics'),
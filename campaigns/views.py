@@ -9,11 +9,21 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from django.shortcuts import get_object_or_404
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from decimal import Decimal
 
-from .models import Campaign, InfluencerCollaboration, CampaignContent, CampaignAnalytics
+from .models import Campaign, InfluencerCollaboration, CampaignContent, CampaignAnalytics, UploadSession
+from .analytics import (
+    apply_content_metric_deltas,
+    content_metric_deltas,
+    get_campaign_analytics,
+    mark_campaign_dirty,
+    recompute_campaign_analytics,
+    snapshot_content_metrics,
+)
 from .serializers import (
     CampaignListSerializer,
     CampaignDetailSerializer,
@@ -24,8 +34,33 @@ from .serializers import (
     CampaignContentSerializer,
     CampaignContentCreateSerializer,
     CampaignAnalyticsSerializer,
+    ContentMetricsUpdateSerializer,
+    UploadSessionSerializer,
+    UploadSessionCreateSerializer,
+)
+from .uploads import (
+    MAX_UPLOAD_SIZE,
+    UPLOAD_CHUNK_SIZE,
+    UploadError,
+    complete_upload,
+    discard_upload,
+    get_target_object,
+    parse_content_range,
+    target_campaign,
+    write_chunk,
 )
 from agencies.models import Agency
+from agencies.access import get_access_context
+from agencies.permissions import (
+    check_subscription_limits, get_subscription_error, subscription_limit_message,
+)
+
+
+MAX_BULK_METRIC_UPDATES = 1000
+
+MAX_BULK_INVITES = 500
+
+BULK_METRIC_FIELDS = ['likes_count', 'comments_count', 'shares_count', 'views_count', 'post_url']
 
 
 class CampaignPagination(PageNumberPagination):
@@ -55,7 +90,9 @@ class CampaignListAPIView(generics.ListAPIView):
         if not agency:
             return Campaign.objects.none()
         
-        queryset = Campaign.objects.filter(agency=agency).order_by('-created_at')
+        queryset = Campaign.objects.filter(agency=agency).with_budget_totals().annotate(
+            performance_score=Coalesce('analytics__performance_score', 0)
+        )
         
         # Filter by status
         status_filter = self.request.query_params.get('status', None)
@@ -76,6 +113,33 @@ class CampaignListAPIView(generics.ListAPIView):
         if campaign_type:
             queryset = queryset.filter(campaign_type=campaign_type)
         
+        # Filter by stored performance score
+        min_score = self.request.query_params.get('min_score', None)
+        if min_score:
+            try:
+                queryset = queryset.filter(performance_score__gte=int(min_score))
+            except ValueError:
+                pass
+        
+        max_score = self.request.query_params.get('max_score', None)
+        if max_score:
+            try:
+                queryset = queryset.filter(performance_score__lte=int(max_score))
+            except ValueError:
+                pass
+        
+        # Sorting
+        sort_by = self.request.query_params.get('sort_by', '-created_at')
+        if sort_by in ['performance', '-performance']:
+            queryset = queryset.order_by(
+                '-performance_score' if sort_by == '-performance' else 'performance_score',
+                '-created_at',
+            )
+        elif sort_by in ['created_at', '-created_at', 'start_date', '-start_date', 'name', '-name']:
+            queryset = queryset.order_by(sort_by)
+        else:
+            queryset = queryset.order_by('-created_at')
+        
         return queryset
 
 
@@ -226,6 +290,13 @@ def api_invite_influencer(request, pk):
         from influencers.models import Influencer
         influencer = get_object_or_404(Influencer, pk=influencer_id)
         
+        limit_error = _influencer_limit_error(campaign, 1)
+        if limit_error:
+            return Response(
+                {'error': str(limit_error)},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
         collaboration = InfluencerCollaboration.objects.create(
             campaign=campaign,
             influencer=influencer,
@@ -235,6 +306,8 @@ def api_invite_influencer(request, pk):
             deadline=serializer.validated_data['deadline'],
             specific_requirements=serializer.validated_data.get('specific_requirements', ''),
         )
+        # Collaboration counts feed the completion and performance scores
+        mark_campaign_dirty(campaign.id)
         
         return Response(
             CollaborationDetailSerializer(collaboration).data,
@@ -243,6 +316,133 @@ def api_invite_influencer(request, pk):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_bulk_invite_influencers(request, pk):
+    """
+    POST /api/campaigns/<id>/invite-influencers/
+    Invite many influencers at once
+    Body: {
+        "terms": {"contentType", "deliverablesCount", "agreedRate", "deadline", ...},
+        "invitations": [{"influencerId", ...per-row overrides of terms}, ...]
+    }
+    or {"terms": {...}, "influencerIds": [...]} when every row shares the terms
+    """
+    campaign = get_object_or_404(Campaign, pk=pk)
+    
+    if not _has_campaign_access(request.user, campaign):
+        return Response(
+            {'error': 'Permission denied'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    terms = request.data.get('terms') or {}
+    invitations = request.data.get('invitations')
+    if invitations is None and isinstance(request.data.get('influencerIds'), list):
+        invitations = [{'influencerId': influencer_id} for influencer_id in request.data['influencerIds']]
+    
+    if not isinstance(terms, dict) or not isinstance(invitations, list) or not invitations:
+        return Response(
+            {'error': 'invitations (or influencerIds) must be a non-empty list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(invitations) > MAX_BULK_INVITES:
+        return Response(
+            {'error': f'At most {MAX_BULK_INVITES} invitations per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Subscription is checked once for the whole batch
+    subscription_error = get_subscription_error(campaign.agency)
+    if subscription_error:
+        return Response(
+            {'error': str(subscription_error)},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    # Validate every row against the shared terms
+    results = [None] * len(invitations)
+    valid_rows = []
+    seen = set()
+    for index, row in enumerate(invitations):
+        row_data = {**terms, **row} if isinstance(row, dict) else {'influencerId': row}
+        serializer = CollaborationCreateSerializer(data=row_data)
+        if not serializer.is_valid():
+            results[index] = {
+                'influencerId': row_data.get('influencerId'),
+                'status': 'invalid',
+                'errors': serializer.errors,
+            }
+            continue
+        influencer_id = serializer.validated_data['influencer_id']
+        if influencer_id in seen:
+            results[index] = {'influencerId': influencer_id, 'status': 'duplicate'}
+            continue
+        seen.add(influencer_id)
+        valid_rows.append((index, serializer.validated_data))
+    
+    from influencers.models import Influencer
+    
+    created_count = 0
+    with transaction.atomic():
+        # Serialize concurrent invites for this campaign
+        Campaign.objects.select_for_update().filter(pk=campaign.pk).values_list('pk').first()
+        
+        existing_ids = set(
+            campaign.collaborations.filter(influencer_id__in=seen).values_list('influencer_id', flat=True)
+        )
+        known_ids = set(
+            Influencer.objects.filter(id__in=seen, is_active=True).values_list('id', flat=True)
+        )
+        
+        to_create = []
+        for index, data in valid_rows:
+            influencer_id = data['influencer_id']
+            if influencer_id not in known_ids:
+                results[index] = {'influencerId': influencer_id, 'status': 'not_found'}
+            elif influencer_id in existing_ids:
+                results[index] = {'influencerId': influencer_id, 'status': 'already_invited'}
+            else:
+                to_create.append((index, InfluencerCollaboration(
+                    campaign=campaign,
+                    influencer_id=influencer_id,
+                    content_type=data['content_type'],
+                    deliverables_count=data.get('deliverables_count', 1),
+                    agreed_rate=data['agreed_rate'],
+                    currency=data.get('currency', 'MAD'),
+                    deadline=data['deadline'],
+                    specific_requirements=data.get('specific_requirements', ''),
+                    notes=data.get('notes'),
+                )))
+        
+        # Plan quota for the whole batch, counted under the campaign lock
+        limit_error = _influencer_limit_error(campaign, len(to_create)) if to_create else None
+        if limit_error:
+            return Response(
+                {'error': str(limit_error)},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        created = InfluencerCollaboration.objects.bulk_create([c for _, c in to_create])
+        for (index, _), collaboration in zip(to_create, created):
+            results[index] = {
+                'influencerId': collaboration.influencer_id,
+                'status': 'invited',
+                'collaborationId': collaboration.pk,
+            }
+        created_count = len(created)
+    
+    if created_count:
+        # One recompute for the whole batch
+        mark_campaign_dirty(campaign.id)
+    
+    return Response({
+        'invited': created_count,
+        'failed': len(results) - created_count,
+        'results': results,
+    }, status=status.HTTP_201_CREATED if created_count else status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def api_collaboration_detail(request, pk):
@@ -289,6 +489,11 @@ def api_update_collaboration(request, campaign_pk, pk):
             collaboration.responded_at = timezone.now()
     
     collaboration.save()
+    
+    # Total spent only counts completed collaborations
+    if 'agreed_rate' in request.data or 'status' in request.data:
+        mark_campaign_dirty(collaboration.campaign_id)
+    
     return Response(CollaborationDetailSerializer(collaboration).data)
 
 
@@ -321,11 +526,17 @@ def api_update_collaboration_status(request, pk):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    previous_status = collaboration.status
     collaboration.status = new_status
     if new_status in ['accepted', 'declined']:
         collaboration.responded_at = timezone.now()
     collaboration.save()
     
+    # Spend and the completion/performance scores depend on collaboration
+    # statuses; repeated changes within the window share one recompute
+    if previous_status != new_status:
+        mark_campaign_dirty(collaboration.campaign_id)
+    
     return Response(CollaborationDetailSerializer(collaboration).data)
 
 
@@ -371,6 +582,12 @@ def api_create_content(request, pk):
     serializer = CampaignContentCreateSerializer(data=request.data)
     if serializer.is_valid():
         content = serializer.save(collaboration=collaboration)
+        if content.image or content.video:
+            _queue_media_processing(content)
+        apply_content_metric_deltas(
+            collaboration.campaign_id, content_metric_deltas({}, content)
+        )
+        mark_campaign_dirty(collaboration.campaign_id)
         return Response(
             CampaignContentSerializer(content).data,
             status=status.HTTP_201_CREATED
@@ -378,6 +595,15 @@ def api_create_content(request, pk):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _valid_post_url(value):
+    """post_url is empty or an http(s) URL; it is later passed to the metrics endpoint"""
+    try:
+        CampaignContent._meta.get_field('post_url').clean(value, None)
+    except DjangoValidationError:
+        return False
+    return True
+
+
 @api_view(['PUT', 'PATCH'])
 @permission_classes([IsAuthenticated])
 def api_update_content(request, campaign_pk, pk):
@@ -399,6 +625,12 @@ def api_update_content(request, campaign_pk, pk):
             status=status.HTTP_403_FORBIDDEN
         )
     
+    if 'post_url' in request.data and not _valid_post_url(request.data['post_url']):
+        return Response(
+            {'error': 'post_url must be an http(s) URL'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
     # Update allowed fields
     allowed_fields = ['title', 'caption', 'post_url', 'status', 'feedback']
     for field in allowed_fields:
@@ -414,9 +646,6 @@ def api_update_content(request, campaign_pk, pk):
     
     content.save()
     
-    # Update campaign analytics
-    _update_campaign_analytics(content.collaboration.campaign)
-    
     return Response(CampaignContentSerializer(content).data)
 
 
@@ -466,6 +695,14 @@ def api_update_content_metrics(request, pk):
             status=status.HTTP_403_FORBIDDEN
         )
     
+    if 'post_url' in request.data and not _valid_post_url(request.data['post_url']):
+        return Response(
+            {'error': 'post_url must be an http(s) URL'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    before = snapshot_content_metrics(content)
+    
     # Update metrics
     if 'likes_count' in request.data:
         content.likes_count = int(request.data['likes_count'])
@@ -480,12 +717,210 @@ def api_update_content_metrics(request, pk):
     
     content.save()
     
-    # Update campaign analytics
-    _update_campaign_analytics(content.collaboration.campaign)
+    # Apply only the changes to the campaign totals now, reconcile in the background
+    deltas = content_metric_deltas(before, content)
+    if deltas:
+        apply_content_metric_deltas(content.collaboration.campaign_id, deltas)
+        mark_campaign_dirty(content.collaboration.campaign_id)
     
     return Response(CampaignContentSerializer(content).data)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_bulk_update_content_metrics(request):
+    """
+    POST /api/campaigns/content/bulk-update-metrics/
+    Update performance metrics for many content items in one request
+    Body: {"updates": [{"contentId", "likes", "comments", "shares", "views", "postUrl"}, ...]}
+    """
+    updates = request.data.get('updates')
+    if not isinstance(updates, list) or not updates:
+        return Response(
+            {'error': 'updates must be a non-empty list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(updates) > MAX_BULK_METRIC_UPDATES:
+        return Response(
+            {'error': f'At most {MAX_BULK_METRIC_UPDATES} updates per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    serializer = ContentMetricsUpdateSerializer(data=updates, many=True)
+    if not serializer.is_valid():
+        return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Later rows for the same content win
+    rows = {row['content_id']: row for row in serializer.validated_data}
+    results = {}
+    campaign_deltas = {}
+    
+    with transaction.atomic():
+        contents = CampaignContent.objects.select_for_update(of=('self',)).filter(
+            id__in=rows
+        ).select_related('collaboration__campaign__agency')
+        
+        # One access check per campaign, not per content item
+        access = {}
+        changed = []
+        for content in contents:
+            campaign = content.collaboration.campaign
+            if campaign.id not in access:
+                access[campaign.id] = _has_campaign_access(request.user, campaign)
+            if not access[campaign.id]:
+                results[content.id] = 'permission_denied'
+                continue
+            
+            before = snapshot_content_metrics(content)
+            for field, value in rows[content.id].items():
+                if field in BULK_METRIC_FIELDS:
+                    setattr(content, field, value)
+            changed.append(content)
+            results[content.id] = 'updated'
+            
+            deltas = campaign_deltas.setdefault(campaign.id, {})
+            for field, delta in content_metric_deltas(before, content).items():
+                deltas[field] = deltas.get(field, 0) + delta
+        
+        if changed:
+            # bulk_update skips auto_now; report cache watermarks read updated_at
+            now = timezone.now()
+            for content in changed:
+                content.updated_at = now
+            CampaignContent.objects.bulk_update(changed, BULK_METRIC_FIELDS + ['updated_at'], batch_size=500)
+        
+        # Each affected campaign's totals move once, by the summed deltas
+        for campaign_id, deltas in campaign_deltas.items():
+            apply_content_metric_deltas(campaign_id, {f: d for f, d in deltas.items() if d})
+    
+    for campaign_id in campaign_deltas:
+        mark_campaign_dirty(campaign_id)
+    
+    results = [
+        {'contentId': content_id, 'status': results.get(content_id, 'not_found')}
+        for content_id in rows
+    ]
+    updated_count = sum(1 for result in results if result['status'] == 'updated')
+    
+    return Response({
+        'updated': updated_count,
+        'failed': len(results) - updated_count,
+        'results': results,
+    })
+
+
+# ===========================================
+# CHUNKED UPLOAD VIEWS
+# ===========================================
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_create_upload(request):
+    """
+    POST /api/campaigns/uploads/
+    Start a resumable upload for a content image/video or a campaign file
+    Body: {"target", "objectId", "filename", "contentType", "totalSize"}
+    """
+    serializer = UploadSessionCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    data = serializer.validated_data
+    if data['total_size'] > MAX_UPLOAD_SIZE:
+        return Response(
+            {'error': f'File exceeds the maximum size of {MAX_UPLOAD_SIZE} bytes'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    target = get_target_object(data['target'], data['object_id'])
+    if target is None:
+        return Response(
+            {'error': 'Upload target not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    if not _has_campaign_access(request.user, target_campaign(target)):
+        return Response(
+            {'error': 'Permission denied'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    session = serializer.save(user=request.user)
+    response_data = UploadSessionSerializer(session).data
+    response_data['chunkSize'] = UPLOAD_CHUNK_SIZE
+    return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def api_upload_detail(request, upload_id):
+    """
+    GET    /api/campaigns/uploads/<id>/  - upload status, receivedBytes to resume from
+    PUT    /api/campaigns/uploads/<id>/  - raw chunk body with Content-Range: bytes start-end/total
+    DELETE /api/campaigns/uploads/<id>/  - abort and discard received data
+    """
+    session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+    
+    if request.method == 'GET':
+        return Response(UploadSessionSerializer(session).data)
+    
+    if request.method == 'DELETE':
+        discard_upload(session, status='failed')
+        return Response({'message': 'Upload cancelled'})
+    
+    content_range = parse_content_range(request.META.get('HTTP_CONTENT_RANGE'))
+    if content_range is None:
+        return Response(
+            {'error': 'Content-Range header required: bytes <start>-<end>/<total>'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    start, end, total = content_range
+    length = end - start + 1
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    if total != session.total_size or length <= 0 or content_length != length:
+        return Response(
+            {'error': 'Content-Range does not match the upload or request body'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        # Read the raw body stream, never request.data, so the chunk is not buffered
+        session = write_chunk(session, request.stream, start, length)
+    except UploadError as e:
+        return Response(
+            {'error': str(e), 'receivedBytes': e.received_bytes},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    return Response(UploadSessionSerializer(session).data)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_complete_upload(request, upload_id):
+    """
+    POST /api/campaigns/uploads/<id>/complete/
+    Move the assembled file into storage and attach it to its target
+    """
+    session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+    
+    try:
+        target = complete_upload(session)
+    except UploadError as e:
+        return Response(
+            {'error': str(e), 'receivedBytes': e.received_bytes},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    if isinstance(target, CampaignContent):
+        _queue_media_processing(target)
+    
+    session.refresh_from_db()
+    return Response(UploadSessionSerializer(session).data)
+
+
 # ===========================================
 # ANALYTICS VIEWS
 # ===========================================
@@ -505,20 +940,11 @@ def api_campaign_analytics(request, pk):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    # Get or create analytics
-    analytics, created = CampaignAnalytics.objects.get_or_create(campaign=campaign)
-    
-    # Update with fresh data
-    _update_campaign_analytics(campaign)
-    analytics.refresh_from_db()
+    # Totals are maintained on write, reads only load the stored row
+    analytics = get_campaign_analytics(campaign)
     
     serializer = CampaignAnalyticsSerializer(analytics)
-    data = serializer.data
-    
-    # Add performance score
-    data['performanceScore'] = _calculate_performance_score(campaign)
-    
-    return Response(data)
+    return Response(serializer.data)
 
 
 @api_view(['POST'])
@@ -536,7 +962,7 @@ def api_refresh_analytics(request, pk):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    analytics = _update_campaign_analytics(campaign)
+    analytics = recompute_campaign_analytics(campaign)
     
     return Response({
         'message': 'Analytics refreshed successfully',
@@ -550,160 +976,35 @@ def api_refresh_analytics(request, pk):
 
 def _get_user_agency(user):
     """Get agency for user (as owner or team member)"""
-    from agencies.models import Agency
-    
-    # Try different possible TeamMember model names
-    TeamMember = None
-    try:
-        from agencies.models import TeamMember
-    except ImportError:
-        try:
-            from agencies.models import AgencyTeamMember as TeamMember
-        except ImportError:
-            pass
-    
-    # Check if user owns an agency - try 'user' field first (based on your model)
-    try:
-        return Agency.objects.get(user=user)
-    except (Agency.DoesNotExist, Exception):
-        pass
-    
-    # Also try 'owner' field as fallback
-    try:
-        return Agency.objects.get(owner=user)
-    except (Agency.DoesNotExist, Exception):
-        pass
-    
-    # Check if user is a team member
-    if TeamMember:
-        try:
-            membership = TeamMember.objects.filter(user=user, is_active=True).first()
-            if membership:
-                return membership.agency
-        except Exception:
-            pass
-    
-    # Try via team_members related name
-    try:
-        from agencies.models import Agency
-        agency = Agency.objects.filter(team_members__user=user, team_members__is_active=True).first()
-        if agency:
-            return agency
-    except Exception:
-        pass
-    
-    return None
+    return get_access_context(user).get_agency()
 
 
 def _has_campaign_access(user, campaign):
     """Check if user has access to campaign"""
-    # Try different possible TeamMember model names
-    TeamMember = None
-    try:
-        from agencies.models import TeamMember
-    except ImportError:
-        try:
-            from agencies.models import AgencyTeamMember as TeamMember
-        except ImportError:
-            pass
-    
-    # Agency owner - try 'user' field first (based on your model)
-    if hasattr(campaign.agency, 'user') and campaign.agency.user == user:
-        return True
-    if hasattr(campaign.agency, 'owner') and campaign.agency.owner == user:
-        return True
-    
-    # Team member
-    if TeamMember:
-        return TeamMember.objects.filter(
-            agency=campaign.agency,
-            user=user,
-            is_active=True
-        ).exists()
-    
-    # Try via team_members related name
-    try:
-        return campaign.agency.team_members.filter(user=user, is_active=True).exists()
-    except Exception:
-        pass
-    
-    return False
+    return get_access_context(user).has_access(campaign.agency_id)
 
 
-def _update_campaign_analytics(campaign):
-    """Update campaign analytics from all content"""
-    analytics, created = CampaignAnalytics.objects.get_or_create(campaign=campaign)
-    
-    # Aggregate from all content
-    all_content = CampaignContent.objects.filter(collaboration__campaign=campaign)
-    
-    analytics.total_likes = sum(c.likes_count for c in all_content)
-    analytics.total_comments = sum(c.comments_count for c in all_content)
-    analytics.total_shares = sum(c.shares_count for c in all_content)
-    analytics.total_reach = sum(c.views_count for c in all_content)
-    analytics.total_impressions = analytics.total_reach  # Simplified
-    
-    # Calculate engagement rate
-    total_engagement = analytics.total_likes + analytics.total_comments + analytics.total_shares
-    if analytics.total_reach > 0:
-        analytics.avg_engagement_rate = (total_engagement / analytics.total_reach) * 100
-    
-    # Financial metrics
-    analytics.total_spent = campaign.get_total_spent()
-    if total_engagement > 0:
-        analytics.cost_per_engagement = analytics.total_spent / total_engagement
-    
-    # ROI calculation
-    analytics.estimated_value = total_engagement * Decimal('0.50')
-    if analytics.total_spent > 0:
-        analytics.roi_percentage = float(
-            ((analytics.estimated_value - analytics.total_spent) / analytics.total_spent) * 100
-        )
-    
-    analytics.save()
-    return analytics
+def _influencer_limit_error(campaign, new_count):
+    """Upgrade message if new_count more influencers exceed the plan's per-campaign limit"""
+    _, limit, current = check_subscription_limits(
+        campaign.agency, 'campaign_influencers', current_count=campaign.collaborations.count()
+    )
+    if limit and current + new_count > limit:
+        return subscription_limit_message('campaign_influencers', limit)
+    return None
 
 
-def _calculate_performance_score(campaign):
-    """Calculate overall performance score (0-100)"""
+def _queue_media_processing(content):
+    """Queue thumbnail/poster/rendition generation for content media"""
+    CampaignContent.objects.filter(pk=content.pk).update(media_status='pending')
+    content.media_status = 'pending'
+    transaction.on_commit(lambda: _dispatch_media_processing(content.pk))
+
+
+def _dispatch_media_processing(content_id):
+    # Runs after commit, so the worker reads the new media file
     try:
-        analytics = campaign.analytics
-        score = 0
-        
-        # Engagement rate (40 points)
-        if analytics.avg_engagement_rate >= 5.0:
-            score += 40
-        elif analytics.avg_engagement_rate >= 3.0:
-            score += 32
-        elif analytics.avg_engagement_rate >= 1.5:
-            score += 24
-        
-        # Reach (25 points)
-        if analytics.total_reach >= 100000:
-            score += 25
-        elif analytics.total_reach >= 50000:
-            score += 20
-        elif analytics.total_reach >= 10000:
-            score += 15
-        
-        # ROI (25 points)
-        if analytics.roi_percentage >= 100:
-            score += 25
-        elif analytics.roi_percentage >= 50:
-            score += 20
-        elif analytics.roi_percentage >= 0:
-            score += 15
-        
-        # Completion rate (10 points)
-        total_collabs = campaign.collaborations.count()
-        completed_collabs = campaign.collaborations.filter(status='completed').count()
-        if total_collabs > 0:
-            completion_rate = (completed_collabs / total_collabs) * 100
-            if completion_rate >= 90:
-                score += 10
-            elif completion_rate >= 75:
-                score += 8
-        
-        return min(score, 100)
-    except:
-        return 0
+        from .tasks import process_content_media
+        process_content_media.delay(content_id)
+    except Exception:
+        pass  # Task queue may not be set up
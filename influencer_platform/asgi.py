@@ -14,3 +14,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'influencer_platform.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.LOOKALIKE_WARM_ON_STARTUP:
+    # Web processes only: the first lookalike query would otherwise pay for the build.
+    # Deferred to the first request so preforked workers each build after the fork
+    from influencers.lookalike import lookalike_index  # noqa: E402
+    lookalike_index.warm_on_first_request()
@@ -145,6 +145,10 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Chunked, resumable uploads (campaigns.uploads); chunks are staged in the default storage
+CHUNKED_UPLOAD_CHUNK_SIZE = config('CHUNKED_UPLOAD_CHUNK_SIZE', default=8 * 1024 * 1024, cast=int)
+CHUNKED_UPLOAD_MAX_SIZE = config('CHUNKED_UPLOAD_MAX_SIZE', default=4 * 1024 * 1024 * 1024, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -359,4 +363,37 @@ CELERY_TASK_SOFT_TIME_LIMIT = 3000  # 50 minutes
 
 # Worker configuration
 CELERY_WORKER_PREFETCH_MULTIPLIER = 1
-CELERY_WORKER_MAX_TASKS_PER_CHILD = 1000
\ No newline at end of file
+CELERY_WORKER_MAX_TASKS_PER_CHILD = 1000
+
+# Build the lookalike influencer index in the background on a web process's first
+# request. Off by default so tests and management commands never build it; the
+# Docker image turns it on for the web server
+LOOKALIKE_WARM_ON_STARTUP = config('LOOKALIKE_WARM_ON_STARTUP', default=False, cast=bool)
+
+# Campaign analytics: dirty campaigns are recomputed at most once per window (seconds)
+CAMPAIGN_ANALYTICS_RECOMPUTE_WINDOW = config('CAMPAIGN_ANALYTICS_RECOMPUTE_WINDOW', default=60, cast=int)
+
+# Campaign reports with more campaigns than this are collected in parallel chunks
+REPORT_COLLECTION_CHUNK_SIZE = config('REPORT_COLLECTION_CHUNK_SIZE', default=50, cast=int)
+
+# Seconds without a heartbeat before an in-flight report run counts as lost and is re-dispatched
+REPORT_INFLIGHT_TIMEOUT = config('REPORT_INFLIGHT_TIMEOUT', default=CELERY_TASK_TIME_LIMIT, cast=int)
+
+# Chart rendering processes per report worker process. Each Celery prefork child
+# starts its own pool, so a host runs worker concurrency x this many renderers;
+# 1 renders in the worker process itself
+CHART_RENDER_WORKERS = config('CHART_RENDER_WORKERS', default=2, cast=int)
+
+# Scheduled reports: due subscriptions claimed per batch, and batches per beat run
+SCHEDULED_REPORTS_BATCH_SIZE = config('SCHEDULED_REPORTS_BATCH_SIZE', default=100, cast=int)
+SCHEDULED_REPORTS_MAX_BATCHES = config('SCHEDULED_REPORTS_MAX_BATCHES', default=50, cast=int)
+
+# Published content metrics refresh (campaigns.metrics_refresh)
+# Fetcher class path; the default reads JSON from CONTENT_METRICS_ENDPOINT, an http(s) template with '{url}'.
+# Without an endpoint the scheduled refresh is skipped; post URLs themselves are never requested
+CONTENT_METRICS_FETCHER = config('CONTENT_METRICS_FETCHER', default='campaigns.metrics_refresh.JsonMetricsFetcher')
+CONTENT_METRICS_ENDPOINT = config('CONTENT_METRICS_ENDPOINT', default='')
+CONTENT_METRICS_TIMEOUT = config('CONTENT_METRICS_TIMEOUT', default=10, cast=int)
+CONTENT_METRICS_CONCURRENCY = config('CONTENT_METRICS_CONCURRENCY', default=8, cast=int)
+# Minimum seconds between requests to the same domain
+CONTENT_METRICS_DOMAIN_INTERVAL = config('CONTENT_METRICS_DOMAIN_INTERVAL', default=1.0, cast=float)
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Batch computation of InfluencerAnalytics
+Account metrics are aggregated in the database, scores are computed with
+NumPy over a whole batch, and rows are written back with bulk_update
+"""
+
+import logging
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Influencer, InfluencerAnalytics, SponsoredPost
+from .queries import annotate_account_metrics
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_BATCH_SIZE = 2000
+
+# Collaboration statuses that count as a brand collaboration on record
+COLLABORATION_STATUSES = [
+    'accepted', 'in_progress', 'content_submitted', 'approved', 'published', 'completed',
+]
+
+ACCOUNT_METRICS = [
+    'followers_total', 'following_total', 'engagement_weighted',
+    'primary_avg_views', 'primary_avg_likes', 'primary_avg_comments',
+    'primary_growth_rate_14d',
+]
+
+# Typical engagement rate (%) per follower tier, used to judge authenticity
+EXPECTED_ENGAGEMENT = np.array([8.0, 5.0, 3.0, 2.0, 1.5])
+TIER_THRESHOLDS = np.array([1000, 10000, 100000, 1000000])
+
+UPDATE_FIELDS = [
+    'avg_engagement_rate', 'collaboration_count', 'authenticity_score',
+    'influence_score', 'updated_at',
+]
+
+# Scores recorded in the influencer metric time series
+SERIES_FIELDS = ['avg_engagement_rate', 'collaboration_count', 'authenticity_score', 'influence_score']
+
+
+def _count_subquery(queryset):
+    return Coalesce(Subquery(
+        queryset.order_by().values('influencer').annotate(total=Count('pk')).values('total')[:1],
+        output_field=IntegerField(),
+    ), 0)
+
+
+def _collect_batch(influencer_ids):
+    """One query returning aggregated metrics for a batch of influencers"""
+    from campaigns.models import InfluencerCollaboration
+
+    queryset = annotate_account_metrics(
+        Influencer.objects.filter(id__in=influencer_ids), ACCOUNT_METRICS
+    ).annotate(
+        sponsored_total=_count_subquery(
+            SponsoredPost.objects.filter(influencer=OuterRef('pk'))
+        ),
+        collaborations_total=_count_subquery(
+            InfluencerCollaboration.objects.filter(
+                influencer=OuterRef('pk'), status__in=COLLABORATION_STATUSES
+            )
+        ),
+    )
+    return list(queryset.order_by('id').values_list(
+        'id', *ACCOUNT_METRICS, 'sponsored_total', 'collaborations_total'
+    ))
+
+
+def compute_scores(rows):
+    """
+    Vectorized scoring for a batch of rows from _collect_batch().
+    Returns dict of NumPy arrays keyed by InfluencerAnalytics field.
+    """
+    data = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), -1)
+    (followers, following, engagement, views, likes, comments,
+     growth, sponsored, collaborations) = data.T
+
+    has_followers = followers > 0
+    safe_followers = np.where(has_followers, followers, 1.0)
+
+    # Authenticity: start at 100 and subtract penalties for common fraud signals
+    tier = np.searchsorted(TIER_THRESHOLDS, followers, side='right')
+    expected = EXPECTED_ENGAGEMENT[tier]
+    engagement_ratio = engagement / expected
+    penalty = np.zeros(len(rows))
+    # Engagement far below the tier norm suggests inactive or bought followers
+    penalty += np.where(engagement_ratio < 0.2, 30.0, np.where(engagement_ratio < 0.5, 15.0, 0.0))
+    # Engagement far above the tier norm suggests engagement pods or bought likes
+    penalty += np.where(engagement_ratio > 4.0, 20.0, 0.0)
+    # Follow-for-follow accounts follow more people than follow them
+    follow_ratio = following / safe_followers
+    penalty += np.clip((follow_ratio - 0.5) * 20.0, 0.0, 20.0)
+    # Sudden follower jumps in 14 days
+    penalty += np.clip((growth - 20.0) * 0.5, 0.0, 20.0)
+    # Likes with almost no comments
+    comment_ratio = np.where(likes > 0, comments / np.where(likes > 0, likes, 1.0), 1.0)
+    penalty += np.where(comment_ratio < 0.005, 10.0, 0.0)
+    authenticity = np.where(has_followers, np.clip(100.0 - penalty, 0.0, 100.0), 0.0)
+
+    # Influence: reach, engagement and view-through, weighted by authenticity
+    reach = np.clip(np.log10(followers + 1.0) / 7.0, 0.0, 1.0)
+    engagement_score = np.clip(engagement / 10.0, 0.0, 1.0)
+    view_rate = np.clip(views / safe_followers, 0.0, 1.0)
+    collaboration_total = sponsored + collaborations
+    experience = np.clip(np.log1p(collaboration_total) / np.log1p(50.0), 0.0, 1.0)
+    raw_influence = 0.45 * reach + 0.3 * engagement_score + 0.15 * view_rate + 0.1 * experience
+    influence = np.clip(100.0 * raw_influence * np.sqrt(authenticity / 100.0), 0.0, 100.0)
+
+    return {
+        'avg_engagement_rate': np.round(engagement, 4),
+        'collaboration_count': collaboration_total.astype(np.int64),
+        'authenticity_score': np.round(authenticity, 2),
+        'influence_score': np.round(influence, 2),
+    }
+
+
+def _write_batch(rows, scores):
+    """Create missing analytics rows and bulk_update all of them"""
+    influencer_ids = [row[0] for row in rows]
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {
+            analytics.influencer_id: analytics
+            for analytics in InfluencerAnalytics.objects.filter(influencer_id__in=influencer_ids)
+        }
+        missing = [
+            InfluencerAnalytics(influencer_id=influencer_id)
+            for influencer_id in influencer_ids if influencer_id not in existing
+        ]
+        if missing:
+            # A concurrent refresh may have created some of them already; the
+            # re-read below picks up whichever row won
+            InfluencerAnalytics.objects.bulk_create(
+                missing, batch_size=ANALYTICS_BATCH_SIZE, ignore_conflicts=True
+            )
+            existing.update({
+                analytics.influencer_id: analytics
+                for analytics in InfluencerAnalytics.objects.filter(
+                    influencer_id__in=[m.influencer_id for m in missing]
+                )
+            })
+
+        to_update = []
+        for i, influencer_id in enumerate(influencer_ids):
+            analytics = existing[influencer_id]
+            analytics.avg_engagement_rate = float(scores['avg_engagement_rate'][i])
+            analytics.collaboration_count = int(scores['collaboration_count'][i])
+            analytics.authenticity_score = float(scores['authenticity_score'][i])
+            analytics.influence_score = float(scores['influence_score'][i])
+            # bulk_update skips auto_now, keep updated_at meaningful
+            analytics.updated_at = now
+            to_update.append(analytics)
+
+        InfluencerAnalytics.objects.bulk_update(to_update, UPDATE_FIELDS, batch_size=ANALYTICS_BATCH_SIZE)
+
+    record_analytics_points(to_update, now)
+    return len(missing)
+
+
+def record_analytics_points(analytics_rows, timestamp=None):
+    """
+    Add refreshed scores to each influencer's metric time series, once per
+    agency that has collaborated with the influencer (series are scoped by
+    agency). A failure is logged and never fails the refresh.
+    """
+    from campaigns.models import InfluencerCollaboration
+    from reports.timeseries import record_points
+
+    analytics_rows = list(analytics_rows)
+    try:
+        pairs = InfluencerCollaboration.objects.filter(
+            influencer_id__in=[analytics.influencer_id for analytics in analytics_rows]
+        ).order_by().values_list('influencer_id', 'campaign__agency_id').distinct()
+        agencies = {}
+        for influencer_id, agency_id in pairs:
+            agencies.setdefault(influencer_id, []).append(agency_id)
+
+        # Savepoint: a failed insert must not break a caller's transaction
+        with transaction.atomic():
+            return record_points('influencer', [
+                (
+                    agency_id,
+                    analytics.influencer_id,
+                    {field: float(getattr(analytics, field) or 0) for field in SERIES_FIELDS},
+                )
+                for analytics in analytics_rows
+                for agency_id in agencies.get(analytics.influencer_id, [])
+            ], timestamp)
+    except Exception as e:
+        logger.error(f"Failed to record influencer analytics points: {str(e)}")
+        return 0
+
+
+def _refresh_batch(influencer_ids):
+    rows = _collect_batch(influencer_ids)
+    if not rows:
+        return 0, 0
+    return len(rows), _write_batch(rows, compute_scores(rows))
+
+
+def refresh_influencer_analytics(influencer_ids=None, batch_size=ANALYTICS_BATCH_SIZE):
+    """
+    Recompute analytics for the given influencers (all active ones by default).
+    Returns (processed, created) counts.
+    """
+    if influencer_ids is None:
+        id_iter = Influencer.objects.filter(is_active=True).order_by('id').values_list(
+            'id', flat=True
+        ).iterator(chunk_size=batch_size)
+    else:
+        id_iter = iter(sorted(set(influencer_ids)))
+
+    processed = created = 0
+    batch = []
+    for influencer_id in id_iter:
+        batch.append(influencer_id)
+        if len(batch) >= batch_size:
+            done, new = _refresh_batch(batch)
+            processed, created = processed + done, created + new
+            batch = []
+    if batch:
+        done, new = _refresh_batch(batch)
+        processed, created = processed + done, created + new
+
+    logger.info(f"Influencer analytics refreshed: {processed} processed, {created} created")
+    return processed, created
@@ -0,0 +1,112 @@
+"""
+Streaming influencer exports (CSV / NDJSON)
+Rows are produced from a server-side cursor so memory stays flat no matter
+how many influencers match the filters
+"""
+
+import csv
+import json
+
+from django.db.models import Prefetch
+
+from .models import SocialMediaAccount
+
+EXPORT_CHUNK_SIZE = 2000
+
+BASE_COLUMNS = [
+    'id', 'username', 'full_name', 'email', 'primary_category', 'secondary_categories',
+    'country', 'location', 'language', 'gender', 'age', 'is_verified',
+    'total_followers', 'engagement_rate',
+]
+
+# Per-platform columns, flattened as <platform>_<metric>
+ACCOUNT_COLUMNS = [
+    ('username', 'username'),
+    ('followers', 'followers_count'),
+    ('engagement_rate', 'engagement_rate'),
+    ('avg_views', 'avg_views'),
+    ('avg_likes', 'avg_likes'),
+    ('avg_comments', 'avg_comments'),
+    ('posts', 'posts_count'),
+]
+
+PLATFORMS = [choice[0] for choice in SocialMediaAccount.PLATFORM_CHOICES]
+
+EXPORT_COLUMNS = BASE_COLUMNS + [
+    f'{platform}_{column}' for platform in PLATFORMS for column, _ in ACCOUNT_COLUMNS
+]
+
+INFLUENCER_FIELDS = [
+    'id', 'username', 'full_name', 'email', 'primary_category', 'secondary_categories',
+    'country', 'location', 'language', 'gender', 'age', 'is_verified', 'created_at',
+]
+
+
+def prepare_export_queryset(queryset):
+    """Restrict columns and prefetch active accounts in chunk-sized batches"""
+    accounts = SocialMediaAccount.objects.filter(is_active=True).only(
+        'influencer', 'platform', *[field for _, field in ACCOUNT_COLUMNS]
+    ).order_by('-followers_count')
+    return queryset.only(*INFLUENCER_FIELDS).prefetch_related(
+        Prefetch('social_accounts', queryset=accounts, to_attr='export_accounts')
+    )
+
+
+def influencer_row(influencer):
+    """Flatten an influencer and its prefetched accounts into one export row"""
+    row = {
+        'id': influencer.id,
+        'username': influencer.username,
+        'full_name': influencer.full_name,
+        'email': influencer.email,
+        'primary_category': influencer.primary_category,
+        'secondary_categories': influencer.secondary_categories,
+        'country': influencer.country,
+        'location': influencer.location,
+        'language': influencer.language,
+        'gender': influencer.gender,
+        'age': influencer.age,
+        'is_verified': influencer.is_verified,
+    }
+
+    total_followers = 0
+    weighted_engagement = 0.0
+    for account in influencer.export_accounts:
+        total_followers += account.followers_count
+        weighted_engagement += account.engagement_rate * account.followers_count
+        # Accounts are ordered by followers, so the first one per platform wins
+        if f'{account.platform}_username' in row:
+            continue
+        for column, field in ACCOUNT_COLUMNS:
+            row[f'{account.platform}_{column}'] = getattr(account, field)
+
+    row['total_followers'] = total_followers
+    row['engagement_rate'] = round(weighted_engagement / total_followers, 4) if total_followers else 0.0
+    return row
+
+
+def iter_influencer_rows(queryset):
+    """Yield export rows using a server-side cursor"""
+    for influencer in prepare_export_queryset(queryset).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield influencer_row(influencer)
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer streaming"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset):
+    """Yield CSV lines, header first so the response starts immediately"""
+    writer = csv.DictWriter(_Echo(), fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+    yield writer.writeheader()
+    for row in iter_influencer_rows(queryset):
+        yield writer.writerow(row)
+
+
+def stream_ndjson(queryset):
+    """Yield one JSON document per line"""
+    for row in iter_influencer_rows(queryset):
+        yield json.dumps(row, default=str) + '\n'
@@ -0,0 +1,410 @@
+"""
+Lookalike influencer search
+Keeps a normalized NumPy feature matrix of all active influencers in memory
+and serves top-k cosine-similar influencers from it
+"""
+
+import logging
+import math
+import threading
+import time
+
+import numpy as np
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.utils import timezone
+
+from .models import (
+    Influencer, SocialMediaAccount, InfluencerAnalytics, InfluencerTagging,
+)
+
+logger = logging.getLogger(__name__)
+
+# Cache key bumped by writers (imports, admin actions) so every web process
+# picks up changes on its next query instead of waiting for the interval
+STALE_MARKER_KEY = 'influencers:lookalike:stale_marker'
+
+# Seconds between incremental refresh checks when nothing marked the index stale
+REFRESH_INTERVAL = 300
+
+# Influencers per query in an incremental refresh, keeping id__in lists bounded
+REFRESH_CHUNK_SIZE = 500
+
+WARM_DISPATCH_UID = 'influencers.lookalike.warm_on_first_request'
+
+PLATFORMS = [choice[0] for choice in SocialMediaAccount.PLATFORM_CHOICES]
+CATEGORIES = [choice[0] for choice in Influencer.CATEGORY_CHOICES]
+AUDIENCE_FIELDS = [
+    'audience_age_13_17', 'audience_age_18_24', 'audience_age_25_34',
+    'audience_age_35_44', 'audience_age_45_54', 'audience_age_55_plus',
+    'audience_gender_male', 'audience_gender_female',
+]
+TAG_BUCKETS = 16
+
+# Feature layout: [numeric | platforms | categories | audience | tags]
+NUMERIC_FEATURES = [
+    'log_total_followers', 'log_max_followers', 'engagement_rate',
+    'log_avg_views', 'log_avg_likes', 'log_avg_comments',
+    'log_posts', 'growth_rate_14d',
+]
+N_NUMERIC = len(NUMERIC_FEATURES)
+PLATFORM_OFFSET = N_NUMERIC
+CATEGORY_OFFSET = PLATFORM_OFFSET + len(PLATFORMS)
+AUDIENCE_OFFSET = CATEGORY_OFFSET + len(CATEGORIES)
+TAG_OFFSET = AUDIENCE_OFFSET + len(AUDIENCE_FIELDS)
+N_FEATURES = TAG_OFFSET + TAG_BUCKETS
+
+SECONDARY_CATEGORY_WEIGHT = 0.5
+
+
+def _collect_features(influencer_ids=None):
+    """
+    Build raw (unscaled) feature rows straight from value queries.
+    Returns (ids, features, countries, platform_bits) for active influencers,
+    optionally restricted to influencer_ids.
+    """
+    influencers = Influencer.objects.filter(is_active=True)
+    accounts = SocialMediaAccount.objects.filter(is_active=True, influencer__is_active=True)
+    analytics = InfluencerAnalytics.objects.filter(influencer__is_active=True)
+    taggings = InfluencerTagging.objects.filter(influencer__is_active=True)
+    if influencer_ids is not None:
+        influencers = influencers.filter(id__in=influencer_ids)
+        accounts = accounts.filter(influencer_id__in=influencer_ids)
+        analytics = analytics.filter(influencer_id__in=influencer_ids)
+        taggings = taggings.filter(influencer_id__in=influencer_ids)
+
+    rows = list(influencers.order_by('id').values_list(
+        'id', 'country', 'primary_category', 'secondary_categories'
+    ))
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    position = {influencer_id: i for i, influencer_id in enumerate(ids.tolist())}
+    features = np.zeros((len(rows), N_FEATURES), dtype=np.float32)
+    countries = []
+    platform_bits = np.zeros(len(rows), dtype=np.int16)
+
+    category_index = {category: i for i, category in enumerate(CATEGORIES)}
+    for i, (_, country, primary, secondary) in enumerate(rows):
+        countries.append((country or '').strip().lower())
+        if primary in category_index:
+            features[i, CATEGORY_OFFSET + category_index[primary]] = 1.0
+        if secondary:
+            for category in secondary.split(','):
+                category = category.strip().lower()
+                idx = category_index.get(category)
+                if idx is not None and category != primary:
+                    features[i, CATEGORY_OFFSET + idx] = max(
+                        features[i, CATEGORY_OFFSET + idx], SECONDARY_CATEGORY_WEIGHT
+                    )
+
+    # Social accounts: totals, follower-weighted engagement and primary account metrics
+    platform_index = {platform: i for i, platform in enumerate(PLATFORMS)}
+    totals = {}
+    account_rows = accounts.values_list(
+        'influencer_id', 'platform', 'followers_count', 'engagement_rate',
+        'avg_views', 'avg_likes', 'avg_comments', 'posts_count',
+        'followers_growth_rate_14d',
+    ).iterator(chunk_size=5000)
+    for (influencer_id, platform, followers, engagement, views, likes,
+         comments, posts, growth) in account_rows:
+        i = position.get(influencer_id)
+        if i is None:
+            continue
+        if platform in platform_index:
+            features[i, PLATFORM_OFFSET + platform_index[platform]] = 1.0
+            platform_bits[i] |= 1 << platform_index[platform]
+        agg = totals.setdefault(i, [0, 0.0, 0, -1, 0, 0, 0, 0.0])
+        agg[0] += followers
+        agg[1] += (engagement or 0.0) * followers
+        agg[2] += posts
+        if followers > agg[3]:
+            agg[3:8] = [followers, views, likes, comments, growth or 0.0]
+
+    for i, (total, weighted, posts, max_followers, views, likes, comments, growth) in totals.items():
+        features[i, 0] = math.log1p(total)
+        features[i, 1] = math.log1p(max(max_followers, 0))
+        features[i, 2] = weighted / total if total else 0.0
+        features[i, 3] = math.log1p(views)
+        features[i, 4] = math.log1p(likes)
+        features[i, 5] = math.log1p(comments)
+        features[i, 6] = math.log1p(posts)
+        # Clip growth so a single viral spike does not dominate the vector
+        features[i, 7] = max(min(growth, 100.0), -100.0)
+
+    for row in analytics.values_list('influencer_id', *AUDIENCE_FIELDS).iterator(chunk_size=5000):
+        i = position.get(row[0])
+        if i is not None:
+            features[i, AUDIENCE_OFFSET:TAG_OFFSET] = np.asarray(row[1:], dtype=np.float32) / 100.0
+
+    for influencer_id, tag_id in taggings.values_list('influencer_id', 'tag_id').iterator(chunk_size=5000):
+        i = position.get(influencer_id)
+        if i is not None:
+            features[i, TAG_OFFSET + tag_id % TAG_BUCKETS] = 1.0
+
+    return ids, features, countries, platform_bits
+
+
+class _IndexState:
+    """
+    Immutable snapshot of the index, including the scaling stats and country
+    codes its rows were built with. Builders assemble a complete new state
+    and swap it in with one assignment, so readers never see a partial one.
+    """
+
+    def __init__(self, ids, matrix, country_codes, platform_bits, active, mean, std, country_lookup):
+        self.ids = ids
+        self.matrix = matrix
+        self.country_codes = country_codes
+        self.platform_bits = platform_bits
+        self.active = active
+        self.mean = mean
+        self.std = std
+        self.country_lookup = country_lookup
+        self.positions = {influencer_id: i for i, influencer_id in enumerate(ids.tolist())}
+
+
+def _collect_features_in_chunks(influencer_ids):
+    """_collect_features for many influencers, REFRESH_CHUNK_SIZE ids per query"""
+    ordered = sorted(influencer_ids)
+    parts = [
+        _collect_features(ordered[start:start + REFRESH_CHUNK_SIZE])
+        for start in range(0, len(ordered), REFRESH_CHUNK_SIZE)
+    ]
+    if len(parts) == 1:
+        return parts[0]
+    if not parts:
+        return _collect_features([])
+    return (
+        np.concatenate([part[0] for part in parts]),
+        np.vstack([part[1] for part in parts]),
+        [country for part in parts for country in part[2]],
+        np.concatenate([part[3] for part in parts]),
+    )
+
+
+def _encode_countries(countries, country_lookup):
+    """Country codes for rows, adding unseen countries to country_lookup"""
+    codes = np.empty(len(countries), dtype=np.int32)
+    for i, country in enumerate(countries):
+        codes[i] = country_lookup.setdefault(country, len(country_lookup))
+    return codes
+
+
+def _normalize(features, mean, std):
+    """Standardize numeric columns with the given stats, then L2-normalize rows"""
+    features = features.copy()
+    features[:, :N_NUMERIC] = (features[:, :N_NUMERIC] - mean) / std
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return features / norms
+
+
+class LookalikeIndex:
+    """In-memory cosine-similarity index over influencer feature vectors"""
+
+    def __init__(self):
+        self._state = None
+        # Serializes builds and freshness checks; queries read self._state without it
+        self._lock = threading.Lock()
+        self._synced_at = None
+        self._checked_at = 0.0
+        self._seen_marker = None
+
+    # -- building ---------------------------------------------------------
+
+    def _rebuild(self):
+        started = time.monotonic()
+        marker = cache.get(STALE_MARKER_KEY)
+        synced_at = timezone.now()
+        ids, features, countries, platform_bits = _collect_features()
+        if len(ids):
+            mean = features[:, :N_NUMERIC].mean(axis=0)
+            std = features[:, :N_NUMERIC].std(axis=0)
+            std[std == 0] = 1.0
+        else:
+            mean = np.zeros(N_NUMERIC, dtype=np.float32)
+            std = np.ones(N_NUMERIC, dtype=np.float32)
+        country_lookup = {}
+        self._state = _IndexState(
+            ids,
+            _normalize(features, mean, std),
+            _encode_countries(countries, country_lookup),
+            platform_bits,
+            np.ones(len(ids), dtype=bool),
+            mean,
+            std,
+            country_lookup,
+        )
+        self._synced_at = synced_at
+        self._checked_at = time.monotonic()
+        self._seen_marker = marker
+        logger.info(
+            f"Lookalike index rebuilt: {len(ids)} influencers in "
+            f"{time.monotonic() - started:.2f}s"
+        )
+
+    def _refresh(self, influencer_ids):
+        state = self._state
+        ids, features, countries, platform_bits = _collect_features_in_chunks(influencer_ids)
+        matrix = state.matrix.copy()
+        country_codes = state.country_codes.copy()
+        bits = state.platform_bits.copy()
+        active = state.active.copy()
+        country_lookup = dict(state.country_lookup)
+
+        # Anything requested but no longer returned was deleted or deactivated
+        for influencer_id in influencer_ids - set(ids.tolist()):
+            i = state.positions.get(influencer_id)
+            if i is not None:
+                active[i] = False
+
+        normalized = _normalize(features, state.mean, state.std)
+        codes = _encode_countries(countries, country_lookup)
+        new_rows = []
+        for row, influencer_id in enumerate(ids.tolist()):
+            i = state.positions.get(influencer_id)
+            if i is None:
+                new_rows.append(row)
+                continue
+            matrix[i] = normalized[row]
+            country_codes[i] = codes[row]
+            bits[i] = platform_bits[row]
+            active[i] = True
+
+        all_ids = state.ids
+        if new_rows:
+            all_ids = np.concatenate([all_ids, ids[new_rows]])
+            matrix = np.vstack([matrix, normalized[new_rows]])
+            country_codes = np.concatenate([country_codes, codes[new_rows]])
+            bits = np.concatenate([bits, platform_bits[new_rows]])
+            active = np.concatenate([active, np.ones(len(new_rows), dtype=bool)])
+
+        self._state = _IndexState(
+            all_ids, matrix, country_codes, bits, active, state.mean, state.std, country_lookup,
+        )
+
+    def rebuild(self):
+        """Full rebuild from the database"""
+        with self._lock:
+            self._rebuild()
+
+    def refresh(self, influencer_ids):
+        """Recompute rows for the given influencers, appending new ones"""
+        influencer_ids = set(influencer_ids)
+        if not influencer_ids:
+            return
+        with self._lock:
+            if self._state is None:
+                self._rebuild()
+            else:
+                self._refresh(influencer_ids)
+
+    def _changed_since(self, since):
+        # Tag removals touch Influencer.updated_at (see signals), so they show up here too
+        changed = set(Influencer.objects.filter(updated_at__gte=since).values_list('id', flat=True))
+        changed.update(SocialMediaAccount.objects.filter(
+            last_updated__gte=since).values_list('influencer_id', flat=True))
+        changed.update(InfluencerAnalytics.objects.filter(
+            updated_at__gte=since).values_list('influencer_id', flat=True))
+        changed.update(InfluencerTagging.objects.filter(
+            added_at__gte=since).values_list('influencer_id', flat=True))
+        return changed
+
+    def ensure_fresh(self):
+        """Build on first use, then apply incremental updates when marked stale or due"""
+        state = self._state
+        if state is not None:
+            # Fast path without the lock: nothing to do
+            due = time.monotonic() - self._checked_at >= REFRESH_INTERVAL
+            if not due and cache.get(STALE_MARKER_KEY) == self._seen_marker:
+                return
+
+        with self._lock:
+            # Another thread may have built or refreshed while we waited
+            if self._state is None:
+                self._rebuild()
+                return
+
+            marker = cache.get(STALE_MARKER_KEY)
+            due = time.monotonic() - self._checked_at >= REFRESH_INTERVAL
+            if marker == self._seen_marker and not due:
+                return
+
+            synced_at = timezone.now()
+            changed = self._changed_since(self._synced_at)
+            if changed:
+                self._refresh(changed)
+            self._synced_at = synced_at
+            self._checked_at = time.monotonic()
+            self._seen_marker = marker
+            if changed:
+                logger.info(f"Lookalike index refreshed for {len(changed)} influencers")
+
+    def warm(self):
+        """Build the index ahead of the first query; errors are logged, not raised"""
+        try:
+            self.ensure_fresh()
+        except Exception as e:
+            logger.error(f"Lookalike index warm-up failed: {str(e)}")
+
+    def warm_in_background(self):
+        """Warm from a daemon thread so process startup is not delayed"""
+        thread = threading.Thread(target=self.warm, name='lookalike-index-warm', daemon=True)
+        thread.start()
+        return thread
+
+    def warm_on_first_request(self):
+        """
+        Warm in the background when this process handles its first request.
+        Nothing runs at import time, so a preforking server (gunicorn
+        --preload) builds in each worker after the fork, not in the master.
+        """
+        def warm(sender, **kwargs):
+            request_started.disconnect(dispatch_uid=WARM_DISPATCH_UID)
+            self.warm_in_background()
+
+        request_started.connect(warm, weak=False, dispatch_uid=WARM_DISPATCH_UID)
+
+    # -- querying ---------------------------------------------------------
+
+    def similar_to(self, influencer_id, limit=20, country=None, platform=None):
+        """
+        Return [(influencer_id, score), ...] for the most similar influencers.
+        Raises KeyError if the influencer is not in the index.
+        """
+        self.ensure_fresh()
+        state = self._state
+        i = state.positions.get(influencer_id)
+        if i is None or not state.active[i]:
+            raise KeyError(influencer_id)
+
+        mask = state.active.copy()
+        mask[i] = False
+        if country:
+            code = state.country_lookup.get(country.strip().lower())
+            if code is None:
+                return []
+            mask &= state.country_codes == code
+        if platform:
+            platform = platform.strip().lower()
+            if platform not in PLATFORMS:
+                return []
+            mask &= (state.platform_bits & (1 << PLATFORMS.index(platform))) != 0
+
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+
+        # One matrix-vector product over the whole index, then pick from the candidates
+        scores = (state.matrix @ state.matrix[i])[candidates]
+        limit = min(limit, len(candidates))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(int(state.ids[candidates[j]]), float(scores[j])) for j in top]
+
+
+lookalike_index = LookalikeIndex()
+
+
+def mark_lookalike_index_stale():
+    """Signal every process to pick up changed influencers on its next query"""
+    cache.set(STALE_MARKER_KEY, time.time(), None)
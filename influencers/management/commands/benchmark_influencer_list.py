@@ -0,0 +1,148 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from influencers.models import Influencer
+from influencers.serializers import (
+    InfluencerListSerializer, InfluencerListValuesSerializer, parse_requested_fields,
+)
+from influencers.renderers import FastJSONRenderer
+import statistics
+import time
+
+
+class BaselineInfluencerListSerializer(serializers.ModelSerializer):
+    """
+    The list serializer as it was before annotations and sparse fieldsets:
+    account metrics come from model helpers that query per row
+    """
+    
+    fullName = serializers.SerializerMethodField()
+    primaryCategory = serializers.CharField(source='primary_category', default='', allow_null=True)
+    secondaryCategories = serializers.SerializerMethodField()
+    isVerified = serializers.BooleanField(source='is_verified', default=False)
+    isActive = serializers.BooleanField(source='is_active', default=True)
+    tier = serializers.SerializerMethodField()
+    totalFollowers = serializers.SerializerMethodField()
+    followerCount = serializers.SerializerMethodField()
+    engagementRate = serializers.SerializerMethodField()
+    avgViews = serializers.SerializerMethodField()
+    avgLikes = serializers.SerializerMethodField()
+    mediaCount = serializers.SerializerMethodField()
+    profilePictureUrl = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Influencer
+        fields = [
+            'id', 'fullName', 'username', 'email', 'bio', 'avatar',
+            'location', 'language', 'primaryCategory', 'secondaryCategories',
+            'country', 'isVerified', 'isActive',
+            'tier', 'totalFollowers', 'followerCount', 'engagementRate',
+            'avgViews', 'avgLikes', 'mediaCount', 'profilePictureUrl',
+        ]
+    
+    def get_fullName(self, obj):
+        return obj.full_name or obj.username or 'Unknown'
+    
+    def get_secondaryCategories(self, obj):
+        return obj.get_secondary_categories_list()
+    
+    def get_tier(self, obj):
+        return obj.get_follower_tier()
+    
+    def get_totalFollowers(self, obj):
+        return obj.get_total_followers()
+    
+    def get_followerCount(self, obj):
+        return self.get_totalFollowers(obj)
+    
+    def get_engagementRate(self, obj):
+        return obj.calculate_overall_engagement_rate()
+    
+    def get_avgViews(self, obj):
+        primary = obj.get_primary_account()
+        return primary.avg_views if primary else 0
+    
+    def get_avgLikes(self, obj):
+        primary = obj.get_primary_account()
+        return primary.avg_likes if primary else 0
+    
+    def get_mediaCount(self, obj):
+        return sum(sa.posts_count or 0 for sa in obj.social_accounts.all())
+    
+    def get_profilePictureUrl(self, obj):
+        return obj.avatar.url if obj.avatar else None
+
+
+class Command(BaseCommand):
+    help = 'Benchmark influencer list serialization: baseline serializer vs annotated vs values fast path'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=100,
+            help='Number of influencers serialized per run (default: 100)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of timed runs per variant (default: 5)'
+        )
+        parser.add_argument(
+            '--fields',
+            type=str,
+            default='',
+            help='Comma-separated sparse fieldset, e.g. id,fullName,tier,totalFollowers'
+        )
+    
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        repeat = options['repeat']
+        fields = parse_requested_fields(options['fields'], InfluencerListSerializer.Meta.fields)
+        
+        base = Influencer.objects.filter(is_active=True).order_by('-created_at')
+        if not base.exists():
+            raise CommandError('No active influencers to benchmark.')
+        
+        def baseline():
+            # Queryset, serializer and renderer as the list view used them before this change
+            queryset = base.select_related('user').prefetch_related('social_accounts', 'tags')[:page_size]
+            data = BaselineInfluencerListSerializer(queryset, many=True).data
+            return JSONRenderer().render(data)
+        
+        def annotated():
+            queryset = InfluencerListSerializer.prepare_queryset(base, fields)[:page_size]
+            data = InfluencerListSerializer(queryset, many=True, context={'fields': fields}).data
+            return FastJSONRenderer().render(data)
+        
+        def values_fast_path():
+            serializer = InfluencerListValuesSerializer(fields=fields)
+            data = serializer.serialize(serializer.prepare_queryset(base)[:page_size])
+            return FastJSONRenderer().render(data)
+        
+        self.stdout.write(
+            f'Serializing {page_size} influencers, {repeat} runs each, '
+            f'fields={",".join(fields) if fields else "all"}\n'
+        )
+        
+        for name, variant in [
+            ('baseline serializer', baseline),
+            ('annotated serializer', annotated),
+            ('values fast path', values_fast_path),
+        ]:
+            variant()  # warm up
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    payload = variant()
+                    timings.append((time.perf_counter() - started) * 1000)
+            
+            self.stdout.write(
+                f'{name:<22} median {statistics.median(timings):8.2f} ms  '
+                f'min {min(timings):8.2f} ms  queries {len(queries):4d}  '
+                f'bytes {len(payload):8d}'
+            )
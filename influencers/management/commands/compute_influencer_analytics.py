@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from influencers.analytics import ANALYTICS_BATCH_SIZE, refresh_influencer_analytics
+import time
+
+
+class Command(BaseCommand):
+    help = 'Precompute InfluencerAnalytics for all active influencers in batches'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ids',
+            type=str,
+            default='',
+            help='Comma-separated influencer IDs to recompute (default: all active)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ANALYTICS_BATCH_SIZE,
+            help=f'Influencers per batch (default: {ANALYTICS_BATCH_SIZE})'
+        )
+    
+    def handle(self, *args, **options):
+        influencer_ids = None
+        if options['ids']:
+            influencer_ids = [int(value) for value in options['ids'].split(',') if value.strip()]
+        
+        started = time.perf_counter()
+        processed, created = refresh_influencer_analytics(
+            influencer_ids, batch_size=max(options['batch_size'], 1)
+        )
+        elapsed = time.perf_counter() - started
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Computed analytics for {processed} influencers '
+                f'({created} new rows) in {elapsed:.2f}s'
+            )
+        )
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from influencers.thumbnails import avatars_needing_variants, generate_avatar_variants
+import time
+
+
+class Command(BaseCommand):
+    help = 'Backfill small WebP/JPEG avatar variants for influencers that are missing them'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximum number of influencers to process'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate variants for every influencer with an avatar'
+        )
+        parser.add_argument(
+            '--queue',
+            action='store_true',
+            help='Queue Celery tasks instead of processing in this process'
+        )
+    
+    def handle(self, *args, **options):
+        from influencers.models import Influencer
+        
+        if options['force']:
+            queryset = Influencer.objects.exclude(avatar='').exclude(avatar__isnull=True)
+        else:
+            queryset = avatars_needing_variants()
+        queryset = queryset.order_by('id').only(
+            'id', 'avatar', 'avatar_small', 'avatar_small_jpeg', 'avatar_small_source'
+        )
+        if options['limit']:
+            queryset = queryset[:options['limit']]
+        
+        if options['queue']:
+            from influencers.tasks import generate_avatar_thumbnails
+            queued = 0
+            for influencer_id in queryset.values_list('id', flat=True):
+                generate_avatar_thumbnails.delay(influencer_id)
+                queued += 1
+            self.stdout.write(self.style.SUCCESS(f'Queued {queued} avatar thumbnail tasks'))
+            return
+        
+        started = time.perf_counter()
+        generated = failed = 0
+        for influencer in queryset.iterator(chunk_size=500):
+            try:
+                generate_avatar_variants(influencer)
+                generated += 1
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f'Influencer {influencer.id}: {str(e)}'))
+        
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Generated avatar variants for {generated} influencers '
+                f'({failed} failed) in {elapsed:.2f}s'
+            )
+        )
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from influencers.models import Influencer, InfluencerDataImport
+from influencers.lookalike import mark_lookalike_index_stale
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 import os
@@ -201,6 +202,10 @@ class Command(BaseCommand):
                     data_import.error_log = '\n'.join(errors) if errors else None
                     data_import.completed_at = timezone.now()
                     data_import.save()
+            
+            if not dry_run:
+                # Let running API processes pick up the new influencers
+                mark_lookalike_index_stale()
         
         except Exception as e:
             if not dry_run:
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils import timezone
 from influencers.models import Influencer, SocialMediaAccount, InfluencerDataImport
+from influencers.lookalike import mark_lookalike_index_stale
 from django.contrib.auth import get_user_model
 import csv
 import os
@@ -202,6 +203,9 @@ class Command(BaseCommand):
                 data_import.error_log = '\n'.join(errors) if errors else None
                 data_import.completed_at = timezone.now()
                 data_import.save()
+                
+                # Let running API processes pick up the refreshed metrics
+                mark_lookalike_index_stale()
         
         except Exception as e:
             if not dry_run:
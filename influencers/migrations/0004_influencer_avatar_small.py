@@ -0,0 +1,37 @@
+# Generated by Django 4.2.11 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("influencers", "0003_remove_influencer_avg_comments_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="influencer",
+            name="avatar_small",
+            field=models.ImageField(
+                blank=True, null=True, upload_to="influencer_avatars/small/"
+            ),
+        ),
+        migrations.AddField(
+            model_name="influencer",
+            name="avatar_small_jpeg",
+            field=models.ImageField(
+                blank=True, null=True, upload_to="influencer_avatars/small/"
+            ),
+        ),
+        migrations.AddField(
+            model_name="influencer",
+            name="avatar_small_source",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Avatar file the variants were built from",
+                max_length=255,
+            ),
+        ),
+    ]
@@ -6,6 +6,20 @@ from django.utils import timezone
 from datetime import timedelta
 
 
+def get_tier_for_followers(followers):
+    """Map a follower count to its tier name"""
+    if followers < 1000:
+        return 'nano'
+    elif followers < 10000:
+        return 'micro'
+    elif followers < 100000:
+        return 'mid'
+    elif followers < 1000000:
+        return 'macro'
+    else:
+        return 'mega'
+
+
 class Influencer(models.Model):
     """Influencer profile model"""
     
@@ -43,6 +57,10 @@ class Influencer(models.Model):
     email = models.EmailField(blank=True, null=True)
     bio = models.TextField(blank=True, null=True)
     avatar = models.ImageField(upload_to='influencer_avatars/', blank=True, null=True)
+    # Fixed-size variants of avatar for list cards (see influencers.thumbnails)
+    avatar_small = models.ImageField(upload_to='influencer_avatars/small/', blank=True, null=True)
+    avatar_small_jpeg = models.ImageField(upload_to='influencer_avatars/small/', blank=True, null=True)
+    avatar_small_source = models.CharField(max_length=255, blank=True, default='', help_text=_('Avatar file the variants were built from'))
     
     # Demographics
     age = models.PositiveIntegerField(blank=True, null=True, validators=[MinValueValidator(13), MaxValueValidator(120)])
@@ -109,16 +127,7 @@ class Influencer(models.Model):
             if account.followers_count > max_followers:
                 max_followers = account.followers_count
         
-        if max_followers < 1000:
-            return 'nano'
-        elif max_followers < 10000:
-            return 'micro'
-        elif max_followers < 100000:
-            return 'mid'
-        elif max_followers < 1000000:
-            return 'macro'
-        else:
-            return 'mega'
+        return get_tier_for_followers(max_followers)
     
     def get_total_followers(self):
         """Get total followers across all platforms"""
@@ -214,16 +223,7 @@ class SocialMediaAccount(models.Model):
     
     def get_follower_tier(self):
         """Categorize influencer by follower count"""
-        if self.followers_count < 1000:
-            return 'nano'
-        elif self.followers_count < 10000:
-            return 'micro'
-        elif self.followers_count < 100000:
-            return 'mid'
-        elif self.followers_count < 1000000:
-            return 'macro'
-        else:
-            return 'mega'
+        return get_tier_for_followers(self.followers_count)
     
     def calculate_growth_rate(self):
         """Calculate and update growth rate"""
@@ -0,0 +1,83 @@
+"""
+Reusable queryset annotations for influencer list/detail endpoints
+Per-influencer social account metrics are computed with correlated subqueries
+so they stay correct whatever joins the filters add to the outer query
+"""
+
+from django.db.models import (
+    OuterRef, Subquery, Sum, Max, F, FloatField, IntegerField, ExpressionWrapper,
+)
+from django.db.models.functions import Cast, Coalesce
+
+from .models import SocialMediaAccount
+
+
+def _accounts(active_only=True):
+    accounts = SocialMediaAccount.objects.filter(influencer=OuterRef('pk')).order_by()
+    if active_only:
+        accounts = accounts.filter(is_active=True)
+    return accounts
+
+
+def _aggregate(accounts, aggregate, output_field):
+    return Subquery(
+        accounts.values('influencer').annotate(value=aggregate).values('value')[:1],
+        output_field=output_field,
+    )
+
+
+def _followers_total():
+    return Coalesce(_aggregate(_accounts(), Sum('followers_count'), IntegerField()), 0)
+
+
+def _following_total():
+    return Coalesce(_aggregate(_accounts(), Sum('following_count'), IntegerField()), 0)
+
+
+def _followers_max():
+    return Coalesce(_aggregate(_accounts(), Max('followers_count'), IntegerField()), 0)
+
+
+def _engagement_weighted():
+    # Same rule as Influencer.calculate_overall_engagement_rate: only accounts
+    # with both followers and a measured engagement rate take part
+    accounts = _accounts().filter(followers_count__gt=0, engagement_rate__gt=0)
+    weighted = ExpressionWrapper(
+        Sum(F('engagement_rate') * F('followers_count'), output_field=FloatField())
+        / Cast(Sum('followers_count'), FloatField()),
+        output_field=FloatField(),
+    )
+    return Coalesce(_aggregate(accounts, weighted, FloatField()), 0.0)
+
+
+def _posts_total():
+    return Coalesce(_aggregate(_accounts(active_only=False), Sum('posts_count'), IntegerField()), 0)
+
+
+def _primary_account_field(field, output_field=IntegerField, default=0):
+    def build():
+        return Coalesce(
+            Subquery(_accounts().order_by('-followers_count').values(field)[:1], output_field=output_field()),
+            default,
+        )
+    return build
+
+
+ACCOUNT_METRIC_ANNOTATIONS = {
+    'followers_total': _followers_total,
+    'followers_max': _followers_max,
+    'following_total': _following_total,
+    'engagement_weighted': _engagement_weighted,
+    'posts_total': _posts_total,
+    'primary_avg_views': _primary_account_field('avg_views'),
+    'primary_avg_likes': _primary_account_field('avg_likes'),
+    'primary_avg_comments': _primary_account_field('avg_comments'),
+    'primary_growth_rate_14d': _primary_account_field('followers_growth_rate_14d', FloatField, 0.0),
+}
+
+
+def annotate_account_metrics(queryset, names):
+    """Annotate only the requested account metrics onto an Influencer queryset"""
+    return queryset.annotate(**{
+        name: ACCOUNT_METRIC_ANNOTATIONS[name]() for name in names
+    })
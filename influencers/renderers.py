@@ -0,0 +1,31 @@
+"""
+Fast JSON rendering for large list responses
+Uses orjson when installed and falls back to DRF's JSONRenderer otherwise
+"""
+
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    # Lazy translation strings and anything else DRF would stringify
+    return str(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that serializes with orjson (compact, UTF-8)"""
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=_default)
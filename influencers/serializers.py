@@ -1,9 +1,12 @@
 # influencers/serializers.py
+from django.db.models import Prefetch
 from rest_framework import serializers
 
+from .queries import ACCOUNT_METRIC_ANNOTATIONS, annotate_account_metrics
+
 # Flexible imports to handle missing models
 try:
-    from .models import Influencer
+    from .models import Influencer, get_tier_for_followers
 except ImportError:
     Influencer = None
 
@@ -33,6 +36,25 @@ except ImportError:
     InfluencerTagging = None
 
 
+class SparseFieldsetMixin:
+    """Drop every field not listed in context['fields'] (the ?fields= parameter)"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+
+def parse_requested_fields(value, allowed):
+    """Parse a comma-separated ?fields= value, keeping only known fields"""
+    if not value:
+        return None
+    requested = [name.strip() for name in value.split(',') if name.strip() in allowed]
+    return requested or None
+
+
 class SocialMediaAccountSerializer(serializers.ModelSerializer):
     """Serializer for SocialMediaAccount - uses camelCase for frontend"""
     
@@ -123,7 +145,45 @@ class InfluencerTagSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'color']
 
 
-class InfluencerListSerializer(serializers.ModelSerializer):
+# Model columns and account-metric annotations each list field is built from
+LIST_FIELD_SOURCES = {
+    'id': ['id'],
+    'fullName': ['full_name', 'username'],
+    'username': ['username'],
+    'email': ['email'],
+    'bio': ['bio'],
+    'avatar': ['avatar'],
+    'location': ['location'],
+    'language': ['language'],
+    'primaryCategory': ['primary_category'],
+    'secondaryCategories': ['secondary_categories'],
+    'country': ['country'],
+    'isVerified': ['is_verified'],
+    'isActive': ['is_active'],
+    'tier': ['followers_max'],
+    'totalFollowers': ['followers_total'],
+    'followerCount': ['followers_total'],
+    'engagementRate': ['engagement_weighted'],
+    'avgViews': ['primary_avg_views'],
+    'avgLikes': ['primary_avg_likes'],
+    'mediaCount': ['posts_total'],
+    'profilePictureUrl': ['avatar', 'avatar_small', 'avatar_small_source'],
+    'profilePictureJpegUrl': ['avatar', 'avatar_small_jpeg', 'avatar_small_source'],
+}
+
+
+def _list_sources(fields):
+    """Split the sources of the requested list fields into (columns, annotations)"""
+    columns, annotations = [], []
+    for name in fields or LIST_FIELD_SOURCES:
+        for source in LIST_FIELD_SOURCES[name]:
+            target = annotations if source in ACCOUNT_METRIC_ANNOTATIONS else columns
+            if source not in target:
+                target.append(source)
+    return columns, annotations
+
+
+class InfluencerListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight serializer for list views"""
     
     fullName = serializers.SerializerMethodField()
@@ -140,7 +200,10 @@ class InfluencerListSerializer(serializers.ModelSerializer):
     avgViews = serializers.SerializerMethodField()
     avgLikes = serializers.SerializerMethodField()
     mediaCount = serializers.SerializerMethodField()
+    
+    # Small card-sized avatar variants, original avatar until they are generated
     profilePictureUrl = serializers.SerializerMethodField()
+    profilePictureJpegUrl = serializers.SerializerMethodField()
     
     class Meta:
         model = Influencer
@@ -150,8 +213,18 @@ class InfluencerListSerializer(serializers.ModelSerializer):
             'country', 'isVerified', 'isActive',
             'tier', 'totalFollowers', 'followerCount', 'engagementRate', 
             'avgViews', 'avgLikes', 'mediaCount', 'profilePictureUrl',
+            'profilePictureJpegUrl',
         ]
     
+    @classmethod
+    def prepare_queryset(cls, queryset, fields=None):
+        """
+        Annotate the account metrics needed by the requested fields, so the
+        method fields below never query per row
+        """
+        _, annotations = _list_sources(fields)
+        return annotate_account_metrics(queryset, annotations)
+    
     def get_fullName(self, obj):
         """Get full name, fallback to username if not set"""
         if hasattr(obj, 'full_name') and obj.full_name:
@@ -168,6 +241,8 @@ class InfluencerListSerializer(serializers.ModelSerializer):
         return []
     
     def get_tier(self, obj):
+        if hasattr(obj, 'followers_max'):
+            return get_tier_for_followers(obj.followers_max)
         if hasattr(obj, 'get_follower_tier'):
             return obj.get_follower_tier()
         followers = self.get_totalFollowers(obj)
@@ -182,6 +257,8 @@ class InfluencerListSerializer(serializers.ModelSerializer):
         return 'nano'
     
     def get_totalFollowers(self, obj):
+        if hasattr(obj, 'followers_total'):
+            return obj.followers_total
         if hasattr(obj, 'get_total_followers'):
             return obj.get_total_followers()
         if hasattr(obj, 'social_accounts'):
@@ -192,6 +269,8 @@ class InfluencerListSerializer(serializers.ModelSerializer):
         return self.get_totalFollowers(obj)
     
     def get_engagementRate(self, obj):
+        if hasattr(obj, 'engagement_weighted'):
+            return obj.engagement_weighted
         if hasattr(obj, 'calculate_overall_engagement_rate'):
             return obj.calculate_overall_engagement_rate()
         if hasattr(obj, 'social_accounts'):
@@ -201,32 +280,131 @@ class InfluencerListSerializer(serializers.ModelSerializer):
         return 0.0
     
     def get_avgViews(self, obj):
+        if hasattr(obj, 'primary_avg_views'):
+            return obj.primary_avg_views
         if hasattr(obj, 'get_primary_account'):
             primary = obj.get_primary_account()
             return primary.avg_views if primary and hasattr(primary, 'avg_views') else 0
         return 0
     
     def get_avgLikes(self, obj):
+        if hasattr(obj, 'primary_avg_likes'):
+            return obj.primary_avg_likes
         if hasattr(obj, 'get_primary_account'):
             primary = obj.get_primary_account()
             return primary.avg_likes if primary and hasattr(primary, 'avg_likes') else 0
         return 0
     
     def get_mediaCount(self, obj):
+        if hasattr(obj, 'posts_total'):
+            return obj.posts_total
         if hasattr(obj, 'social_accounts'):
             return sum(sa.posts_count or 0 for sa in obj.social_accounts.all())
         return 0
     
+    def _current_variant(self, obj, field_name):
+        """Avatar variant, only while it was built from the current avatar"""
+        variant = getattr(obj, field_name, None)
+        avatar = getattr(obj, 'avatar', None)
+        if variant and avatar and getattr(obj, 'avatar_small_source', '') == avatar.name:
+            return variant
+        return None
+    
     def get_profilePictureUrl(self, obj):
+        variant = self._current_variant(obj, 'avatar_small')
+        if variant:
+            return variant.url
         if hasattr(obj, 'avatar') and obj.avatar:
             return obj.avatar.url
         if hasattr(obj, 'profile_picture') and obj.profile_picture:
             return obj.profile_picture.url
         return None
+    
+    def get_profilePictureJpegUrl(self, obj):
+        variant = self._current_variant(obj, 'avatar_small_jpeg')
+        if variant:
+            return variant.url
+        if hasattr(obj, 'avatar') and obj.avatar:
+            return obj.avatar.url
+        return None
+
+
+class InfluencerListValuesSerializer:
+    """
+    Read-only fast path producing the same output as InfluencerListSerializer.
+    Rows come from .values() with annotated account metrics and are turned
+    into dicts directly, skipping model instances and per-field DRF overhead.
+    """
+    
+    def __init__(self, fields=None, request=None):
+        self.fields = fields or InfluencerListSerializer.Meta.fields
+        self.request = request
+        self.columns, self.annotations = _list_sources(fields)
+        self.avatar_storage = Influencer._meta.get_field('avatar').storage
+    
+    def prepare_queryset(self, queryset):
+        queryset = annotate_account_metrics(queryset, self.annotations)
+        return queryset.values(*self.columns, *self.annotations)
+    
+    def _file_url(self, name, absolute=False):
+        if not name:
+            return None
+        url = self.avatar_storage.url(name)
+        if absolute and self.request is not None:
+            return self.request.build_absolute_uri(url)
+        return url
+    
+    def _variant_name(self, row, column):
+        """Variant file name while it matches the current avatar, else the avatar"""
+        if row[column] and row['avatar'] and row['avatar_small_source'] == row['avatar']:
+            return row[column]
+        return row['avatar']
+    
+    def to_representation(self, row):
+        builders = {
+            'id': lambda: row['id'],
+            'fullName': lambda: row['full_name'] or row['username'] or 'Unknown',
+            'username': lambda: row['username'],
+            'email': lambda: row['email'],
+            'bio': lambda: row['bio'],
+            'avatar': lambda: self._file_url(row['avatar'], absolute=True),
+            'location': lambda: row['location'],
+            'language': lambda: row['language'],
+            'primaryCategory': lambda: row['primary_category'],
+            'secondaryCategories': lambda: (
+                [c.strip() for c in row['secondary_categories'].split(',')]
+                if row['secondary_categories'] else []
+            ),
+            'country': lambda: row['country'],
+            'isVerified': lambda: row['is_verified'],
+            'isActive': lambda: row['is_active'],
+            'tier': lambda: get_tier_for_followers(row['followers_max']),
+            'totalFollowers': lambda: row['followers_total'],
+            'followerCount': lambda: row['followers_total'],
+            'engagementRate': lambda: row['engagement_weighted'],
+            'avgViews': lambda: row['primary_avg_views'],
+            'avgLikes': lambda: row['primary_avg_likes'],
+            'mediaCount': lambda: row['posts_total'],
+            'profilePictureUrl': lambda: self._file_url(self._variant_name(row, 'avatar_small')),
+            'profilePictureJpegUrl': lambda: self._file_url(self._variant_name(row, 'avatar_small_jpeg')),
+        }
+        return {name: builders[name]() for name in self.fields}
+    
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+# Number of most recent sponsored posts embedded in the detail payload
+RECENT_SPONSORED_POSTS = 20
 
 
 class InfluencerDetailSerializer(serializers.ModelSerializer):
-    """Full serializer with nested data for detail views"""
+    """
+    Full serializer with nested data for detail views
+    
+    All nested and computed fields read from the objects loaded by
+    prepare_queryset(), so a detail view costs a fixed number of queries
+    """
     
     fullName = serializers.CharField(source='full_name')
     primaryCategory = serializers.CharField(source='primary_category', default='')
@@ -236,8 +414,8 @@ class InfluencerDetailSerializer(serializers.ModelSerializer):
     isActive = serializers.BooleanField(source='is_active', default=True)
     createdAt = serializers.DateTimeField(source='created_at', read_only=True, required=False)
     
-    # Nested serializers
-    socialAccounts = SocialMediaAccountSerializer(source='social_accounts', many=True, read_only=True)
+    # Nested data
+    socialAccounts = serializers.SerializerMethodField()
     analytics = serializers.SerializerMethodField()
     sponsoredPosts = serializers.SerializerMethodField()
     
@@ -260,6 +438,33 @@ class InfluencerDetailSerializer(serializers.ModelSerializer):
             'tier', 'totalFollowers', 'followerCount', 'engagementRate', 'profilePictureUrl',
         ]
     
+    @classmethod
+    def prepare_queryset(cls, queryset):
+        """
+        Prefetch plan for the detail payload:
+        analytics joined in, active accounts by followers, recent sponsored posts
+        """
+        return queryset.select_related('analytics').prefetch_related(
+            Prefetch(
+                'social_accounts',
+                queryset=SocialMediaAccount.objects.filter(is_active=True).order_by('-followers_count'),
+                to_attr='active_accounts',
+            ),
+            Prefetch(
+                'sponsored_posts',
+                queryset=SponsoredPost.objects.order_by('-posted_at')[:RECENT_SPONSORED_POSTS],
+                to_attr='recent_sponsored_posts',
+            ),
+        )
+    
+    def _active_accounts(self, obj):
+        """Active accounts ordered by followers, from the prefetch when available"""
+        accounts = getattr(obj, 'active_accounts', None)
+        if accounts is None:
+            accounts = list(obj.social_accounts.filter(is_active=True).order_by('-followers_count'))
+            obj.active_accounts = accounts
+        return accounts
+    
     def get_secondaryCategories(self, obj):
         if hasattr(obj, 'get_secondary_categories_list'):
             return obj.get_secondary_categories_list()
@@ -267,54 +472,43 @@ class InfluencerDetailSerializer(serializers.ModelSerializer):
             return [c.strip() for c in obj.secondary_categories.split(',')]
         return []
     
+    def get_socialAccounts(self, obj):
+        return SocialMediaAccountSerializer(self._active_accounts(obj), many=True).data
+    
     def get_tier(self, obj):
-        if hasattr(obj, 'get_follower_tier'):
-            return obj.get_follower_tier()
-        followers = self.get_totalFollowers(obj)
-        if followers >= 1000000:
-            return 'mega'
-        elif followers >= 500000:
-            return 'macro'
-        elif followers >= 50000:
-            return 'mid'
-        elif followers >= 10000:
-            return 'micro'
-        return 'nano'
+        accounts = self._active_accounts(obj)
+        # Accounts are ordered by followers, so the first one is the largest
+        return get_tier_for_followers(accounts[0].followers_count if accounts else 0)
     
     def get_totalFollowers(self, obj):
-        if hasattr(obj, 'get_total_followers'):
-            return obj.get_total_followers()
-        if hasattr(obj, 'social_accounts'):
-            return sum(sa.followers_count or 0 for sa in obj.social_accounts.all())
-        return 0
+        return sum(account.followers_count for account in self._active_accounts(obj))
     
     def get_followerCount(self, obj):
         return self.get_totalFollowers(obj)
     
     def get_engagementRate(self, obj):
-        if hasattr(obj, 'calculate_overall_engagement_rate'):
-            return obj.calculate_overall_engagement_rate()
-        if hasattr(obj, 'social_accounts'):
-            accounts = list(obj.social_accounts.all())
-            if accounts:
-                return sum(sa.engagement_rate or 0 for sa in accounts) / len(accounts)
+        # Same weighting as Influencer.calculate_overall_engagement_rate
+        total_followers = 0
+        weighted_engagement = 0
+        for account in self._active_accounts(obj):
+            if account.followers_count > 0 and account.engagement_rate > 0:
+                total_followers += account.followers_count
+                weighted_engagement += account.engagement_rate * account.followers_count
+        if total_followers > 0:
+            return weighted_engagement / total_followers
         return 0.0
     
     def get_analytics(self, obj):
-        if hasattr(obj, 'analytics'):
-            try:
-                return InfluencerAnalyticsSerializer(obj.analytics).data
-            except Exception:
-                pass
-        return None
+        try:
+            return InfluencerAnalyticsSerializer(obj.analytics).data
+        except InfluencerAnalytics.DoesNotExist:
+            return None
     
     def get_sponsoredPosts(self, obj):
-        if hasattr(obj, 'sponsored_posts'):
-            try:
-                return SponsoredPostSerializer(obj.sponsored_posts.all(), many=True).data
-            except Exception:
-                pass
-        return []
+        posts = getattr(obj, 'recent_sponsored_posts', None)
+        if posts is None:
+            posts = obj.sponsored_posts.order_by('-posted_at')[:RECENT_SPONSORED_POSTS]
+        return SponsoredPostSerializer(posts, many=True).data
     
     def get_profilePictureUrl(self, obj):
         if hasattr(obj, 'avatar') and obj.avatar:
@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Influencer, InfluencerTagging
+
+
+@receiver(post_save, sender=Influencer)
+def queue_avatar_thumbnails(sender, instance, **kwargs):
+    """Build small avatar variants when the avatar file changes"""
+    avatar_name = instance.avatar.name if instance.avatar else ''
+    if avatar_name == (instance.avatar_small_source or ''):
+        return
+    # After commit, so the worker reads the new avatar even inside atomic imports
+    transaction.on_commit(lambda: _dispatch_avatar_thumbnails(instance.pk))
+
+
+def _dispatch_avatar_thumbnails(influencer_id):
+    try:
+        from .tasks import generate_avatar_thumbnails
+        generate_avatar_thumbnails.delay(influencer_id)
+    except Exception:
+        pass  # Task queue may not be set up, the backfill command catches up
+
+
+@receiver(post_save, sender=InfluencerTagging)
+@receiver(post_delete, sender=InfluencerTagging)
+def mark_lookalike_tags_changed(sender, instance, **kwargs):
+    """
+    Tags feed the lookalike vectors. Removals leave no row behind, so touch
+    the influencer's updated_at for the incremental refresh to find it
+    """
+    from .lookalike import mark_lookalike_index_stale
+    if kwargs.get('signal') is post_delete:
+        Influencer.objects.filter(pk=instance.influencer_id).update(updated_at=timezone.now())
+    mark_lookalike_index_stale()
@@ -0,0 +1,43 @@
+# influencers/tasks.py
+# Celery tasks for influencer background processing
+
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def compute_influencer_analytics(influencer_ids=None):
+    """
+    Recompute InfluencerAnalytics in batches (all active influencers by default)
+    """
+    try:
+        from .analytics import refresh_influencer_analytics
+
+        processed, created = refresh_influencer_analytics(influencer_ids)
+        return f"Influencer analytics computed: {processed} processed, {created} created"
+
+    except Exception as e:
+        logger.error(f"Error computing influencer analytics: {str(e)}")
+        return f"Failed to compute influencer analytics: {str(e)}"
+
+
+@shared_task
+def generate_avatar_thumbnails(influencer_id):
+    """
+    Build the small WebP/JPEG avatar variants for one influencer
+    """
+    try:
+        from .models import Influencer
+        from .thumbnails import generate_avatar_variants
+
+        influencer = Influencer.objects.get(pk=influencer_id)
+        generate_avatar_variants(influencer)
+        return f"Avatar thumbnails generated for influencer {influencer_id}"
+
+    except Influencer.DoesNotExist:
+        return f"Influencer {influencer_id} not found"
+    except Exception as e:
+        logger.error(f"Error generating avatar thumbnails for influencer {influencer_id}: {str(e)}")
+        return f"Failed to generate avatar thumbnails: {str(e)}"
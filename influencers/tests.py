@@ -1,3 +1,174 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .analytics import refresh_influencer_analytics
+from .lookalike import LookalikeIndex, _collect_features
+from .models import (
+    Influencer, InfluencerAnalytics, InfluencerTag, InfluencerTagging, SocialMediaAccount,
+)
+from .serializers import InfluencerListSerializer, InfluencerListValuesSerializer
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def create_influencer(username, followers, country='Morocco', category='fashion'):
+    influencer = Influencer.objects.create(
+        full_name=username.title(), username=username, primary_category=category, country=country,
+    )
+    SocialMediaAccount.objects.create(
+        influencer=influencer, platform='instagram', username=username,
+        url=f'https://instagram.com/{username}', followers_count=followers,
+        engagement_rate=3.0, avg_views=followers // 10, avg_likes=followers // 50, posts_count=100,
+    )
+    return influencer
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LookalikeIndexTests(TestCase):
+
+    def setUp(self):
+        self.source = create_influencer('source', 120000)
+        self.close = create_influencer('close', 110000)
+        self.far = create_influencer('far', 900, country='France', category='gaming')
+        self.index = LookalikeIndex()
+
+    def test_ranks_similar_influencers_first(self):
+        matches = self.index.similar_to(self.source.id, limit=2)
+        self.assertEqual([influencer_id for influencer_id, _ in matches], [self.close.id, self.far.id])
+
+    def test_country_filter_uses_state_lookup(self):
+        matches = self.index.similar_to(self.source.id, country='france')
+        self.assertEqual([influencer_id for influencer_id, _ in matches], [self.far.id])
+        self.assertEqual(self.index.similar_to(self.source.id, country='Nowhere'), [])
+
+    def test_tag_removal_refreshes_vector(self):
+        tag = InfluencerTag.objects.create(name='Beauty')
+        tagging = InfluencerTagging.objects.create(influencer=self.close, tag=tag)
+        self.index.rebuild()
+        position = self.index._state.positions[self.close.id]
+        tagged_vector = self.index._state.matrix[position].copy()
+
+        tagging.delete()
+        self.index.ensure_fresh()
+
+        self.assertFalse((self.index._state.matrix[position] == tagged_vector).all())
+
+    def test_refresh_queries_in_chunks(self):
+        self.index.rebuild()
+        added = create_influencer('added', 100000)
+        with mock.patch('influencers.lookalike.REFRESH_CHUNK_SIZE', 2), \
+                mock.patch('influencers.lookalike._collect_features', wraps=_collect_features) as collect:
+            self.index.refresh([self.source.id, self.close.id, added.id])
+        self.assertEqual([len(call.args[0]) for call in collect.call_args_list], [2, 1])
+        self.assertIn(added.id, self.index._state.positions)
+
+    def test_warms_once_on_first_request(self):
+        with mock.patch.object(self.index, 'warm_in_background') as warm:
+            self.index.warm_on_first_request()
+            warm.assert_not_called()
+            request_started.send(sender=self.__class__)
+            request_started.send(sender=self.__class__)
+        warm.assert_called_once_with()
+
+    def test_lookalike_api_uses_annotated_queryset(self):
+        self.index.rebuild()
+        url = reverse('influencers:api_influencer_lookalikes', args=[self.source.id])
+        # influencer lookup, annotated result query; no per-row account queries
+        with mock.patch('influencers.views.lookalike_index', self.index), self.assertNumQueries(2):
+            response = self.client.get(url, {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(results[0]['id'], self.close.id)
+        self.assertEqual(results[0]['totalFollowers'], 110000)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class InfluencerExportTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        create_influencer('exported', 5000)
+        self.url = reverse('influencers:api_influencer_export')
+
+    def test_export_requires_agency_access(self):
+        self.assertIn(self.client.get(self.url).status_code, (401, 403))
+
+        influencer_user = get_user_model().objects.create_user(
+            username='creator@example.com', email='creator@example.com', password='password',
+            user_type='influencer',
+        )
+        self.client.force_login(influencer_user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_agency_owner_can_export(self):
+        owner = get_user_model().objects.create_user(
+            username='owner@example.com', email='owner@example.com', password='password',
+        )
+        self.client.force_login(owner)
+        response = self.client.get(self.url, {'file_format': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'exported', b''.join(response.streaming_content))
+
+
+class InfluencerAnalyticsRefreshTests(TestCase):
+
+    def test_concurrent_first_refresh_reuses_existing_row(self):
+        influencer = create_influencer('racer', 40000)
+        bulk_create = InfluencerAnalytics.objects.bulk_create
+
+        def create_concurrently(objs, **kwargs):
+            # Another request inserts the row between our read and our insert
+            InfluencerAnalytics.objects.create(influencer=influencer)
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(InfluencerAnalytics.objects, 'bulk_create', side_effect=create_concurrently):
+            processed, _ = refresh_influencer_analytics([influencer.pk])
+
+        self.assertEqual(processed, 1)
+        analytics = InfluencerAnalytics.objects.get(influencer=influencer)
+        self.assertGreater(analytics.influence_score, 0)
+
+
+class AvatarVariantUrlTests(TestCase):
+
+    def test_stale_variants_fall_back_to_avatar(self):
+        influencer = create_influencer('stale', 1000)
+        Influencer.objects.filter(pk=influencer.pk).update(
+            avatar='influencer_avatars/new.png',
+            avatar_small='influencer_avatars/small/old.webp',
+            avatar_small_jpeg='influencer_avatars/small/old.jpg',
+            avatar_small_source='influencer_avatars/old.png',
+        )
+        fields = ['profilePictureUrl', 'profilePictureJpegUrl']
+        expected = {name: '/media/influencer_avatars/new.png' for name in fields}
+
+        values = InfluencerListValuesSerializer(fields=fields)
+        row = values.prepare_queryset(Influencer.objects.filter(pk=influencer.pk)).get()
+        self.assertEqual(values.to_representation(row), expected)
+
+        data = InfluencerListSerializer(Influencer.objects.get(pk=influencer.pk)).data
+        self.assertEqual({name: data[name] for name in fields}, expected)
+
+        Influencer.objects.filter(pk=influencer.pk).update(avatar_small_source='influencer_avatars/new.png')
+        row = values.prepare_queryset(Influencer.objects.filter(pk=influencer.pk)).get()
+        self.assertEqual(values.to_representation(row)['profilePictureUrl'], '/media/influencer_avatars/small/old.webp')
+
+
+class AvatarThumbnailSignalTests(TestCase):
+
+    def test_thumbnails_are_queued_after_commit(self):
+        with mock.patch('influencers.tasks.generate_avatar_thumbnails.delay') as delay:
+            with self.captureOnCommitCallbacks() as callbacks:
+                influencer = Influencer.objects.create(
+                    full_name='Avatar', username='avatar', primary_category='fashion',
+                    avatar='influencer_avatars/avatar.png',
+                )
+                delay.assert_not_called()
+            for callback in callbacks:
+                callback()
+        delay.assert_called_once_with(influencer.pk)
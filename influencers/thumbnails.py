@@ -0,0 +1,80 @@
+"""
+Avatar thumbnail pipeline
+Builds fixed-size square WebP and JPEG variants of Influencer.avatar so list
+pages ship small images instead of full-size uploads. Variants are generated
+once per avatar file and looked up from the stored field, never on request
+"""
+
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db.models import F, Q
+
+from .models import Influencer
+
+logger = logging.getLogger(__name__)
+
+# Rendered at 2x for an ~80px card avatar
+AVATAR_SMALL_SIZE = (160, 160)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+def render_avatar_variants(field_file, size=AVATAR_SMALL_SIZE):
+    """Return (webp_bytes, jpeg_bytes) for a square center-cropped avatar"""
+    from PIL import Image, ImageOps
+
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        # JPEG sources decode at reduced scale directly, far cheaper for large photos
+        image.draft('RGB', (size[0] * 2, size[1] * 2))
+        image = ImageOps.exif_transpose(image)
+        image = ImageOps.fit(image.convert('RGB'), size, Image.LANCZOS)
+
+    webp = BytesIO()
+    image.save(webp, format='WEBP', quality=WEBP_QUALITY, method=4)
+    jpeg = BytesIO()
+    image.save(jpeg, format='JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return webp.getvalue(), jpeg.getvalue()
+
+
+def generate_avatar_variants(influencer):
+    """
+    Build and store the variants for the influencer's current avatar.
+    Saves through queryset.update() so post_save handlers are not re-triggered.
+    """
+    if not influencer.avatar:
+        Influencer.objects.filter(pk=influencer.pk).update(
+            avatar_small=None, avatar_small_jpeg=None, avatar_small_source=''
+        )
+        return False
+
+    webp, jpeg = render_avatar_variants(influencer.avatar)
+    stem = os.path.splitext(os.path.basename(influencer.avatar.name))[0]
+    base_name = f'{influencer.pk}_{stem}_{AVATAR_SMALL_SIZE[0]}'
+
+    for field_name in ('avatar_small', 'avatar_small_jpeg'):
+        old_file = getattr(influencer, field_name)
+        if old_file:
+            old_file.delete(save=False)
+
+    influencer.avatar_small.save(f'{base_name}.webp', ContentFile(webp), save=False)
+    influencer.avatar_small_jpeg.save(f'{base_name}.jpg', ContentFile(jpeg), save=False)
+    influencer.avatar_small_source = influencer.avatar.name
+
+    Influencer.objects.filter(pk=influencer.pk).update(
+        avatar_small=influencer.avatar_small.name,
+        avatar_small_jpeg=influencer.avatar_small_jpeg.name,
+        avatar_small_source=influencer.avatar_small_source,
+    )
+    return True
+
+
+def avatars_needing_variants(queryset=None):
+    """Influencers whose variants are missing or were built from another avatar file"""
+    queryset = queryset if queryset is not None else Influencer.objects.all()
+    return queryset.filter(avatar__isnull=False).exclude(avatar='').exclude(
+        Q(avatar_small_source=F('avatar')) & ~Q(avatar_small='')
+    )
@@ -16,6 +16,10 @@ urlpatterns = [
     # GET /api/influencers/<id>/
     path('<int:pk>/', views.InfluencerDetailAPIView.as_view(), name='api_influencer_detail'),
     
+    # Streaming export (CSV / NDJSON) with the same filters as the list
+    # GET /api/influencers/export/
+    path('export/', views.influencer_export_api, name='api_influencer_export'),
+    
     # Advanced search
     # POST /api/influencers/search/
     path('search/', views.influencer_search_api, name='api_influencer_search'),
@@ -28,6 +32,10 @@ urlpatterns = [
     # GET /api/influencers/<id>/social-accounts/
     path('<int:pk>/social-accounts/', views.social_accounts_api, name='api_social_accounts'),
     
+    # Lookalike influencers
+    # GET /api/influencers/<id>/lookalikes/
+    path('<int:pk>/lookalikes/', views.influencer_lookalike_api, name='api_influencer_lookalikes'),
+    
     # List all tags
     # GET /api/influencers/tags/
     path('tags/', views.tag_list_api, name='api_tag_list'),
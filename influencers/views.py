@@ -9,15 +9,25 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from django.db.models import Q, Avg, Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from agencies.access import get_access_context
 
 from .models import Influencer, SocialMediaAccount, InfluencerTag, InfluencerAnalytics
+from .lookalike import lookalike_index
+from .analytics import refresh_influencer_analytics
+from .exports import stream_csv, stream_ndjson
 from .serializers import (
     InfluencerListSerializer as InfluencerSerializer,
     InfluencerDetailSerializer,
     SocialMediaAccountSerializer,
     InfluencerTagSerializer,
     InfluencerAnalyticsSerializer,
+    InfluencerListValuesSerializer,
+    parse_requested_fields,
 )
+from .renderers import FastJSONRenderer
 
 
 class InfluencerPagination(PageNumberPagination):
@@ -26,6 +36,76 @@ class InfluencerPagination(PageNumberPagination):
     max_page_size = 100
 
 
+def filter_influencers(queryset, params):
+    """
+    Apply the influencer list query parameters (search, category, location,
+    followers, verified, platform, sort_by) to a queryset
+    """
+    # Search by name or username
+    search = params.get('search', None)
+    if search:
+        queryset = queryset.filter(
+            Q(full_name__icontains=search) |
+            Q(username__icontains=search) |
+            Q(bio__icontains=search)
+        )
+
+    # Filter by category
+    category = params.get('category', None)
+    if category:
+        queryset = queryset.filter(
+            Q(primary_category__iexact=category) |
+            Q(secondary_categories__icontains=category)
+        )
+
+    # Filter by location
+    location = params.get('location', None)
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+
+    # Filter by follower count (using social accounts)
+    min_followers = params.get('min_followers', None)
+    if min_followers:
+        queryset = queryset.filter(
+            social_accounts__followers_count__gte=int(min_followers)
+        ).distinct()
+
+    max_followers = params.get('max_followers', None)
+    if max_followers:
+        queryset = queryset.filter(
+            social_accounts__followers_count__lte=int(max_followers)
+        ).distinct()
+
+    # Filter by verified status
+    verified = params.get('verified', None)
+    if verified is not None:
+        is_verified = verified.lower() in ('true', '1', 'yes')
+        queryset = queryset.filter(is_verified=is_verified)
+
+    # Filter by platform
+    platform = params.get('platform', None)
+    if platform:
+        queryset = queryset.filter(
+            social_accounts__platform__iexact=platform
+        ).distinct()
+
+    # Sorting
+    sort_by = params.get('sort_by', '-created_at')
+    if sort_by in ['followers', '-followers']:
+        # Sort by follower count requires annotation
+        queryset = queryset.annotate(
+            total_followers=Sum('social_accounts__followers_count')
+        ).order_by('-total_followers' if sort_by == '-followers' else 'total_followers')
+    elif sort_by in ['engagement', '-engagement']:
+        queryset = queryset.annotate(
+            avg_engagement=Avg('social_accounts__engagement_rate')
+        ).order_by('-avg_engagement' if sort_by == '-engagement' else 'avg_engagement')
+    else:
+        queryset = queryset.order_by(sort_by)
+
+    return queryset
+
+
 class InfluencerListAPIView(generics.ListAPIView):
     """
     GET /api/influencers/
@@ -34,77 +114,44 @@ class InfluencerListAPIView(generics.ListAPIView):
     serializer_class = InfluencerSerializer
     pagination_class = InfluencerPagination
     permission_classes = [AllowAny]  # Allow public access to browse influencers
+    renderer_classes = [FastJSONRenderer]
 
-    def get_queryset(self):
-        queryset = Influencer.objects.filter(is_active=True).select_related(
-            'user'
-        ).prefetch_related(
-            'social_accounts', 'tags'
+    def get_requested_fields(self):
+        """Fields selected with ?fields=a,b,c (None means all)"""
+        return parse_requested_fields(
+            self.request.query_params.get('fields'),
+            InfluencerSerializer.Meta.fields
         )
 
-        # Search by name or username
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(full_name__icontains=search) |
-                Q(username__icontains=search) |
-                Q(bio__icontains=search)
-            )
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_requested_fields()
+        return context
 
-        # Filter by category
-        category = self.request.query_params.get('category', None)
-        if category:
-            queryset = queryset.filter(
-                Q(primary_category__iexact=category) |
-                Q(secondary_categories__icontains=category)
-            )
+    def get_queryset(self):
+        # Account metrics are annotated (only for the requested fields), so
+        # no prefetching is needed for the list serializer
+        queryset = InfluencerSerializer.prepare_queryset(
+            Influencer.objects.filter(is_active=True),
+            self.get_requested_fields()
+        )
+        return filter_influencers(queryset, self.request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        # ?fast=true serves the same payload from .values() rows
+        if request.query_params.get('fast', '').lower() not in ('true', '1', 'yes'):
+            return super().list(request, *args, **kwargs)
 
-        # Filter by location
-        location = self.request.query_params.get('location', None)
-        if location:
-            queryset = queryset.filter(location__icontains=location)
-
-        # Filter by follower count (using social accounts)
-        min_followers = self.request.query_params.get('min_followers', None)
-        if min_followers:
-            queryset = queryset.filter(
-                social_accounts__followers_count__gte=int(min_followers)
-            ).distinct()
-
-        max_followers = self.request.query_params.get('max_followers', None)
-        if max_followers:
-            queryset = queryset.filter(
-                social_accounts__followers_count__lte=int(max_followers)
-            ).distinct()
-
-        # Filter by verified status
-        verified = self.request.query_params.get('verified', None)
-        if verified is not None:
-            is_verified = verified.lower() in ('true', '1', 'yes')
-            queryset = queryset.filter(is_verified=is_verified)
-
-        # Filter by platform
-        platform = self.request.query_params.get('platform', None)
-        if platform:
-            queryset = queryset.filter(
-                social_accounts__platform__iexact=platform
-            ).distinct()
-
-        # Sorting
-        sort_by = self.request.query_params.get('sort_by', '-created_at')
-        if sort_by in ['followers', '-followers']:
-            # Sort by follower count requires annotation
-            queryset = queryset.annotate(
-                total_followers=Sum('social_accounts__followers_count')
-            ).order_by('-total_followers' if sort_by == '-followers' else 'total_followers')
-        elif sort_by in ['engagement', '-engagement']:
-            queryset = queryset.annotate(
-                avg_engagement=Avg('social_accounts__engagement_rate')
-            ).order_by('-avg_engagement' if sort_by == '-engagement' else 'avg_engagement')
-        else:
-            queryset = queryset.order_by(sort_by)
-
-        return queryset
+        fast_serializer = InfluencerListValuesSerializer(
+            fields=self.get_requested_fields(), request=request
+        )
+        queryset = fast_serializer.prepare_queryset(filter_influencers(
+            Influencer.objects.filter(is_active=True), request.query_params
+        ))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast_serializer.serialize(page))
+        return Response(fast_serializer.serialize(queryset))
 
 
 class InfluencerDetailAPIView(generics.RetrieveAPIView):
@@ -117,12 +164,56 @@ class InfluencerDetailAPIView(generics.RetrieveAPIView):
     lookup_field = 'pk'
 
     def get_queryset(self):
-        return Influencer.objects.filter(is_active=True).select_related(
-            'user'
-        ).prefetch_related(
-            'social_accounts', 'tags'
+        # Influencer + analytics, active accounts, recent sponsored posts: 3 queries
+        return InfluencerDetailSerializer.prepare_queryset(
+            Influencer.objects.filter(is_active=True)
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def influencer_export_api(request):
+    """
+    GET /api/influencers/export/?file_format=csv|ndjson
+    Stream every influencer matching the list filters, one row per influencer
+    with flattened per-platform social account columns.
+    Restricted to agency admins and roles that can view analytics.
+    """
+    access = get_access_context(request.user)
+    if access.agency_id is None:
+        return Response(
+            {'error': 'Agency not found'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    if not (access.is_admin(access.agency_id) or access.permissions.get('can_view_analytics')):
+        return Response(
+            {'error': 'Permission denied'},
+            status=status.HTTP_403_FORBIDDEN
         )
 
+    file_format = request.query_params.get('file_format', 'csv').lower()
+    if file_format not in ('csv', 'ndjson'):
+        return Response(
+            {'error': 'file_format must be csv or ndjson'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    queryset = filter_influencers(
+        Influencer.objects.filter(is_active=True),
+        request.query_params
+    )
+
+    if file_format == 'csv':
+        response = StreamingHttpResponse(stream_csv(queryset), content_type='text/csv')
+    else:
+        response = StreamingHttpResponse(stream_ndjson(queryset), content_type='application/x-ndjson')
+
+    filename = f"influencers_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{file_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Stop nginx from buffering the whole export before forwarding it
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -169,7 +260,7 @@ def influencer_search_api(request):
 
     # Limit results
     limit = data.get('limit', 50)
-    queryset = queryset[:limit]
+    queryset = InfluencerSerializer.prepare_queryset(queryset)[:limit]
 
     serializer = InfluencerSerializer(queryset, many=True)
     return Response({'results': serializer.data})
@@ -182,8 +273,34 @@ def influencer_analytics_api(request, pk):
     GET /api/influencers/analytics/<id>/
     Get influencer analytics data
     """
+    analytics = InfluencerAnalytics.objects.filter(
+        influencer_id=pk, influencer__is_active=True
+    ).first()
+
+    if analytics is None:
+        if not Influencer.objects.filter(pk=pk, is_active=True).exists():
+            return Response(
+                {'error': 'Influencer not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        # Not precomputed yet (new influencer), compute just this one row
+        refresh_influencer_analytics([pk])
+        analytics = InfluencerAnalytics.objects.get(influencer_id=pk)
+
+    serializer = InfluencerAnalyticsSerializer(analytics)
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def influencer_lookalike_api(request, pk):
+    """
+    GET /api/influencers/<id>/lookalikes/
+    Find influencers similar to the given one
+    Query params: limit, same_country, country, platform
+    """
     try:
-        influencer = Influencer.objects.get(pk=pk, is_active=True)
+        influencer = Influencer.objects.only('id', 'country').get(pk=pk, is_active=True)
     except Influencer.DoesNotExist:
         return Response(
             {'error': 'Influencer not found'},
@@ -191,26 +308,42 @@ def influencer_analytics_api(request, pk):
         )
 
     try:
-        analytics = influencer.analytics
-        serializer = InfluencerAnalyticsSerializer(analytics)
-        return Response(serializer.data)
-    except InfluencerAnalytics.DoesNotExist:
-        # Return computed analytics from social accounts
-        social_accounts = influencer.social_accounts.filter(is_active=True)
-        
-        total_followers = sum(sa.followers_count or 0 for sa in social_accounts)
-        total_following = sum(sa.following_count or 0 for sa in social_accounts)
-        avg_engagement = sum(sa.engagement_rate or 0 for sa in social_accounts) / max(len(social_accounts), 1)
-        total_posts = sum(sa.media_count or 0 for sa in social_accounts)
-
-        return Response({
-            'influencer_id': influencer.id,
-            'total_followers': total_followers,
-            'total_following': total_following,
-            'avg_engagement_rate': round(avg_engagement, 2),
-            'total_posts': total_posts,
-            'platforms': [sa.platform for sa in social_accounts],
-        })
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+    except ValueError:
+        return Response(
+            {'error': 'limit must be an integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    country = request.query_params.get('country', None)
+    same_country = request.query_params.get('same_country', '')
+    if not country and same_country.lower() in ('true', '1', 'yes'):
+        country = influencer.country
+    platform = request.query_params.get('platform', None)
+
+    try:
+        matches = lookalike_index.similar_to(
+            influencer.id, limit=limit, country=country, platform=platform
+        )
+    except KeyError:
+        # Not indexed yet (e.g. created moments ago in another process)
+        matches = []
+
+    scores = dict(matches)
+    influencers = InfluencerSerializer.prepare_queryset(
+        Influencer.objects.filter(id__in=scores.keys(), is_active=True)
+    )
+    by_id = {obj.id: obj for obj in influencers}
+    ordered = [by_id[influencer_id] for influencer_id, _ in matches if influencer_id in by_id]
+
+    results = InfluencerSerializer(ordered, many=True).data
+    for item in results:
+        item['similarity'] = round(scores[item['id']], 4)
+
+    return Response({
+        'influencerId': influencer.id,
+        'results': results,
+    })
 
 
 @api_view(['GET'])
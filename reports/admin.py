@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import Report, ReportTemplate, Dashboard, AnalyticsSnapshot, ReportSubscription
+from .models import Report, ReportTemplate, Dashboard, AnalyticsSnapshot, MetricPoint, ReportSubscription
 
 
 @admin.register(Report)
@@ -8,7 +8,10 @@ class ReportAdmin(admin.ModelAdmin):
     list_display = ('title', 'report_type', 'agency', 'file_format', 'status', 'created_by', 'created_at')
     list_filter = ('report_type', 'file_format', 'status', 'is_scheduled', 'created_at')
     search_fields = ('title', 'description', 'agency__name', 'created_by__email')
-    readonly_fields = ('created_at', 'updated_at', 'generation_started_at', 'generation_completed_at')
+    readonly_fields = (
+        'created_at', 'updated_at', 'generation_started_at', 'generation_completed_at',
+        'stage_durations', 'row_counts', 'file_size',
+    )
     
     fieldsets = (
         (_('Basic Information'), {
@@ -23,6 +26,10 @@ class ReportAdmin(admin.ModelAdmin):
         (_('Status'), {
             'fields': ('status', 'generation_started_at', 'generation_completed_at', 'error_message')
         }),
+        (_('Performance'), {
+            'fields': ('stage_durations', 'row_counts', 'file_size'),
+            'classes': ('collapse',)
+        }),
         (_('Scheduling'), {
             'fields': ('is_scheduled', 'schedule_frequency', 'next_generation_date'),
             'classes': ('collapse',)
@@ -68,6 +75,14 @@ class AnalyticsSnapshotAdmin(admin.ModelAdmin):
     get_related_object.short_description = _('Related Object')
 
 
+@admin.register(MetricPoint)
+class MetricPointAdmin(admin.ModelAdmin):
+    list_display = ('entity_type', 'entity_id', 'metric', 'value', 'timestamp', 'agency')
+    list_filter = ('entity_type', 'metric')
+    search_fields = ('metric', 'agency__name')
+    raw_id_fields = ('agency',)
+
+
 @admin.register(ReportSubscription)
 class ReportSubscriptionAdmin(admin.ModelAdmin):
     list_display = ('name', 'report_template', 'agency', 'frequency', 'delivery_method', 'is_active', 'next_delivery')
@@ -0,0 +1,230 @@
+"""
+Report chart rendering
+Charts described by ReportTemplate.chart_configurations are rendered with
+matplotlib's Agg backend in a process pool, one chart per task. The pool is
+billiard's, which may be started from a daemonic Celery prefork child.
+Rendered images are stored under a content hash of (chart config, format,
+data), so a chart whose config and data have not changed is read back, never
+redrawn; prune_chart_store bounds the store by age and file count
+
+Chart config:
+    {"type": "bar" | "barh" | "line" | "pie", "title": "...",
+     "metric": "<campaign stat, e.g. total_engagement>",
+     "label": "campaign_name", "limit": 15}
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CHART_TYPES = ('bar', 'barh', 'line', 'pie')
+CHART_FORMATS = ('png', 'svg')
+CHART_DIR = 'reports/charts'
+
+DEFAULT_CHART_LIMIT = 15
+CHART_SIZE = (8, 4)  # inches
+CHART_DPI = 150
+
+# Every Celery prefork child owns a pool, so keep it small by default
+DEFAULT_RENDER_WORKERS = 2
+
+DEFAULT_CHARTS = [
+    {'type': 'barh', 'title': 'Engagement by Campaign', 'metric': 'total_engagement'},
+    {'type': 'barh', 'title': 'Spend by Campaign', 'metric': 'total_spent'},
+]
+
+# Stored charts kept by prune_chart_store
+CHART_STORE_MAX_AGE = timedelta(days=30)
+CHART_STORE_MAX_FILES = 5000
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def chart_limit(config):
+    """The config's positive integer limit, or the default for a bad value"""
+    limit = config.get('limit', DEFAULT_CHART_LIMIT)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid chart limit {limit!r}; using {DEFAULT_CHART_LIMIT}")
+        return DEFAULT_CHART_LIMIT
+    return limit if limit > 0 else DEFAULT_CHART_LIMIT
+
+
+def chart_series(config, data):
+    """
+    [(label, value), ...] for a chart config from campaign report data,
+    largest values first. Empty when the metric is unknown.
+    """
+    metric = config.get('metric')
+    label = config.get('label', 'campaign_name')
+    limit = chart_limit(config)
+    rows = [
+        (str(campaign.get(label, '')), float(campaign[metric] or 0))
+        for campaign in data.get('campaigns', [])
+        if metric in campaign
+    ]
+    if config.get('type') != 'line':
+        rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:limit]
+
+
+def chart_key(config, series, fmt):
+    payload = json.dumps({'config': config, 'format': fmt, 'data': series}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_chart(config, series, fmt='png'):
+    """
+    Draw one chart and return the image bytes. Runs in pool workers, so it
+    takes and returns plain picklable values only.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from io import BytesIO
+
+    labels = [label for label, _ in series]
+    values = [value for _, value in series]
+    chart_type = config.get('type', 'bar')
+
+    figure, axes = plt.subplots(figsize=CHART_SIZE)
+    try:
+        if chart_type == 'pie':
+            axes.pie(values, labels=labels, autopct='%1.0f%%', textprops={'fontsize': 7})
+            axes.axis('equal')
+        elif chart_type == 'line':
+            axes.plot(labels, values, marker='o', color='#1f3a5f')
+            axes.tick_params(axis='x', labelrotation=45, labelsize=7)
+        elif chart_type == 'barh':
+            axes.barh(labels, values, color='#1f3a5f')
+            axes.invert_yaxis()
+            axes.tick_params(axis='y', labelsize=7)
+        else:
+            axes.bar(labels, values, color='#1f3a5f')
+            axes.tick_params(axis='x', labelrotation=45, labelsize=7)
+
+        axes.set_title(config.get('title', ''), fontsize=10)
+        figure.tight_layout()
+
+        output = BytesIO()
+        figure.savefig(output, format=fmt, dpi=CHART_DPI)
+        return output.getvalue()
+    finally:
+        plt.close(figure)
+
+
+def _pool_size():
+    """Render processes per report worker process (CHART_RENDER_WORKERS, at least 1)"""
+    return max(getattr(settings, 'CHART_RENDER_WORKERS', DEFAULT_RENDER_WORKERS) or 1, 1)
+
+
+def _get_pool():
+    """Shared billiard process pool; unlike multiprocessing it may be started from daemonic workers"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from billiard.pool import Pool
+
+            _pool = Pool(processes=_pool_size())
+            atexit.register(_pool.terminate)
+        return _pool
+
+
+def _render_many(jobs):
+    """Render [(config, series, fmt), ...] in parallel where possible"""
+    if len(jobs) < 2 or _pool_size() == 1:
+        return [render_chart(*job) for job in jobs]
+    pool = _get_pool()
+    results = [pool.apply_async(render_chart, job) for job in jobs]
+    return [result.get() for result in results]
+
+
+def _read_stored(storage, name):
+    """Stored image bytes, or None if absent (or pruned meanwhile)"""
+    try:
+        with storage.open(name, 'rb') as stored:
+            return stored.read()
+    except (FileNotFoundError, OSError):
+        return None
+
+
+def render_charts(configs, data, fmt='png', storage=None):
+    """
+    Render chart configs against report data. Returns [(config, image bytes)],
+    skipping configs without data. Previously rendered images are read from
+    storage; only new (config, data) combinations are drawn.
+    """
+    if fmt not in CHART_FORMATS:
+        raise ValueError(f"Unsupported chart format: {fmt}")
+    storage = storage or default_storage
+
+    charts = []
+    for config in configs:
+        if config.get('type', 'bar') not in CHART_TYPES:
+            logger.warning(f"Skipping chart with unsupported type: {config.get('type')}")
+            continue
+        try:
+            series = chart_series(config, data)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Skipping chart {config.get('title', '')!r}: {str(e)}")
+            continue
+        if series:
+            charts.append((config, series, f"{CHART_DIR}/{chart_key(config, series, fmt)}.{fmt}"))
+
+    images = {}
+    missing = []
+    for config, series, name in charts:
+        if name in images:
+            continue
+        images[name] = _read_stored(storage, name) if storage.exists(name) else None
+        if images[name] is None:
+            missing.append((config, series, name))
+
+    if missing:
+        rendered = _render_many([(config, series, fmt) for config, series, _ in missing])
+        for (_, _, name), image in zip(missing, rendered):
+            images[name] = image
+            if not storage.exists(name):
+                storage.save(name, ContentFile(image))
+
+    return [(config, images[name]) for config, _, name in charts]
+
+
+def prune_chart_store(max_age=CHART_STORE_MAX_AGE, max_files=CHART_STORE_MAX_FILES, storage=None):
+    """
+    Delete stored charts older than max_age, then the oldest beyond
+    max_files. A pruned chart is simply redrawn when next needed.
+    Returns the number of files deleted.
+    """
+    storage = storage or default_storage
+    try:
+        _, files = storage.listdir(CHART_DIR)
+    except FileNotFoundError:
+        return 0
+
+    stored = []
+    for filename in files:
+        name = f"{CHART_DIR}/{filename}"
+        try:
+            stored.append((storage.get_modified_time(name), name))
+        except (FileNotFoundError, OSError, NotImplementedError):
+            continue
+    stored.sort(reverse=True)
+
+    cutoff = timezone.now() - max_age
+    expired = [name for index, (modified, name) in enumerate(stored) if index >= max_files or modified < cutoff]
+    for name in expired:
+        storage.delete(name)
+    return len(expired)
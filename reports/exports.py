@@ -0,0 +1,127 @@
+"""
+Streaming report file writers
+Sheets are written row by row from iterables with openpyxl's write-only
+workbook, so memory stays flat however many campaigns a report covers
+"""
+
+from io import BytesIO
+from itertools import chain
+
+# Charts sheet layout: displayed size in pixels and rows reserved per chart
+CHART_IMAGE_SIZE = (800, 400)
+CHART_ROWS = 22
+
+# (header, key) columns per sheet; rows are read from report data dicts
+CAMPAIGN_COLUMNS = [
+    ('Campaign ID', 'campaign_id'),
+    ('Campaign', 'campaign_name'),
+    ('Type', 'campaign_type'),
+    ('Status', 'status'),
+    ('Start Date', 'start_date'),
+    ('End Date', 'end_date'),
+    ('Total Budget', 'total_budget'),
+    ('Total Spent', 'total_spent'),
+    ('Remaining Budget', 'remaining_budget'),
+    ('Reach', 'total_reach'),
+    ('Impressions', 'total_impressions'),
+    ('Likes', 'total_likes'),
+    ('Comments', 'total_comments'),
+    ('Shares', 'total_shares'),
+    ('Engagement', 'total_engagement'),
+    ('Engagement Rate (%)', 'avg_engagement_rate'),
+    ('Cost per Engagement', 'cost_per_engagement'),
+    ('ROI (%)', 'roi_percentage'),
+    ('Collaborations', 'total_collaborations'),
+    ('Active Collaborations', 'active_collaborations'),
+    ('Completed Collaborations', 'completed_collaborations'),
+    ('Content Pieces', 'content_pieces'),
+    ('Approved Content', 'approved_content'),
+]
+
+TOP_CONTENT_COLUMNS = [
+    ('Content ID', 'content_id'),
+    ('Influencer', 'influencer'),
+    ('Post URL', 'post_url'),
+    ('Likes', 'likes'),
+    ('Comments', 'comments'),
+    ('Shares', 'shares'),
+    ('Views', 'views'),
+    ('Engagement', 'total_engagement'),
+    ('Engagement Rate (%)', 'engagement_rate'),
+    ('Status', 'status'),
+]
+
+TOP_INFLUENCER_COLUMNS = [
+    ('Influencer ID', 'influencer_id'),
+    ('Influencer', 'influencer_name'),
+    ('Username', 'username'),
+    ('Agreed Rate', 'agreed_rate'),
+    ('Engagement', 'total_engagement'),
+    ('Views', 'total_views'),
+    ('Engagement Rate (%)', 'engagement_rate'),
+    ('Cost per Engagement', 'cost_per_engagement'),
+    ('Content Pieces', 'content_count'),
+    ('Status', 'status'),
+]
+
+
+def dict_rows(items, columns):
+    """Yield one value tuple per dict, in column order"""
+    keys = [key for _, key in columns]
+    for item in items:
+        yield tuple(item.get(key) for key in keys)
+
+
+def nested_rows(campaigns, section, columns):
+    """
+    Yield (campaign name, *values) for every entry of a per-campaign list
+    such as top_content, without copying or modifying the source dicts
+    """
+    keys = [key for _, key in columns]
+    for campaign in campaigns:
+        for item in campaign.get(section, []):
+            yield (campaign['campaign_name'],) + tuple(item.get(key) for key in keys)
+
+
+def write_xlsx(target, sheets, images=None):
+    """
+    Write [(title, headers, rows), ...] to an xlsx file path or file object.
+    Sheets whose rows iterable is empty are left out; the first sheet is
+    always written. PNG images ([(title, bytes)]) go on a final Charts sheet.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.drawing.image import Image
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    header_font = Font(bold=True)
+
+    for index, (title, headers, rows) in enumerate(sheets):
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None and index > 0:
+            continue
+
+        sheet = workbook.create_sheet(title=title)
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(sheet, value=header)
+            cell.font = header_font
+            header_cells.append(cell)
+        sheet.append(header_cells)
+
+        if first is not None:
+            for row in chain([first], rows):
+                sheet.append(row)
+
+    if images:
+        sheet = workbook.create_sheet(title='Charts')
+        for index, (title, image_bytes) in enumerate(images):
+            image = Image(BytesIO(image_bytes))
+            image.width, image.height = CHART_IMAGE_SIZE
+            image.anchor = f'A{index * CHART_ROWS + 1}'
+            sheet.add_image(image)
+
+    workbook.save(target)
+    return target
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from reports.timeseries import BACKFILL_BATCH_SIZE, backfill_metric_points
+
+
+class Command(BaseCommand):
+    help = 'Copy numeric metrics of existing analytics snapshots into the metric time-series table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BACKFILL_BATCH_SIZE,
+            help=f'Snapshots read and points inserted per batch (default: {BACKFILL_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            default=None,
+            help='Only snapshots taken on or after this date (YYYY-MM-DD)'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError(f"Invalid date: {options['since']}")
+
+        read, attempted = backfill_metric_points(batch_size=max(options['batch_size'], 1), since=since)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Backfill attempted {attempted} metric points from {read} snapshots "
+                f"(points already present are skipped)"
+            )
+        )
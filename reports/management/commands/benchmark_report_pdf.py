@@ -0,0 +1,111 @@
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from reports.pdf import ReportPDFBuilder
+
+
+def sample_campaign(index, rng):
+    """Campaign entry shaped like ReportGenerator.collect_campaign_performance_data output"""
+    budget = rng.randint(5, 200) * 1000
+    spent = budget * rng.random()
+    reach = rng.randint(10000, 2000000)
+    likes, comments, shares = rng.randint(100, 90000), rng.randint(10, 9000), rng.randint(5, 5000)
+    engagement = likes + comments + shares
+    return {
+        'campaign_id': index,
+        'campaign_name': f'Benchmark Campaign {index}',
+        'campaign_type': 'brand_awareness',
+        'status': 'active',
+        'total_budget': float(budget),
+        'total_spent': spent,
+        'total_reach': reach,
+        'total_engagement': engagement,
+        'avg_engagement_rate': engagement / reach * 100,
+        'roi_percentage': (engagement * 0.5 - spent) / spent * 100 if spent else 0,
+        'top_content': [{
+            'influencer': f'Influencer {index}-{rank}',
+            'likes': rng.randint(10, 20000),
+            'comments': rng.randint(1, 2000),
+            'shares': rng.randint(0, 1000),
+            'views': rng.randint(1000, 400000),
+            'engagement_rate': rng.random() * 12,
+        } for rank in range(10)],
+        'top_influencers': [{
+            'influencer_name': f'Influencer {index}-{rank}',
+            'agreed_rate': float(rng.randint(2, 80) * 100),
+            'total_engagement': rng.randint(100, 40000),
+            'total_views': rng.randint(1000, 900000),
+            'engagement_rate': rng.random() * 12,
+            'cost_per_engagement': rng.random() * 3,
+        } for rank in range(10)],
+    }
+
+
+def sample_report_data(campaign_count, seed=0):
+    rng = random.Random(seed)
+    campaigns = [sample_campaign(index, rng) for index in range(1, campaign_count + 1)]
+    total_budget = sum(c['total_budget'] for c in campaigns)
+    total_spent = sum(c['total_spent'] for c in campaigns)
+    return {
+        'campaigns': campaigns,
+        'summary': {
+            'total_campaigns': campaign_count,
+            'total_budget': total_budget,
+            'total_spent': total_spent,
+            'budget_utilization': total_spent / total_budget * 100 if total_budget else 0,
+            'total_engagement': sum(c['total_engagement'] for c in campaigns),
+            'total_reach': sum(c['total_reach'] for c in campaigns),
+            'avg_engagement_rate': sum(c['avg_engagement_rate'] for c in campaigns) / campaign_count,
+            'avg_roi': sum(c['roi_percentage'] for c in campaigns) / campaign_count,
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = 'Time PDF report rendering for synthetic reports of increasing campaign counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campaigns',
+            type=str,
+            default='10,100,1000',
+            help='Comma-separated campaign counts to render (default: 10,100,1000)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=1,
+            help='Renders per size; the fastest is reported (default: 1)'
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(value) for value in options['campaigns'].split(',') if value.strip()]
+        repeat = max(options['repeat'], 1)
+
+        self.stdout.write(f"{'campaigns':>10} {'seconds':>9} {'peak MB':>9} {'size KB':>9}")
+        for size in sizes:
+            data = sample_report_data(size)
+            best = None
+            for _ in range(repeat):
+                with tempfile.TemporaryFile(suffix='.pdf') as output:
+                    builder = ReportPDFBuilder(f'Benchmark report ({size} campaigns)', 'Benchmark Agency', data)
+                    tracemalloc.start()
+                    started = time.perf_counter()
+                    builder.build(output)
+                    elapsed = time.perf_counter() - started
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    output_size = os.fstat(output.fileno()).st_size
+                if best is None or elapsed < best[0]:
+                    best = (elapsed, peak, output_size)
+
+            elapsed, peak, output_size = best
+            self.stdout.write(
+                f"{size:>10} {elapsed:>9.2f} {peak / 1024 / 1024:>9.1f} {output_size / 1024:>9.0f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
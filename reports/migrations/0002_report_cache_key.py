@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="report",
+            name="cache_key",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
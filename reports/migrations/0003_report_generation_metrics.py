@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0002_report_cache_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="report",
+            name="stage_durations",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="report",
+            name="row_counts",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="report",
+            name="file_size",
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
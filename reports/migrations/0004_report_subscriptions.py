@@ -0,0 +1,20 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0003_report_generation_metrics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="report",
+            name="subscriptions",
+            field=models.ManyToManyField(
+                blank=True, related_name="reports", to="reports.reportsubscription"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0004_report_subscriptions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="report",
+            name="template",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="reports",
+                to="reports.reporttemplate",
+            ),
+        ),
+    ]
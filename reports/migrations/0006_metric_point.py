@@ -0,0 +1,64 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agencies", "0001_initial"),
+        ("reports", "0005_report_template"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MetricPoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "entity_type",
+                    models.CharField(
+                        choices=[
+                            ("campaign", "Campaign"),
+                            ("influencer", "Influencer"),
+                            ("agency", "Agency"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("entity_id", models.PositiveBigIntegerField()),
+                ("metric", models.CharField(max_length=50)),
+                ("timestamp", models.DateTimeField()),
+                ("value", models.FloatField()),
+                (
+                    "agency",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="metric_points",
+                        to="agencies.agency",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Metric Point",
+                "verbose_name_plural": "Metric Points",
+                "db_table": "reports_metric_point",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="metricpoint",
+            constraint=models.UniqueConstraint(
+                fields=("agency", "entity_type", "entity_id", "metric", "timestamp"),
+                name="reports_metric_point_series_uniq",
+            ),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from datetime import timedelta
 import json
 
 
@@ -57,6 +59,22 @@ class Report(models.Model):
     generation_completed_at = models.DateTimeField(blank=True, null=True)
     error_message = models.TextField(blank=True, null=True)
     
+    # Generation metrics: seconds per stage (collect, render, upload), rows written, bytes
+    stage_durations = models.JSONField(default=dict, blank=True)
+    row_counts = models.JSONField(default=dict, blank=True)
+    file_size = models.PositiveBigIntegerField(blank=True, null=True)
+    
+    # Result cache: hash of type, parameters, agency and data watermark
+    cache_key = models.CharField(max_length=64, blank=True, db_index=True)
+    
+    # Template the report was created from; supplies chart configurations
+    template = models.ForeignKey(
+        'ReportTemplate', on_delete=models.SET_NULL, blank=True, null=True, related_name='reports'
+    )
+    
+    # Subscriptions whose recipients receive this (scheduled) report
+    subscriptions = models.ManyToManyField('ReportSubscription', blank=True, related_name='reports')
+    
     # Scheduling
     is_scheduled = models.BooleanField(default=False)
     schedule_frequency = models.CharField(
@@ -191,6 +209,38 @@ class AnalyticsSnapshot(models.Model):
         return f"{self.get_snapshot_type_display()} - {self.snapshot_date.strftime('%Y-%m-%d')}"
 
 
+class MetricPoint(models.Model):
+    """One numeric snapshot metric of an entity at a point in time, for trend queries"""
+
+    ENTITY_TYPES = (
+        ('campaign', _('Campaign')),
+        ('influencer', _('Influencer')),
+        ('agency', _('Agency')),
+    )
+
+    agency = models.ForeignKey('agencies.Agency', on_delete=models.CASCADE, related_name='metric_points')
+    entity_type = models.CharField(max_length=20, choices=ENTITY_TYPES)
+    entity_id = models.PositiveBigIntegerField()
+    metric = models.CharField(max_length=50)
+    timestamp = models.DateTimeField()
+    value = models.FloatField()
+
+    class Meta:
+        db_table = 'reports_metric_point'
+        verbose_name = _('Metric Point')
+        verbose_name_plural = _('Metric Points')
+        constraints = [
+            # Also the index range queries run on: equality on the series, range on timestamp
+            models.UniqueConstraint(
+                fields=['agency', 'entity_type', 'entity_id', 'metric', 'timestamp'],
+                name='reports_metric_point_series_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.entity_type}:{self.entity_id} {self.metric}={self.value} @ {self.timestamp:%Y-%m-%d %H:%M}"
+
+
 class ReportSubscription(models.Model):
     """Subscriptions for automated report delivery"""
     
@@ -251,4 +301,33 @@ class ReportSubscription(models.Model):
         verbose_name_plural = _('Report Subscriptions')
     
     def __str__(self):
-        return f"{self.name} - {self.get_frequency_display()}"
\ No newline at end of file
+        return f"{self.name} - {self.get_frequency_display()}"
+    
+    def calculate_next_delivery(self, after=None):
+        """Set next_delivery to the first delivery slot strictly after `after` (default now)"""
+        from dateutil.relativedelta import relativedelta
+        
+        after = timezone.localtime(after or timezone.now())
+        candidate = after.replace(
+            hour=self.delivery_time.hour, minute=self.delivery_time.minute, second=0, microsecond=0
+        )
+        
+        if self.frequency == 'daily':
+            if candidate <= after:
+                candidate += timedelta(days=1)
+        elif self.frequency == 'weekly':
+            weekday = self.delivery_day_of_week or 0
+            candidate += timedelta(days=(weekday - candidate.weekday()) % 7)
+            if candidate <= after:
+                candidate += timedelta(weeks=1)
+        else:
+            months = 3 if self.frequency == 'quarterly' else 1
+            candidate = candidate.replace(day=min(max(self.delivery_day_of_month or 1, 1), 28))
+            while candidate <= after:
+                candidate += relativedelta(months=months)
+        
+        self.next_delivery = candidate
+        return candidate
+    
+    def get_email_recipients(self):
+        return [email.strip() for email in (self.email_recipients or '').split(',') if email.strip()]
\ No newline at end of file
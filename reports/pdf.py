@@ -0,0 +1,254 @@
+"""
+PDF report engine
+Reports are laid out with ReportLab platypus: a page template with header
+and footer, flowable tables for summary, campaign metrics and top performers,
+and vector bar charts. Output is rendered to a temporary file on disk and
+streamed into the configured storage backend in chunks, so no full copy of
+the document is held in memory alongside the layout
+"""
+
+import tempfile
+from contextlib import nullcontext
+from io import BytesIO
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.html import escape
+
+from reportlab.graphics.charts.barcharts import HorizontalBarChart
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import (
+    BaseDocTemplate, CondPageBreak, Frame, Image, KeepTogether, PageTemplate,
+    Paragraph, Spacer, Table, TableStyle,
+)
+
+PAGE_SIZE = letter
+MARGIN = 0.6 * inch
+
+# Campaigns shown in the overview charts
+CHART_CAMPAIGN_LIMIT = 15
+
+BRAND_COLOR = colors.HexColor('#1f3a5f')
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), BRAND_COLOR),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f4f7')]),
+    ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#c8ccd2')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+
+def _money(value):
+    return f"${value or 0:,.2f}"
+
+
+def _number(value):
+    return f"{value or 0:,}"
+
+
+def _percent(value):
+    return f"{value or 0:.2f}%"
+
+
+def _truncate(value, length=32):
+    value = value or ''
+    return value if len(value) <= length else value[:length - 1] + '…'
+
+
+class ReportPDFBuilder:
+    """Lays out campaign report data as platypus flowables"""
+
+    def __init__(self, title, agency_name, data, generated_at=None, charts=None):
+        self.title = title
+        self.agency_name = agency_name
+        self.data = data
+        # Pre-rendered [(config, png bytes)]; the built-in vector charts are used without them
+        self.charts = charts or []
+        self.generated_at = generated_at or timezone.now()
+        self.styles = getSampleStyleSheet()
+        self.frame_width = PAGE_SIZE[0] - 2 * MARGIN
+
+    # Page template
+
+    def _draw_page(self, canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica', 8)
+        canvas.setFillColor(colors.grey)
+        canvas.drawString(MARGIN, PAGE_SIZE[1] - MARGIN + 12, _truncate(self.title, 90))
+        canvas.drawString(MARGIN, MARGIN - 20, self.agency_name)
+        canvas.drawRightString(PAGE_SIZE[0] - MARGIN, MARGIN - 20, f"Page {doc.page}")
+        canvas.restoreState()
+
+    def _document(self, output):
+        doc = BaseDocTemplate(
+            output,
+            pagesize=PAGE_SIZE,
+            leftMargin=MARGIN, rightMargin=MARGIN,
+            topMargin=MARGIN, bottomMargin=MARGIN,
+            title=self.title,
+            author=self.agency_name,
+        )
+        frame = Frame(MARGIN, MARGIN, self.frame_width, PAGE_SIZE[1] - 2 * MARGIN, id='content')
+        doc.addPageTemplates([PageTemplate(id='report', frames=[frame], onPage=self._draw_page)])
+        return doc
+
+    # Flowables
+
+    def _table(self, header, rows, col_widths=None):
+        table = Table([header] + rows, colWidths=col_widths, repeatRows=1)
+        table.setStyle(TABLE_STYLE)
+        return table
+
+    def _bar_chart(self, title, labels, values):
+        """Horizontal bar chart as a vector drawing"""
+        bar_height = 14
+        chart_height = max(len(values), 1) * bar_height
+        drawing = Drawing(self.frame_width, chart_height + 40)
+        drawing.add(String(0, chart_height + 26, title, fontName='Helvetica-Bold', fontSize=10))
+
+        chart = HorizontalBarChart()
+        chart.x = 150
+        chart.y = 10
+        chart.width = self.frame_width - 170
+        chart.height = chart_height
+        chart.data = [list(values)]
+        chart.categoryAxis.categoryNames = [_truncate(label, 28) for label in labels]
+        chart.categoryAxis.labels.fontSize = 7
+        chart.categoryAxis.reverseDirection = True
+        chart.valueAxis.labels.fontSize = 7
+        chart.valueAxis.valueMin = 0
+        chart.bars[0].fillColor = BRAND_COLOR
+        drawing.add(chart)
+        return drawing
+
+    def summary_flowables(self):
+        summary = self.data.get('summary', {})
+        rows = [
+            ['Total Campaigns', _number(summary.get('total_campaigns', 0))],
+            ['Total Budget', _money(summary.get('total_budget', 0))],
+            ['Total Spent', _money(summary.get('total_spent', 0))],
+            ['Budget Utilization', _percent(summary.get('budget_utilization', 0))],
+            ['Total Engagement', _number(summary.get('total_engagement', 0))],
+            ['Total Reach', _number(summary.get('total_reach', 0))],
+            ['Average Engagement Rate', _percent(summary.get('avg_engagement_rate', 0))],
+            ['Average ROI', _percent(summary.get('avg_roi', 0))],
+        ]
+        yield Paragraph('Executive Summary', self.styles['Heading2'])
+        yield self._table(['Metric', 'Value'], rows, col_widths=[2.5 * inch, 2 * inch])
+        yield Spacer(1, 12)
+
+    def chart_flowables(self):
+        if self.charts:
+            for _, image_bytes in self.charts:
+                image = Image(BytesIO(image_bytes))
+                # Scale to the frame width, keeping the aspect ratio
+                image.drawHeight = self.frame_width * image.imageHeight / image.imageWidth
+                image.drawWidth = self.frame_width
+                yield image
+                yield Spacer(1, 12)
+            return
+
+        campaigns = self.data.get('campaigns', [])
+        if not campaigns:
+            return
+        leaders = sorted(campaigns, key=lambda c: c['total_engagement'], reverse=True)[:CHART_CAMPAIGN_LIMIT]
+        yield self._bar_chart(
+            'Engagement by Campaign',
+            [c['campaign_name'] for c in leaders],
+            [c['total_engagement'] for c in leaders],
+        )
+        yield Spacer(1, 12)
+        yield self._bar_chart(
+            'Spend by Campaign',
+            [c['campaign_name'] for c in leaders],
+            [c['total_spent'] for c in leaders],
+        )
+        yield Spacer(1, 12)
+
+    def campaign_flowables(self, campaign):
+        heading = Paragraph(escape(campaign['campaign_name']), self.styles['Heading3'])
+        metrics = self._table(
+            ['Type', 'Status', 'Budget', 'Spent', 'Reach', 'Engagement', 'Eng. Rate', 'ROI'],
+            [[
+                campaign['campaign_type'], campaign['status'],
+                _money(campaign['total_budget']), _money(campaign['total_spent']),
+                _number(campaign['total_reach']), _number(campaign['total_engagement']),
+                _percent(campaign['avg_engagement_rate']), _percent(campaign['roi_percentage']),
+            ]],
+        )
+        # Keep the heading with its metrics table
+        yield CondPageBreak(1.5 * inch)
+        yield KeepTogether([heading, metrics])
+        yield Spacer(1, 6)
+
+        top_content = campaign.get('top_content', [])
+        if top_content:
+            yield Paragraph('Top Content', self.styles['Heading4'])
+            yield self._table(
+                ['Influencer', 'Likes', 'Comments', 'Shares', 'Views', 'Eng. Rate'],
+                [[
+                    _truncate(item['influencer']), _number(item['likes']), _number(item['comments']),
+                    _number(item['shares']), _number(item['views']), _percent(item['engagement_rate']),
+                ] for item in top_content],
+            )
+            yield Spacer(1, 6)
+
+        top_influencers = campaign.get('top_influencers', [])
+        if top_influencers:
+            yield Paragraph('Top Influencers', self.styles['Heading4'])
+            yield self._table(
+                ['Influencer', 'Rate', 'Engagement', 'Views', 'Eng. Rate', 'CPE'],
+                [[
+                    _truncate(item['influencer_name']), _money(item['agreed_rate']),
+                    _number(item['total_engagement']), _number(item['total_views']),
+                    _percent(item['engagement_rate']), _money(item['cost_per_engagement']),
+                ] for item in top_influencers],
+            )
+        yield Spacer(1, 14)
+
+    def flowables(self):
+        yield Paragraph(escape(self.title), self.styles['Title'])
+        yield Paragraph(
+            escape(f"Generated on {self.generated_at.strftime('%B %d, %Y')} · Agency: {self.agency_name}"),
+            self.styles['Normal'],
+        )
+        yield Spacer(1, 18)
+        yield from self.summary_flowables()
+        yield from self.chart_flowables()
+
+        yield Paragraph('Campaign Performance Details', self.styles['Heading2'])
+        for campaign in self.data.get('campaigns', []):
+            yield from self.campaign_flowables(campaign)
+
+    def build(self, output):
+        """Render the PDF into a path or writable binary file object"""
+        self._document(output).build(list(self.flowables()))
+        return output
+
+
+def save_report_pdf(name, title, agency_name, data, storage=None, timer=None, charts=None):
+    """
+    Render the report to a temporary file and stream it into storage.
+    Returns (stored name, size in bytes); the backend may adjust the name
+    to avoid clashes. A StageTimer, if given, times the render and upload stages.
+    """
+    storage = storage or default_storage
+    stage = timer.stage if timer else (lambda name: nullcontext())
+    builder = ReportPDFBuilder(title, agency_name, data, charts=charts)
+    with tempfile.TemporaryFile(suffix='.pdf') as output:
+        with stage('render'):
+            builder.build(output)
+        size = output.tell()
+        output.seek(0)
+        with stage('upload'):
+            stored_name = storage.save(name, File(output, name=name))
+    return stored_name, size
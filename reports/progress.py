@@ -0,0 +1,86 @@
+"""
+Report generation progress
+Live progress (stage, campaigns processed / total) lives in the cache
+(Redis in deployed environments) so workers can update it on every step
+without touching the database. Chunked collection increments the processed
+counter atomically from parallel workers
+"""
+
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+PROGRESS_KEY = 'report_progress:{}'
+PROCESSED_KEY = 'report_progress:{}:processed'
+PROGRESS_TIMEOUT = 60 * 60 * 2
+
+STAGES = ('collect', 'charts', 'render', 'upload')
+
+# Share of the progress bar at the start of each stage
+STAGE_OFFSETS = {'collect': 0, 'charts': 65, 'render': 75, 'upload': 90}
+STAGE_SPANS = {'collect': 65, 'charts': 10, 'render': 15, 'upload': 10}
+
+
+def start_progress(report_id, total):
+    cache.set_many({
+        PROGRESS_KEY.format(report_id): {'stage': 'collect', 'total': total},
+        PROCESSED_KEY.format(report_id): 0,
+    }, PROGRESS_TIMEOUT)
+
+
+def set_stage(report_id, stage):
+    key = PROGRESS_KEY.format(report_id)
+    progress = cache.get(key) or {}
+    progress['stage'] = stage
+    cache.set(key, progress, PROGRESS_TIMEOUT)
+
+
+def add_processed(report_id, count):
+    key = PROCESSED_KEY.format(report_id)
+    try:
+        cache.incr(key, count)
+    except ValueError:
+        # Counter expired or was never started
+        cache.add(key, count, PROGRESS_TIMEOUT)
+
+
+def clear_progress(report_id):
+    cache.delete_many([PROGRESS_KEY.format(report_id), PROCESSED_KEY.format(report_id)])
+
+
+def get_progress(report_id):
+    """
+    {'stage', 'processed', 'total', 'percent'} for a generating report, or
+    None when no progress has been recorded
+    """
+    values = cache.get_many([PROGRESS_KEY.format(report_id), PROCESSED_KEY.format(report_id)])
+    progress = values.get(PROGRESS_KEY.format(report_id))
+    if progress is None:
+        return None
+
+    stage = progress.get('stage', 'collect')
+    total = progress.get('total') or 0
+    processed = min(values.get(PROCESSED_KEY.format(report_id)) or 0, total)
+
+    fraction = processed / total if stage == 'collect' and total else 0
+    percent = STAGE_OFFSETS.get(stage, 0) + int(STAGE_SPANS.get(stage, 0) * fraction)
+    return {'stage': stage, 'processed': processed, 'total': total, 'percent': min(percent, 99)}
+
+
+class StageTimer:
+    """Times generation stages and publishes the current one as progress"""
+
+    def __init__(self, report_id, durations=None):
+        self.report_id = report_id
+        self.durations = dict(durations or {})
+
+    @contextmanager
+    def stage(self, name):
+        set_stage(self.report_id, name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.durations[name] = round(self.durations.get(name, 0) + elapsed, 3)
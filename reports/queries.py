@@ -0,0 +1,146 @@
+"""
+Set-based data collection for reports
+Every section is one grouped or windowed query over all requested campaigns,
+so an agency-wide report costs the same number of queries as a single
+campaign report. Top-N sections rank and limit in the database per campaign
+"""
+
+from django.db.models import Count, F, FloatField, Q, Sum, Value, Window
+from django.db.models.functions import Cast, Coalesce, Greatest, RowNumber
+
+from campaigns.analytics import recompute_campaigns_analytics
+from campaigns.models import Campaign, CampaignContent, InfluencerCollaboration
+
+TOP_N = 10
+
+ACTIVE_COLLABORATION_STATUSES = ['accepted', 'in_progress', 'published']
+
+
+def _engagement_rate(engagement, views):
+    """engagement / max(views, 1) * 100, as a float in SQL"""
+    return Cast(engagement, FloatField()) * Value(100.0) / Cast(Greatest(views, Value(1)), FloatField())
+
+
+def campaign_rows(campaigns):
+    """
+    Campaigns with budget totals, collaboration counts and stored analytics
+    in one query. Campaigns without an analytics row get it initialised in
+    one grouped recompute first.
+    """
+    campaign_ids = list(campaigns.values_list('id', flat=True))
+    missing = list(
+        Campaign.objects.filter(id__in=campaign_ids, analytics__isnull=True).values_list('id', flat=True)
+    )
+    if missing:
+        recompute_campaigns_analytics(missing)
+
+    return list(
+        Campaign.objects.filter(id__in=campaign_ids)
+        .with_budget_totals()
+        .annotate(
+            active_collaborations=Count(
+                'collaborations', filter=Q(collaborations__status__in=ACTIVE_COLLABORATION_STATUSES)
+            ),
+            completed_collaborations=Count(
+                'collaborations', filter=Q(collaborations__status='completed')
+            ),
+        )
+        .select_related('analytics')
+        .order_by('id')
+    )
+
+
+def content_counts(campaign_ids):
+    """{campaign_id: {'content_pieces', 'approved_content'}} from one grouped query"""
+    rows = CampaignContent.objects.filter(
+        collaboration__campaign_id__in=campaign_ids
+    ).order_by().values('collaboration__campaign_id').annotate(
+        content_pieces=Count('id'),
+        approved_content=Count('id', filter=Q(status='approved')),
+    )
+    return {row.pop('collaboration__campaign_id'): row for row in rows}
+
+
+def top_content(campaign_ids, limit=TOP_N):
+    """{campaign_id: [content, ...]} ranked by engagement rate, top `limit` per campaign"""
+    engagement = F('likes_count') + F('comments_count') + F('shares_count')
+    rows = CampaignContent.objects.filter(
+        collaboration__campaign_id__in=campaign_ids
+    ).annotate(
+        total_engagement=engagement,
+        engagement_rate=_engagement_rate(engagement, F('views_count')),
+    ).annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=F('collaboration__campaign_id'),
+            order_by=[F('engagement_rate').desc(), F('id').asc()],
+        ),
+    ).filter(rank__lte=limit).order_by(
+        'collaboration__campaign_id', 'rank'
+    ).values(
+        'id', 'post_url', 'likes_count', 'comments_count', 'shares_count', 'views_count',
+        'total_engagement', 'engagement_rate', 'status',
+        'collaboration__campaign_id', 'collaboration__influencer__full_name',
+    )
+
+    results = {}
+    for row in rows:
+        results.setdefault(row['collaboration__campaign_id'], []).append({
+            'content_id': row['id'],
+            'post_url': row['post_url'],
+            'likes': row['likes_count'],
+            'comments': row['comments_count'],
+            'shares': row['shares_count'],
+            'views': row['views_count'],
+            'total_engagement': row['total_engagement'],
+            'engagement_rate': row['engagement_rate'],
+            'influencer': row['collaboration__influencer__full_name'],
+            'status': row['status'],
+        })
+    return results
+
+
+def top_influencers(campaign_ids, limit=TOP_N):
+    """{campaign_id: [influencer, ...]} ranked by engagement rate over their content"""
+    engagement = Coalesce(
+        Sum(F('content__likes_count') + F('content__comments_count') + F('content__shares_count')),
+        0,
+    )
+    rows = InfluencerCollaboration.objects.filter(
+        campaign_id__in=campaign_ids
+    ).annotate(
+        total_engagement=engagement,
+        total_views=Coalesce(Sum('content__views_count'), 0),
+        content_count=Count('content'),
+    ).annotate(
+        engagement_rate=_engagement_rate(F('total_engagement'), F('total_views')),
+    ).annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=F('campaign_id'),
+            order_by=[F('engagement_rate').desc(), F('id').asc()],
+        ),
+    ).filter(rank__lte=limit).order_by(
+        'campaign_id', 'rank'
+    ).values(
+        'campaign_id', 'influencer_id', 'influencer__full_name', 'influencer__username',
+        'agreed_rate', 'total_engagement', 'total_views', 'engagement_rate',
+        'content_count', 'status',
+    )
+
+    results = {}
+    for row in rows:
+        agreed_rate = float(row['agreed_rate'])
+        results.setdefault(row['campaign_id'], []).append({
+            'influencer_id': row['influencer_id'],
+            'influencer_name': row['influencer__full_name'],
+            'username': row['influencer__username'],
+            'agreed_rate': agreed_rate,
+            'total_engagement': row['total_engagement'],
+            'total_views': row['total_views'],
+            'engagement_rate': row['engagement_rate'],
+            'cost_per_engagement': agreed_rate / max(row['total_engagement'], 1),
+            'content_count': row['content_count'],
+            'status': row['status'],
+        })
+    return results
@@ -0,0 +1,185 @@
+"""
+Report result cache
+A report's output depends on its type, format, parameters, filters, agency
+and the agency's campaign data. Requests that hash to the same key link to
+the file of an earlier completed report, and identical requests arriving
+while one is generating wait on that single in-flight task instead of
+generating again
+"""
+
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Report
+
+logger = logging.getLogger(__name__)
+
+INFLIGHT_KEY = 'report_inflight:{}'
+
+
+def _inflight_timeout():
+    """
+    How long an in-flight marker outlives its last heartbeat. A run can't
+    outlast the task time limit, so an expired marker means the worker died.
+    """
+    return getattr(settings, 'REPORT_INFLIGHT_TIMEOUT', getattr(settings, 'CELERY_TASK_TIME_LIMIT', 3600))
+
+
+def normalize_parameters(value):
+    """Drop empty values and trim strings so equivalent requests hash alike"""
+    if isinstance(value, dict):
+        normalized = {}
+        for key, item in value.items():
+            item = normalize_parameters(item)
+            if item not in (None, '', [], {}):
+                normalized[str(key)] = item
+        return normalized
+    if isinstance(value, (list, tuple)):
+        return [normalize_parameters(item) for item in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def data_watermark(agency_id):
+    """
+    Changes whenever the agency's report inputs change: campaign,
+    collaboration and content edits (status changes included), analytics
+    recomputes and rows being added or removed. One aggregate query.
+    """
+    from campaigns.models import Campaign
+
+    marks = Campaign.objects.filter(agency_id=agency_id).aggregate(
+        campaign_count=Count('id', distinct=True),
+        campaign_updated=Max('updated_at'),
+        collaboration_count=Count('collaborations', distinct=True),
+        collaboration_updated=Max('collaborations__updated_at'),
+        analytics_calculated=Max('analytics__last_calculated'),
+        content_count=Count('collaborations__content', distinct=True),
+        content_latest=Max('collaborations__content__id'),
+        content_updated=Max('collaborations__content__updated_at'),
+    )
+    return {key: value.isoformat() if hasattr(value, 'isoformat') else value for key, value in marks.items()}
+
+
+def report_cache_key(report):
+    payload = {
+        'report_type': report.report_type,
+        'file_format': report.file_format,
+        'parameters': normalize_parameters(report.parameters or {}),
+        'filters': normalize_parameters(report.filters or {}),
+        'agency': report.agency_id,
+        'watermark': data_watermark(report.agency_id),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def find_cached_report(cache_key, exclude_id=None):
+    reports = Report.objects.filter(cache_key=cache_key, status='completed').exclude(file_path='')
+    if exclude_id:
+        reports = reports.exclude(pk=exclude_id)
+    return reports.order_by('-generation_completed_at').first()
+
+
+def _link_result(report, source):
+    """Point report at source's output without regenerating"""
+    report.file_path = source.file_path.name if source.file_path else None
+    report.report_data = source.report_data
+    report.status = source.status
+    report.error_message = source.error_message
+    report.generation_completed_at = timezone.now()
+    report.save(update_fields=[
+        'file_path', 'report_data', 'status', 'error_message', 'generation_completed_at', 'updated_at',
+    ])
+
+
+def _dispatch_generation(report):
+    """Claim the in-flight marker and queue a run; False if a run already holds it"""
+    key = INFLIGHT_KEY.format(report.cache_key)
+    if not cache.add(key, report.pk, timeout=_inflight_timeout()):
+        return False
+
+    from .tasks import generate_report_task
+    try:
+        generate_report_task.delay(report.pk)
+    except Exception:
+        cache.delete(key)
+        raise
+    return True
+
+
+def request_report_generation(report, use_cached=True):
+    """
+    Queue generation for a report, reusing an earlier result when possible.
+    Returns 'cached', 'coalesced' or 'queued'.
+    """
+    # Saved before any lookup so a finishing leader always sees this report
+    report.cache_key = report_cache_key(report)
+    report.save(update_fields=['cache_key', 'updated_at'])
+
+    if use_cached:
+        cached = find_cached_report(report.cache_key, exclude_id=report.pk)
+        if cached is not None:
+            _link_result(report, cached)
+            return 'cached'
+
+    if not _dispatch_generation(report):
+        # An identical report is generating; it completes this one too
+        return 'coalesced'
+    return 'queued'
+
+
+def touch_inflight(report):
+    """Heartbeat from a running generation: keep its marker from expiring"""
+    if report.cache_key:
+        cache.touch(INFLIGHT_KEY.format(report.cache_key), _inflight_timeout())
+
+
+def resume_stalled_generation(report):
+    """
+    Re-dispatch a generating report whose in-flight marker has expired: the
+    run it waited on died without completing it. Returns True when queued.
+    """
+    if report.status != 'generating' or not report.cache_key:
+        return False
+    if not _dispatch_generation(report):
+        return False
+    logger.warning(f"Report {report.pk} was left generating by a lost run; generation re-queued")
+    return True
+
+
+def complete_coalesced_reports(report):
+    """
+    Copy a finished report's outcome to identical reports waiting on it and
+    release the in-flight marker. Called after the report's own status is
+    saved; returns the reports that were completed.
+    """
+    if not report.cache_key:
+        return []
+    try:
+        waiting = list(Report.objects.filter(
+            cache_key=report.cache_key, status='generating'
+        ).exclude(pk=report.pk))
+        for waiting_report in waiting:
+            _link_result(waiting_report, report)
+        return waiting
+    finally:
+        cache.delete(INFLIGHT_KEY.format(report.cache_key))
+
+
+def delete_report_file(report):
+    """Delete the report's file unless another report links to it"""
+    if not report.file_path:
+        return False
+    shared = Report.objects.filter(file_path=report.file_path.name).exclude(pk=report.pk).exists()
+    if shared:
+        return False
+    report.file_path.delete(save=False)
+    return True
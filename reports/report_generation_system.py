@@ -3,23 +3,24 @@ Report Generation System for Influencer Platform
 Handles manual, scheduled, and real-time report creation
 """
 
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse, HttpResponse
-from django.contrib.auth.decorators import login_required
 from django.utils import timezone
-from django.template.loader import render_to_string
-from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+import io
 import json
 import os
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
+import tempfile
 import pandas as pd
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from io import BytesIO
 
-from .models import Report, ReportTemplate, Campaign, CampaignAnalytics
-from campaigns.models import Campaign, InfluencerCollaboration, CampaignContent
+from .charts import DEFAULT_CHARTS, render_charts
+from .exports import (
+    CAMPAIGN_COLUMNS, TOP_CONTENT_COLUMNS, TOP_INFLUENCER_COLUMNS,
+    dict_rows, nested_rows, write_xlsx,
+)
+from .pdf import save_report_pdf
+from .progress import StageTimer, add_processed, clear_progress, start_progress
+from .queries import campaign_rows, content_counts, top_content, top_influencers
+from campaigns.models import Campaign
 
 
 class ReportGenerator:
@@ -28,79 +29,145 @@ class ReportGenerator:
     def __init__(self, report):
         self.report = report
         self.data = {}
+        self.timer = StageTimer(report.id)
+        self.charts = []
         
     def generate_report(self):
         """Main report generation method"""
         try:
-            # Set status to generating
-            self.report.status = 'generating'
-            self.report.generation_started_at = timezone.now()
-            self.report.save()
+            self.mark_generating()
             
             # Collect data based on report type
             self.collect_data()
             
-            # Generate the actual report file
-            if self.report.file_format == 'pdf':
-                file_path = self.generate_pdf_report()
-            elif self.report.file_format == 'excel':
-                file_path = self.generate_excel_report()
-            elif self.report.file_format == 'csv':
-                file_path = self.generate_csv_report()
-            elif self.report.file_format == 'json':
-                file_path = self.generate_json_report()
-            else:
-                file_path = self.generate_pdf_report()  # Default
-            
-            # Update report record
-            self.report.file_path = file_path
-            self.report.report_data = self.data
-            self.report.status = 'completed'
-            self.report.generation_completed_at = timezone.now()
-            self.report.save()
-            
-            return file_path
+            return self.render_report()
             
         except Exception as e:
-            self.report.status = 'failed'
-            self.report.error_message = str(e)
-            self.report.save()
+            self.mark_failed(e)
             raise e
     
+    def mark_generating(self, total=0):
+        """Mark the report generating and start progress over `total` campaigns"""
+        self.report.status = 'generating'
+        self.report.generation_started_at = timezone.now()
+        self.report.save()
+        start_progress(self.report.id, total)
+    
+    def mark_failed(self, error):
+        self.report.status = 'failed'
+        self.report.error_message = str(error)
+        self.report.stage_durations = self.timer.durations
+        self.report.save()
+        clear_progress(self.report.id)
+    
+    def render_report(self):
+        """Write the report file from collected data and mark the report completed"""
+        if self.report.file_format not in ('csv', 'json'):
+            with self.timer.stage('charts'):
+                self.charts = self.render_charts()
+        
+        # Every format is rendered to a temporary file and streamed into storage,
+        # with render and upload timed separately
+        if self.report.file_format == 'excel':
+            file_path, file_size = self.generate_excel_report()
+        elif self.report.file_format == 'csv':
+            file_path, file_size = self.generate_csv_report()
+        elif self.report.file_format == 'json':
+            file_path, file_size = self.generate_json_report()
+        else:
+            file_path, file_size = self.generate_pdf_report()
+        
+        # Update report record
+        self.report.file_path = file_path
+        self.report.report_data = self.data
+        self.report.status = 'completed'
+        self.report.generation_completed_at = timezone.now()
+        self.report.stage_durations = self.timer.durations
+        self.report.row_counts = self.row_counts()
+        self.report.file_size = file_size if file_size is not None else self.stored_file_size()
+        self.report.save()
+        clear_progress(self.report.id)
+        
+        return file_path
+    
+    def chart_configurations(self):
+        """The report template's charts, or the default engagement and spend charts"""
+        template = self.report.template
+        if template and template.chart_configurations:
+            return template.chart_configurations
+        return DEFAULT_CHARTS
+    
+    def render_charts(self):
+        """Rendered PNGs for the report's charts; unchanged charts come from the chart store"""
+        if not self.data.get('campaigns'):
+            return []
+        return render_charts(self.chart_configurations(), self.data)
+    
+    def row_counts(self):
+        campaigns = self.data.get('campaigns', [])
+        return {
+            'campaigns': len(campaigns),
+            'top_content': sum(len(campaign.get('top_content', [])) for campaign in campaigns),
+            'top_influencers': sum(len(campaign.get('top_influencers', [])) for campaign in campaigns),
+        }
+    
+    def stored_file_size(self):
+        try:
+            return self.report.file_path.size
+        except Exception:
+            return None
+    
     def collect_data(self):
         """Collect data based on report type"""
         
-        if self.report.report_type == 'campaign_performance':
-            self.collect_campaign_performance_data()
-        elif self.report.report_type == 'influencer_analytics':
-            self.collect_influencer_analytics_data()
-        elif self.report.report_type == 'roi_analysis':
-            self.collect_roi_analysis_data()
-        elif self.report.report_type == 'agency_dashboard':
-            self.collect_agency_dashboard_data()
-        else:
-            self.collect_custom_report_data()
+        with self.timer.stage('collect'):
+            if self.report.report_type == 'campaign_performance':
+                self.collect_campaign_performance_data()
+            elif self.report.report_type == 'influencer_analytics':
+                self.collect_influencer_analytics_data()
+            elif self.report.report_type == 'roi_analysis':
+                self.collect_roi_analysis_data()
+            elif self.report.report_type == 'agency_dashboard':
+                self.collect_agency_dashboard_data()
+            else:
+                self.collect_custom_report_data()
     
-    def collect_campaign_performance_data(self):
-        """Collect campaign performance data"""
+    def campaign_queryset(self):
+        """Campaigns covered by a campaign performance report"""
+        campaigns = Campaign.objects.filter(agency=self.report.agency)
         campaign_id = self.report.parameters.get('campaign_id')
-        date_range = self.report.parameters.get('date_range', '30d')
-        
         if campaign_id:
-            campaigns = [Campaign.objects.get(id=campaign_id)]
-        else:
-            # All agency campaigns
-            campaigns = Campaign.objects.filter(agency=self.report.agency)
+            campaigns = campaigns.filter(id=campaign_id)
+        return campaigns
+    
+    def collection_chunks(self, chunk_size):
+        """
+        Campaign id chunks for parallel collection. Empty for report types
+        that are collected in one pass.
+        """
+        if self.report.report_type != 'campaign_performance':
+            return []
+        campaign_ids = list(self.campaign_queryset().order_by('id').values_list('id', flat=True))
+        return [campaign_ids[start:start + chunk_size] for start in range(0, len(campaign_ids), chunk_size)]
+    
+    def collect_campaign_performance_data(self):
+        """Collect campaign performance data with a fixed number of grouped queries"""
+        self.set_campaign_performance_data(self.collect_campaign_stats(self.campaign_queryset()))
+    
+    def collect_campaign_stats(self, campaigns):
+        """Per-campaign stats for a campaign queryset (one chunk or the whole report)"""
+        rows = campaign_rows(campaigns)
+        campaign_ids = [campaign.id for campaign in rows]
+        content_stats = content_counts(campaign_ids)
+        content_leaders = top_content(campaign_ids)
+        influencer_leaders = top_influencers(campaign_ids)
         
         campaign_data = []
         
-        for campaign in campaigns:
-            # Update analytics first
-            from campaigns.views import update_campaign_analytics
-            analytics = update_campaign_analytics(campaign)
-            
-            collaborations = campaign.collaborations.all()
-            content_items = CampaignContent.objects.filter(collaboration__campaign=campaign)
+        for campaign in rows:
+            # Stored analytics are kept current on write
+            analytics = campaign.analytics
+            content = content_stats.get(campaign.id, {})
             
             campaign_stats = {
                 'campaign_id': campaign.id,
@@ -110,8 +177,8 @@ class ReportGenerator:
                 'start_date': campaign.start_date.isoformat() if campaign.start_date else None,
                 'end_date': campaign.end_date.isoformat() if campaign.end_date else None,
                 'total_budget': float(campaign.total_budget),
-                'total_spent': float(campaign.get_total_spent()),
-                'remaining_budget': float(campaign.get_remaining_budget()),
+                'total_spent': float(campaign.spent_total),
+                'remaining_budget': float(campaign.remaining_budget_total),
                 
                 # Analytics
                 'total_reach': analytics.total_reach,
@@ -125,19 +192,27 @@ class ReportGenerator:
                 'roi_percentage': float(analytics.roi_percentage),
                 
                 # Collaboration stats
-                'total_collaborations': collaborations.count(),
-                'active_collaborations': collaborations.filter(status__in=['accepted', 'in_progress', 'published']).count(),
-                'completed_collaborations': collaborations.filter(status='completed').count(),
-                'content_pieces': content_items.count(),
-                'approved_content': content_items.filter(status='approved').count(),
+                'total_collaborations': campaign.collaborations_count,
+                'active_collaborations': campaign.active_collaborations,
+                'completed_collaborations': campaign.completed_collaborations,
+                'content_pieces': content.get('content_pieces', 0),
+                'approved_content': content.get('approved_content', 0),
                 
                 # Top performers
-                'top_content': self.get_top_content(content_items),
-                'top_influencers': self.get_top_influencers(collaborations),
+                'top_content': content_leaders.get(campaign.id, []),
+                'top_influencers': influencer_leaders.get(campaign.id, []),
             }
             
             campaign_data.append(campaign_stats)
         
+        add_processed(self.report.id, len(campaign_data))
+        return campaign_data
+    
+    def set_campaign_performance_data(self, campaign_data):
+        """Assemble report data from collected (or merged) campaign stats"""
+        campaign_data = sorted(campaign_data, key=lambda campaign: campaign['campaign_id'])
+        date_range = self.report.parameters.get('date_range', '30d')
+        
         self.data = {
             'report_type': 'campaign_performance',
             'generated_at': timezone.now().isoformat(),
@@ -146,59 +221,6 @@ class ReportGenerator:
             'summary': self.calculate_summary_stats(campaign_data)
         }
     
-    def get_top_content(self, content_items):
-        """Get top performing content"""
-        top_content = []
-        
-        for content in content_items:
-            total_engagement = content.likes_count + content.comments_count + content.shares_count
-            engagement_rate = (total_engagement / max(content.views_count, 1)) * 100
-            
-            top_content.append({
-                'content_id': content.id,
-                'post_url': content.post_url,
-                'likes': content.likes_count,
-                'comments': content.comments_count,
-                'shares': content.shares_count,
-                'views': content.views_count,
-                'total_engagement': total_engagement,
-                'engagement_rate': engagement_rate,
-                'influencer': content.collaboration.influencer.full_name,
-                'status': content.status,
-            })
-        
-        # Sort by engagement rate
-        top_content.sort(key=lambda x: x['engagement_rate'], reverse=True)
-        return top_content[:10]  # Top 10
-    
-    def get_top_influencers(self, collaborations):
-        """Get top performing influencers"""
-        influencer_stats = []
-        
-        for collaboration in collaborations:
-            content_items = collaboration.content.all()
-            total_engagement = sum(
-                content.likes_count + content.comments_count + content.shares_count 
-                for content in content_items
-            )
-            total_views = sum(content.views_count for content in content_items)
-            
-            influencer_stats.append({
-                'influencer_id': collaboration.influencer.id,
-                'influencer_name': collaboration.influencer.full_name,
-                'username': collaboration.influencer.username,
-                'agreed_rate': float(collaboration.agreed_rate),
-                'total_engagement': total_engagement,
-                'total_views': total_views,
-                'engagement_rate': (total_engagement / max(total_views, 1)) * 100,
-                'cost_per_engagement': float(collaboration.agreed_rate) / max(total_engagement, 1),
-                'content_count': content_items.count(),
-                'status': collaboration.status,
-            })
-        
-        influencer_stats.sort(key=lambda x: x['engagement_rate'], reverse=True)
-        return influencer_stats[:10]  # Top 10
-    
     def calculate_summary_stats(self, campaign_data):
         """Calculate summary statistics"""
         if not campaign_data:
@@ -222,237 +244,79 @@ class ReportGenerator:
         }
     
     def generate_pdf_report(self):
-        """Generate PDF report using ReportLab"""
-        buffer = BytesIO()
-        
-        # Create PDF canvas
-        p = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-        
-        # Title
-        p.setFont("Helvetica-Bold", 24)
-        p.drawString(50, height - 50, self.report.title)
-        
-        # Subtitle
-        p.setFont("Helvetica", 12)
-        p.drawString(50, height - 80, f"Generated on {timezone.now().strftime('%B %d, %Y')}")
-        p.drawString(50, height - 100, f"Agency: {self.report.agency.name}")
-        
-        y_position = height - 140
-        
-        # Summary section
-        p.setFont("Helvetica-Bold", 16)
-        p.drawString(50, y_position, "Executive Summary")
-        y_position -= 30
-        
-        summary = self.data.get('summary', {})
-        p.setFont("Helvetica", 12)
-        
-        summary_items = [
-            f"Total Campaigns: {summary.get('total_campaigns', 0)}",
-            f"Total Budget: ${summary.get('total_budget', 0):,.2f}",
-            f"Total Spent: ${summary.get('total_spent', 0):,.2f}",
-            f"Budget Utilization: {summary.get('budget_utilization', 0):.1f}%",
-            f"Total Engagement: {summary.get('total_engagement', 0):,}",
-            f"Average ROI: {summary.get('avg_roi', 0):.1f}%",
-        ]
-        
-        for item in summary_items:
-            p.drawString(70, y_position, item)
-            y_position -= 20
-        
-        # Campaign details section
-        y_position -= 20
-        p.setFont("Helvetica-Bold", 16)
-        p.drawString(50, y_position, "Campaign Performance Details")
-        y_position -= 30
-        
-        for campaign in self.data.get('campaigns', []):
-            if y_position < 100:  # Start new page
-                p.showPage()
-                y_position = height - 50
-            
-            p.setFont("Helvetica-Bold", 14)
-            p.drawString(50, y_position, campaign['campaign_name'])
-            y_position -= 20
-            
-            p.setFont("Helvetica", 10)
-            campaign_items = [
-                f"Type: {campaign['campaign_type']} | Status: {campaign['status']}",
-                f"Budget: ${campaign['total_budget']:,.2f} | Spent: ${campaign['total_spent']:,.2f}",
-                f"Reach: {campaign['total_reach']:,} | Engagement: {campaign['total_engagement']:,}",
-                f"Engagement Rate: {campaign['avg_engagement_rate']:.2f}% | ROI: {campaign['roi_percentage']:.1f}%",
-                f"Collaborations: {campaign['total_collaborations']} | Content Pieces: {campaign['content_pieces']}",
-            ]
-            
-            for item in campaign_items:
-                p.drawString(70, y_position, item)
-                y_position -= 15
-            
-            y_position -= 10
-        
-        p.save()
-        
-        # Save file
+        """Generate PDF report and stream it into the storage backend. Returns (name, size)"""
         filename = f"report_{self.report.id}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         file_path = os.path.join('reports', filename)
-        full_path = os.path.join(settings.MEDIA_ROOT, file_path)
         
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        
-        with open(full_path, 'wb') as f:
-            f.write(buffer.getvalue())
-        
-        buffer.close()
-        return file_path
+        return save_report_pdf(
+            file_path, self.report.title, self.report.agency.name, self.data,
+            timer=self.timer, charts=self.charts,
+        )
+    
+    def save_output(self, file_path, write, text=False):
+        """
+        Render with write(file object) to a temporary file and stream it into
+        the storage backend, like the PDF. Returns (stored name, size).
+        """
+        with tempfile.TemporaryFile() as output:
+            with self.timer.stage('render'):
+                if text:
+                    wrapper = io.TextIOWrapper(output, encoding='utf-8', newline='')
+                    write(wrapper)
+                    wrapper.flush()
+                    wrapper.detach()
+                else:
+                    write(output)
+            size = output.seek(0, os.SEEK_END)
+            output.seek(0)
+            with self.timer.stage('upload'):
+                stored_name = default_storage.save(file_path, File(output, name=file_path))
+        return stored_name, size
     
     def generate_excel_report(self):
-        """Generate Excel report using pandas"""
+        """Generate Excel report, streamed sheet by sheet in write-only mode. Returns (name, size)"""
         filename = f"report_{self.report.id}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         file_path = os.path.join('reports', filename)
-        full_path = os.path.join(settings.MEDIA_ROOT, file_path)
-        
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
         
-        # Create Excel writer
-        with pd.ExcelWriter(full_path, engine='openpyxl') as writer:
-            
-            # Summary sheet
-            summary_data = [self.data.get('summary', {})]
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
-            
-            # Campaign details sheet
-            campaigns_data = self.data.get('campaigns', [])
-            if campaigns_data:
-                campaigns_df = pd.DataFrame(campaigns_data)
-                campaigns_df.to_excel(writer, sheet_name='Campaign Details', index=False)
-            
-            # Top content sheet
-            all_top_content = []
-            for campaign in campaigns_data:
-                for content in campaign.get('top_content', []):
-                    content['campaign_name'] = campaign['campaign_name']
-                    all_top_content.append(content)
-            
-            if all_top_content:
-                content_df = pd.DataFrame(all_top_content)
-                content_df.to_excel(writer, sheet_name='Top Content', index=False)
-            
-            # Top influencers sheet
-            all_top_influencers = []
-            for campaign in campaigns_data:
-                for influencer in campaign.get('top_influencers', []):
-                    influencer['campaign_name'] = campaign['campaign_name']
-                    all_top_influencers.append(influencer)
-            
-            if all_top_influencers:
-                influencers_df = pd.DataFrame(all_top_influencers)
-                influencers_df.to_excel(writer, sheet_name='Top Influencers', index=False)
+        summary = self.data.get('summary', {})
+        campaigns_data = self.data.get('campaigns', [])
         
-        return file_path
+        return self.save_output(file_path, lambda output: write_xlsx(output, [
+            ('Summary', list(summary), [tuple(summary.values())] if summary else []),
+            (
+                'Campaign Details',
+                [header for header, _ in CAMPAIGN_COLUMNS],
+                dict_rows(campaigns_data, CAMPAIGN_COLUMNS),
+            ),
+            (
+                'Top Content',
+                ['Campaign'] + [header for header, _ in TOP_CONTENT_COLUMNS],
+                nested_rows(campaigns_data, 'top_content', TOP_CONTENT_COLUMNS),
+            ),
+            (
+                'Top Influencers',
+                ['Campaign'] + [header for header, _ in TOP_INFLUENCER_COLUMNS],
+                nested_rows(campaigns_data, 'top_influencers', TOP_INFLUENCER_COLUMNS),
+            ),
+        ], images=[(config.get('title', ''), image) for config, image in self.charts]))
     
     def generate_csv_report(self):
-        """Generate CSV report"""
+        """Generate CSV report. Returns (name, size)"""
         filename = f"report_{self.report.id}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.csv"
         file_path = os.path.join('reports', filename)
-        full_path = os.path.join(settings.MEDIA_ROOT, file_path)
-        
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
         
         # Convert campaign data to DataFrame
         campaigns_data = self.data.get('campaigns', [])
-        if campaigns_data:
-            df = pd.DataFrame(campaigns_data)
-            df.to_csv(full_path, index=False)
         
-        return file_path
+        def write(output):
+            if campaigns_data:
+                pd.DataFrame(campaigns_data).to_csv(output, index=False)
+        
+        return self.save_output(file_path, write, text=True)
     
     def generate_json_report(self):
-        """Generate JSON report"""
+        """Generate JSON report. Returns (name, size)"""
         filename = f"report_{self.report.id}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.json"
         file_path = os.path.join('reports', filename)
-        full_path = os.path.join(settings.MEDIA_ROOT, file_path)
-        
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        
-        with open(full_path, 'w') as f:
-            json.dump(self.data, f, indent=2)
-        
-        return file_path
-
-
-# Celery tasks for background report generation
-from celery import shared_task
-
-@shared_task
-def generate_report_task(report_id):
-    """Background task to generate reports"""
-    try:
-        report = Report.objects.get(id=report_id)
-        generator = ReportGenerator(report)
-        file_path = generator.generate_report()
-        
-        # Send notification email if configured
-        send_report_notification(report)
-        
-        return f"Report {report_id} generated successfully: {file_path}"
-        
-    except Exception as e:
-        return f"Report generation failed: {str(e)}"
-
-
-@shared_task
-def generate_scheduled_reports():
-    """Task to generate all scheduled reports"""
-    from .models import ReportSubscription
-    
-    # Get all active subscriptions that are due
-    due_subscriptions = ReportSubscription.objects.filter(
-        is_active=True,
-        next_delivery__lte=timezone.now()
-    )
-    
-    for subscription in due_subscriptions:
-        # Create report from template
-        report = Report.objects.create(
-            title=f"{subscription.name} - {timezone.now().strftime('%Y-%m-%d')}",
-            description=f"Scheduled report: {subscription.name}",
-            report_type=subscription.report_template.report_type,
-            parameters=subscription.report_parameters,
-            agency=subscription.agency,
-            created_by=subscription.created_by,
-            file_format='pdf',  # Default format for scheduled reports
-        )
-        
-        # Generate report
-        generate_report_task.delay(report.id)
         
-        # Update next delivery date
-        subscription.last_delivered = timezone.now()
-        subscription.calculate_next_delivery()
-        subscription.save()
-
-
-def send_report_notification(report):
-    """Send email notification when report is ready"""
-    from django.core.mail import send_mail
-    from django.template.loader import render_to_string
-    
-    subject = f"Report Ready: {report.title}"
-    
-    # Get download URL
-    download_url = f"/api/reports/{report.id}/download/"
-    
-    message = render_to_string('reports/report_ready_email.html', {
-        'report': report,
-        'download_url': download_url,
-    })
-    
-    send_mail(
-        subject=subject,
-        message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[report.created_by.email],
-        html_message=message,
-    )
\ No newline at end of file
+        return self.save_output(file_path, lambda output: json.dump(self.data, output, indent=2), text=True)
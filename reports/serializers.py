@@ -4,6 +4,7 @@ REST API serializers for reports app
 """
 from rest_framework import serializers
 from .models import Report, ReportTemplate, Dashboard, AnalyticsSnapshot, ReportSubscription
+from .widgets import duplicate_widget_ids
 
 
 class ReportListSerializer(serializers.ModelSerializer):
@@ -56,6 +57,9 @@ class ReportDetailSerializer(serializers.ModelSerializer):
     generationStartedAt = serializers.DateTimeField(source='generation_started_at', read_only=True)
     generationCompletedAt = serializers.DateTimeField(source='generation_completed_at', read_only=True)
     errorMessage = serializers.CharField(source='error_message', read_only=True)
+    stageDurations = serializers.JSONField(source='stage_durations', read_only=True)
+    rowCounts = serializers.JSONField(source='row_counts', read_only=True)
+    fileSize = serializers.IntegerField(source='file_size', read_only=True)
     isScheduled = serializers.BooleanField(source='is_scheduled')
     scheduleFrequency = serializers.CharField(source='schedule_frequency', allow_null=True)
     nextGenerationDate = serializers.DateTimeField(source='next_generation_date', allow_null=True)
@@ -76,6 +80,7 @@ class ReportDetailSerializer(serializers.ModelSerializer):
             'filePath', 'reportData', 'status', 'statusDisplay',
             'createdById', 'agencyId',
             'generationStartedAt', 'generationCompletedAt', 'errorMessage',
+            'stageDurations', 'rowCounts', 'fileSize',
             'isScheduled', 'scheduleFrequency', 'nextGenerationDate',
             'createdAt', 'updatedAt',
             'canDownload', 'canRegenerate', 'downloadUrl', 'generationTime',
@@ -106,12 +111,15 @@ class ReportCreateSerializer(serializers.ModelSerializer):
     fileFormat = serializers.CharField(source='file_format', default='pdf')
     isScheduled = serializers.BooleanField(source='is_scheduled', default=False)
     scheduleFrequency = serializers.CharField(source='schedule_frequency', required=False, allow_null=True)
+    templateId = serializers.PrimaryKeyRelatedField(
+        source='template', queryset=ReportTemplate.objects.all(), required=False, allow_null=True
+    )
     
     class Meta:
         model = Report
         fields = [
             'title', 'description', 'reportType', 'parameters', 'filters',
-            'fileFormat', 'isScheduled', 'scheduleFrequency',
+            'fileFormat', 'isScheduled', 'scheduleFrequency', 'templateId',
         ]
 
 
@@ -188,6 +196,14 @@ class DashboardCreateSerializer(serializers.ModelSerializer):
             'name', 'description', 'dashboardType', 'layout', 'widgets',
             'isDefault', 'autoRefreshInterval',
         ]
+    
+    def validate_widgets(self, value):
+        if not isinstance(value, list):
+            raise serializers.ValidationError('widgets must be a list')
+        duplicates = duplicate_widget_ids(value)
+        if duplicates:
+            raise serializers.ValidationError(f"Duplicate widget ids: {', '.join(duplicates)}")
+        return value
 
 
 class AnalyticsSnapshotSerializer(serializers.ModelSerializer):
@@ -10,31 +10,70 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def _collection_chunk_size():
+    return getattr(settings, 'REPORT_COLLECTION_CHUNK_SIZE', 50)
+
+
+def _finish_report(report):
+    """Complete identical requests that coalesced onto this run and notify"""
+    from .report_cache import complete_coalesced_reports
+    linked = complete_coalesced_reports(report)
+    
+    for ready_report in [report] + linked:
+        send_report_ready_notification(ready_report)
+
+
+def _fail_report(report_id, error):
+    from .models import Report
+    from .progress import clear_progress
+    from .report_cache import complete_coalesced_reports
+    
+    clear_progress(report_id)
+    try:
+        report = Report.objects.get(id=report_id)
+        report.status = 'failed'
+        report.error_message = str(error)
+        report.save()
+        
+        complete_coalesced_reports(report)
+    except Exception:
+        pass
+
+
 @shared_task
 def generate_report_task(report_id):
     """
-    Background task to generate report files
+    Background task to generate report files. Campaign reports spanning
+    more than one chunk are collected in parallel by a chord of
+    collect_report_chunk tasks and rendered by finalize_report_task.
     """
     try:
+        from celery import chord
         from .models import Report
         from .report_generation_system import ReportGenerator
         
         # Get the report
         report = Report.objects.get(id=report_id)
         
-        # Update status
-        report.status = 'generating'
-        report.generation_started_at = timezone.now()
-        report.save()
+        generator = ReportGenerator(report)
+        chunks = generator.collection_chunks(_collection_chunk_size())
+        
+        # Update status and start progress over the campaigns to collect
+        generator.mark_generating(total=sum(len(chunk) for chunk in chunks))
+        
+        if len(chunks) > 1:
+            callback = finalize_report_task.s(report_id).on_error(report_chord_failed.s(report_id))
+            chord(collect_report_chunk.s(report_id, chunk) for chunk in chunks)(callback)
+            
+            logger.info(f"Report {report_id} collection split into {len(chunks)} chunks")
+            return f"Report {report_id} collection started in {len(chunks)} chunks"
         
         # Generate the report
-        generator = ReportGenerator(report)
-        file_path = generator.generate_report()
+        generator.collect_data()
+        file_path = generator.render_report()
         
         logger.info(f"Report {report_id} generated successfully: {file_path}")
-        
-        # Send notification email
-        send_report_ready_notification(report)
+        _finish_report(report)
         
         return f"Report {report_id} generated successfully"
         
@@ -45,63 +84,110 @@ def generate_report_task(report_id):
         logger.error(f"Report generation failed for {report_id}: {str(e)}")
         
         # Update report with error
-        try:
-            report = Report.objects.get(id=report_id)
-            report.status = 'failed'
-            report.error_message = str(e)
-            report.save()
-        except:
-            pass
+        _fail_report(report_id, e)
         
         return f"Report generation failed: {str(e)}"
 
 
 @shared_task
-def generate_scheduled_reports():
+def collect_report_chunk(report_id, campaign_ids):
     """
-    Task to generate all scheduled reports that are due
+    Collect campaign stats for one chunk of a report's campaigns.
+    Runs in parallel with the other chunks; errors propagate to the chord.
     """
-    from .models import ReportSubscription, Report
-    
-    # Get all active subscriptions that are due
-    due_subscriptions = ReportSubscription.objects.filter(
-        is_active=True,
-        next_delivery__lte=timezone.now()
-    )
+    from .models import Report
+    from .report_cache import touch_inflight
+    from .report_generation_system import ReportGenerator
     
-    generated_count = 0
+    report = Report.objects.select_related('agency').get(id=report_id)
+    touch_inflight(report)
+    generator = ReportGenerator(report)
+    return generator.collect_campaign_stats(generator.campaign_queryset().filter(id__in=campaign_ids))
+
+
+@shared_task
+def finalize_report_task(chunk_results, report_id):
+    """
+    Chord callback: merge the chunk results, compute the summary and render
+    the report file
+    """
+    try:
+        from .models import Report
+        from .report_cache import touch_inflight
+        from .report_generation_system import ReportGenerator
+        
+        report = Report.objects.select_related('agency').get(id=report_id)
+        touch_inflight(report)
+        generator = ReportGenerator(report)
+        # Chunks ran in parallel, so collection is timed by wall clock
+        if report.generation_started_at:
+            generator.timer.durations['collect'] = round(
+                (timezone.now() - report.generation_started_at).total_seconds(), 3
+            )
+        generator.set_campaign_performance_data(
+            [campaign for chunk in chunk_results for campaign in chunk]
+        )
+        file_path = generator.render_report()
+        
+        logger.info(f"Report {report_id} generated successfully: {file_path}")
+        _finish_report(report)
+        
+        return f"Report {report_id} generated successfully"
+        
+    except Exception as e:
+        logger.error(f"Report finalization failed for {report_id}: {str(e)}")
+        _fail_report(report_id, e)
+        return f"Report generation failed: {str(e)}"
+
+
+@shared_task
+def report_chord_failed(request, exc, traceback, report_id):
+    """Error callback for a failed collection chunk"""
+    logger.error(f"Report collection failed for {report_id}: {str(exc)}")
+    _fail_report(report_id, exc)
+
+
+@shared_task
+def resume_stalled_reports():
+    """
+    Re-dispatch generating reports whose run was lost (hard-killed worker),
+    for reports nobody is polling. One run per distinct cache key.
+    """
+    from .models import Report
+    from .report_cache import resume_stalled_generation
     
-    for subscription in due_subscriptions:
+    resumed = 0
+    seen = set()
+    stalled = Report.objects.filter(status='generating').exclude(cache_key='').order_by('created_at')
+    for report in stalled:
+        if report.cache_key in seen:
+            continue
+        seen.add(report.cache_key)
         try:
-            # Create report from subscription
-            report = Report.objects.create(
-                title=f"{subscription.name} - {timezone.now().strftime('%Y-%m-%d')}",
-                description=f"Scheduled report: {subscription.name}",
-                report_type=subscription.report_template.report_type,
-                parameters=subscription.report_parameters,
-                filters=subscription.report_template.default_filters,
-                file_format='pdf',  # Default format for scheduled reports
-                agency=subscription.agency,
-                created_by=subscription.created_by,
-                status='generating',
-                is_scheduled=True,
-            )
-            
-            # Generate report
-            generate_report_task.delay(report.id)
-            
-            # Update subscription
-            subscription.last_delivered = timezone.now()
-            subscription.calculate_next_delivery()
-            subscription.save()
-            
-            generated_count += 1
-            logger.info(f"Scheduled report created for subscription {subscription.id}")
-            
+            if resume_stalled_generation(report):
+                resumed += 1
         except Exception as e:
-            logger.error(f"Failed to create scheduled report for subscription {subscription.id}: {str(e)}")
+            logger.error(f"Failed to resume report {report.id}: {str(e)}")
     
-    return f"Generated {generated_count} scheduled reports"
+    return f"Resumed {resumed} stalled reports"
+
+
+@shared_task
+def generate_scheduled_reports():
+    """
+    Task to generate all scheduled reports that are due. Safe to run
+    concurrently: each subscription is claimed by exactly one run.
+    """
+    from .scheduling import run_scheduled_reports
+    
+    try:
+        claimed_count, report_count = run_scheduled_reports()
+    except Exception as e:
+        logger.error(f"Failed to generate scheduled reports: {str(e)}")
+        return f"Failed to generate scheduled reports: {str(e)}"
+    
+    logger.info(f"Claimed {claimed_count} due subscriptions into {report_count} reports")
+    return f"Generated {report_count} scheduled reports for {claimed_count} subscriptions"
 
 
 @shared_task
@@ -112,12 +198,13 @@ def create_agency_snapshot(agency_id):
     try:
         from agencies.models import Agency
         from .models import AnalyticsSnapshot
+        from .timeseries import record_snapshot
         from campaigns.models import Campaign, CampaignAnalytics
         
         agency = Agency.objects.get(id=agency_id)
         
         # Collect agency-wide metrics
-        campaigns = Campaign.objects.filter(agency=agency)
+        campaigns = Campaign.objects.filter(agency=agency).with_budget_totals()
         
         total_campaigns = campaigns.count()
         active_campaigns = campaigns.filter(status='active').count()
@@ -153,6 +240,7 @@ def create_agency_snapshot(agency_id):
                 'snapshot_date': timezone.now().isoformat(),
             }
         )
+        record_snapshot(snapshot)
         
         logger.info(f"Agency snapshot created for agency {agency_id}")
         return f"Agency snapshot created for {agency.name}"
@@ -167,9 +255,10 @@ def cleanup_old_reports():
     """
     Clean up old report files to save disk space
     """
+    from .charts import prune_chart_store
     from .models import Report
+    from .report_cache import delete_report_file
     from datetime import timedelta
-    import os
     
     # Delete reports older than 90 days
     cutoff_date = timezone.now() - timedelta(days=90)
@@ -182,11 +271,8 @@ def cleanup_old_reports():
     
     for report in old_reports:
         try:
-            # Delete file if exists
-            if report.file_path:
-                file_path = report.file_path.path if hasattr(report.file_path, 'path') else os.path.join(settings.MEDIA_ROOT, str(report.file_path))
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+            # Delete file unless a newer report still links to it
+            delete_report_file(report)
             
             # Delete report record
             report.delete()
@@ -195,8 +281,15 @@ def cleanup_old_reports():
         except Exception as e:
             logger.error(f"Failed to delete old report {report.id}: {str(e)}")
     
-    logger.info(f"Cleaned up {deleted_count} old reports")
-    return f"Cleaned up {deleted_count} old reports"
+    # Bound the rendered chart store; pruned charts are redrawn when next needed
+    pruned_count = 0
+    try:
+        pruned_count = prune_chart_store()
+    except Exception as e:
+        logger.error(f"Failed to prune stored charts: {str(e)}")
+    
+    logger.info(f"Cleaned up {deleted_count} old reports and {pruned_count} stored charts")
+    return f"Cleaned up {deleted_count} old reports and {pruned_count} stored charts"
 
 
 def send_report_ready_notification(report):
@@ -234,16 +327,16 @@ Best regards,
             fail_silently=True,  # Don't fail if email fails
         )
         
-        # If it's a scheduled report, also send to subscription recipients
+        # If it's a scheduled report, also send once to every recipient of its subscriptions
         if report.is_scheduled:
             try:
-                subscription = report.agency.report_subscriptions.filter(
-                    report_template__report_type=report.report_type
-                ).first()
+                email_list = []
+                for subscription in report.subscriptions.filter(delivery_method='email'):
+                    for email in subscription.get_email_recipients():
+                        if email not in email_list:
+                            email_list.append(email)
                 
-                if subscription and subscription.email_recipients:
-                    email_list = [email.strip() for email in subscription.email_recipients.split(',')]
-                    
+                if email_list:
                     send_mail(
                         subject=f"Scheduled Report: {report.title}",
                         message=message,
@@ -1,3 +1,298 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from agencies.models import Agency
+from campaigns.analytics import recompute_campaigns_analytics
+from campaigns.models import Campaign, CampaignContent, InfluencerCollaboration
+from influencers.analytics import refresh_influencer_analytics
+from influencers.models import Influencer
+
+from .charts import CHART_DIR, chart_series, prune_chart_store, render_charts
+from .models import AnalyticsSnapshot, Dashboard, MetricPoint, Report
+from .report_generation_system import ReportGenerator
+from .report_cache import INFLIGHT_KEY, report_cache_key, request_report_generation
+from .timeseries import backfill_metric_points, metric_series
+from .widgets import evaluate_widgets
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ReportCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='owner@example.com', email='owner@example.com', password='password',
+        )
+        self.agency = Agency.objects.get(user=self.user)
+        campaign = Campaign.objects.create(
+            agency=self.agency, name='Launch', campaign_type='brand_awareness', brand_name='Brand',
+            target_audience='Everyone', campaign_objectives='Reach', total_budget=Decimal('10000.00'),
+            start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), created_by=self.user,
+        )
+        influencer = Influencer.objects.create(full_name='Alice', username='alice', primary_category='fashion')
+        self.collaboration = InfluencerCollaboration.objects.create(
+            campaign=campaign, influencer=influencer, content_type='post',
+            agreed_rate=Decimal('500.00'), deadline=date(2026, 6, 30), status='in_progress',
+        )
+        self.content = CampaignContent.objects.create(
+            collaboration=self.collaboration, title='Post', status='submitted',
+        )
+
+    def create_report(self):
+        return Report.objects.create(
+            title='Performance', report_type='campaign_performance', file_format='csv',
+            created_by=self.user, agency=self.agency, generation_started_at=timezone.now(),
+        )
+
+    def complete(self, report):
+        report.status = 'completed'
+        report.file_path = 'reports/performance.csv'
+        report.generation_completed_at = timezone.now()
+        report.save()
+        cache.delete(INFLIGHT_KEY.format(report.cache_key))
+
+    def test_status_changes_invalidate_cached_results(self):
+        with mock.patch('reports.tasks.generate_report_task.delay'):
+            first = self.create_report()
+            self.assertEqual(request_report_generation(first), 'queued')
+            self.complete(first)
+            self.assertEqual(request_report_generation(self.create_report()), 'cached')
+
+            self.content.status = 'approved'
+            self.content.save()
+            self.assertNotEqual(report_cache_key(self.create_report()), first.cache_key)
+
+            key_after_content = report_cache_key(self.create_report())
+            self.collaboration.status = 'content_submitted'
+            self.collaboration.save()
+            self.assertNotEqual(report_cache_key(self.create_report()), key_after_content)
+
+    def test_identical_requests_coalesce(self):
+        with mock.patch('reports.tasks.generate_report_task.delay') as delay:
+            leader = self.create_report()
+            waiter = self.create_report()
+            self.assertEqual(request_report_generation(leader), 'queued')
+            self.assertEqual(request_report_generation(waiter), 'coalesced')
+        delay.assert_called_once_with(leader.pk)
+
+    def test_polling_waiter_redispatches_lost_run(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with mock.patch('reports.tasks.generate_report_task.delay') as delay:
+            leader = self.create_report()
+            waiter = self.create_report()
+            request_report_generation(leader)
+            request_report_generation(waiter)
+
+            # Leader still running: polling does not dispatch again
+            client.get(reverse('reports:report_status', args=[waiter.pk]))
+            self.assertEqual(delay.call_count, 1)
+
+            # The leader's worker was killed and its marker expired
+            cache.delete(INFLIGHT_KEY.format(leader.cache_key))
+            response = client.get(reverse('reports:report_status', args=[waiter.pk]))
+            client.get(reverse('reports:report_status', args=[leader.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'generating')
+        self.assertEqual([call.args for call in delay.call_args_list], [(leader.pk,), (waiter.pk,)])
+
+
+class ChartTests(TestCase):
+
+    def setUp(self):
+        self.storage = FileSystemStorage(location=tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.storage.location, True)
+        self.data = {'campaigns': [
+            {'campaign_name': f'Campaign {index}', 'total_engagement': index * 10, 'status': 'active'}
+            for index in range(20)
+        ]}
+
+    def test_bad_limit_falls_back_to_default(self):
+        for limit in ('abc', None, -3):
+            series = chart_series({'metric': 'total_engagement', 'limit': limit}, self.data)
+            self.assertEqual(len(series), 15)
+        self.assertEqual(len(chart_series({'metric': 'total_engagement', 'limit': '5'}, self.data)), 5)
+
+    def test_bad_chart_is_skipped_not_fatal(self):
+        charts = render_charts([
+            {'type': 'bar', 'title': 'Status', 'metric': 'status'},
+            {'type': 'bar', 'title': 'Engagement', 'metric': 'total_engagement', 'limit': 'ten'},
+        ], self.data, storage=self.storage)
+        self.assertEqual([config['title'] for config, _ in charts], ['Engagement'])
+        self.assertTrue(charts[0][1].startswith(b'\x89PNG'))
+
+    @override_settings(CHART_RENDER_WORKERS=1)
+    def test_single_render_worker_renders_inline(self):
+        with mock.patch('reports.charts._get_pool') as get_pool:
+            charts = render_charts([
+                {'type': 'bar', 'title': 'Engagement', 'metric': 'total_engagement'},
+                {'type': 'line', 'title': 'Trend', 'metric': 'total_engagement'},
+            ], self.data, storage=self.storage)
+        get_pool.assert_not_called()
+        self.assertEqual(len(charts), 2)
+
+    def test_tabular_formats_are_saved_through_storage(self):
+        user = get_user_model().objects.create_user(
+            username='owner@example.com', email='owner@example.com', password='password',
+        )
+        agency = Agency.objects.get(user=user)
+        Campaign.objects.create(
+            agency=agency, name='Launch', campaign_type='brand_awareness', brand_name='Brand',
+            target_audience='Everyone', campaign_objectives='Reach', total_budget=Decimal('10000.00'),
+            start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), created_by=user,
+        )
+        for file_format in ('csv', 'json', 'excel'):
+            report = Report.objects.create(
+                title='Performance', report_type='campaign_performance', file_format=file_format,
+                created_by=user, agency=agency,
+            )
+            generator = ReportGenerator(report)
+            generator.collect_data()
+            with mock.patch('reports.report_generation_system.default_storage', self.storage), \
+                    mock.patch.object(ReportGenerator, 'render_charts', return_value=[]):
+                name = generator.render_report()
+
+            self.assertTrue(self.storage.exists(name))
+            self.assertEqual(report.file_size, self.storage.size(name))
+            self.assertIn('render', report.stage_durations)
+            self.assertIn('upload', report.stage_durations)
+        with self.storage.open(name, 'rb') as stored:
+            self.assertEqual(stored.read(2), b'PK')
+
+    def test_prune_bounds_store(self):
+        for index in range(3):
+            self.storage.save(f'{CHART_DIR}/chart{index}.png', ContentFile(b'png'))
+
+        self.assertEqual(prune_chart_store(max_files=2, storage=self.storage), 1)
+        self.assertEqual(len(self.storage.listdir(CHART_DIR)[1]), 2)
+        self.assertEqual(prune_chart_store(max_age=timedelta(0), storage=self.storage), 2)
+        self.assertEqual(prune_chart_store(storage=FileSystemStorage(location=f'{self.storage.location}/empty')), 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DashboardWidgetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='owner@example.com', email='owner@example.com', password='password',
+        )
+        self.agency = Agency.objects.get(user=self.user)
+        self.campaign = Campaign.objects.create(
+            agency=self.agency, name='Launch', campaign_type='brand_awareness', brand_name='Brand',
+            target_audience='Everyone', campaign_objectives='Reach', total_budget=Decimal('10000.00'),
+            start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), created_by=self.user,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_invalid_filter_values_are_per_widget_errors(self):
+        results = evaluate_widgets(self.agency.id, [
+            ('ids', {'source': 'collaborations', 'aggregate': 'count', 'filters': {'campaign': 'abc'}}),
+            ('choice', {'source': 'campaigns', 'metric': 'budget', 'filters': {'status': 'bogus'}}),
+            ('nested', {'source': 'content', 'aggregate': 'count', 'filters': {'campaign': [{'id': 1}]}}),
+            ('budget', {'source': 'campaigns', 'metric': 'budget', 'filters': {'status': ['draft', 'active']}}),
+            ('coerced', {'source': 'collaborations', 'aggregate': 'count',
+                         'filters': {'campaign': str(self.campaign.id)}}),
+        ])
+        self.assertIn('Invalid value for filter campaign', results['ids']['error'])
+        self.assertIn('Invalid value for filter status', results['choice']['error'])
+        self.assertIn('error', results['nested'])
+        self.assertEqual(results['coerced'], {'value': 0})
+        self.assertNotIn('error', results['budget'])
+
+    def test_duplicate_widget_ids_are_rejected(self):
+        widgets = [
+            {'id': 'spend', 'source': 'campaigns', 'metric': 'spent'},
+            {'id': 'spend', 'source': 'campaigns', 'metric': 'budget'},
+        ]
+        response = self.client.post(reverse('reports:dashboard_list'), {
+            'name': 'Overview', 'dashboardType': 'executive', 'widgets': widgets,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('widgets', response.data)
+
+        dashboard = Dashboard.objects.create(
+            name='Legacy', dashboard_type='executive', widgets=widgets,
+            agency=self.agency, created_by=self.user,
+        )
+        response = self.client.get(reverse('reports:dashboard_data', args=[dashboard.pk]))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('spend', response.data['error'])
+
+
+class MetricSeriesTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='owner@example.com', email='owner@example.com', password='password',
+        )
+        self.agency = Agency.objects.get(user=self.user)
+        self.campaign = Campaign.objects.create(
+            agency=self.agency, name='Launch', campaign_type='brand_awareness', brand_name='Brand',
+            target_audience='Everyone', campaign_objectives='Reach', total_budget=Decimal('10000.00'),
+            start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), created_by=self.user,
+        )
+        self.influencer = Influencer.objects.create(full_name='Alice', username='alice', primary_category='fashion')
+        collaboration = InfluencerCollaboration.objects.create(
+            campaign=self.campaign, influencer=self.influencer, content_type='post',
+            agreed_rate=Decimal('500.00'), deadline=date(2026, 6, 30), status='in_progress',
+        )
+        CampaignContent.objects.create(
+            collaboration=collaboration, title='Post', status='published', likes_count=40, views_count=1000,
+        )
+
+    def test_recomputes_record_series_points(self):
+        # Repeated recomputes within an hour keep the first point of that hour
+        for minute in (10, 40):
+            moment = timezone.make_aware(datetime(2026, 3, 1, 9, minute))
+            with mock.patch('django.utils.timezone.now', return_value=moment):
+                recompute_campaigns_analytics([self.campaign.id])
+                refresh_influencer_analytics([self.influencer.id])
+
+        campaign = metric_series(self.agency.id, 'campaign', self.campaign.id, ['total_likes', 'total_reach'], bucket=None)
+        self.assertEqual([point['value'] for point in campaign['total_likes']], [40.0])
+        self.assertEqual([point['value'] for point in campaign['total_reach']], [1000.0])
+        influencer = metric_series(self.agency.id, 'influencer', self.influencer.id, ['influence_score'], bucket=None)
+        self.assertEqual(len(influencer['influence_score']), 1)
+        self.assertEqual(influencer['influence_score'][0]['timestamp'], timezone.make_aware(datetime(2026, 3, 1, 9)))
+        self.assertFalse(AnalyticsSnapshot.objects.exists())
+
+    def test_raw_cap_applies_per_metric(self):
+        for day in range(1, 4):
+            AnalyticsSnapshot.objects.create(
+                snapshot_type='campaign', campaign=self.campaign, agency=self.agency,
+                snapshot_date=timezone.make_aware(datetime(2026, 3, day)),
+                metrics={'a': day, 'b': day * 10},
+            )
+        backfill_metric_points()
+
+        with mock.patch('reports.timeseries.MAX_RAW_POINTS', 2):
+            series = metric_series(self.agency.id, 'campaign', self.campaign.id, ['a', 'b'], bucket=None)
+        self.assertEqual([point['value'] for point in series['a']], [1.0, 2.0])
+        self.assertEqual([point['value'] for point in series['b']], [10.0, 20.0])
+
+    def test_backfill_reports_attempted_points(self):
+        AnalyticsSnapshot.objects.create(
+            snapshot_type='agency', agency=self.agency, snapshot_date=timezone.now(),
+            metrics={'total_reach': 10, 'label': 'text'},
+        )
+        self.assertEqual(backfill_metric_points(), (1, 1))
+        # Re-running attempts the same point again; the insert skips it
+        self.assertEqual(backfill_metric_points(), (1, 1))
+        self.assertEqual(MetricPoint.objects.filter(entity_type='agency').count(), 1)
@@ -0,0 +1,171 @@
+"""
+Metric time series
+AnalyticsSnapshot.metrics is a free-form JSON document, so a trend over it
+means loading and parsing every snapshot in the range. Numeric snapshot
+metrics are also written as MetricPoint rows (agency, entity, metric,
+timestamp, value); a trend is then one range scan on the series index,
+downsampled in the database to daily or weekly min / max / avg buckets.
+Campaign and influencer analytics recomputes write their results straight
+to the series through record_points, at most one point per entity and
+metric per hour; only explicit snapshots create AnalyticsSnapshot rows
+"""
+
+import logging
+from numbers import Number
+
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import TruncDay, TruncWeek
+from django.utils import timezone
+
+from .models import AnalyticsSnapshot, MetricPoint
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = {'day': TruncDay, 'week': TruncWeek}
+MAX_RAW_POINTS = 5000
+BACKFILL_BATCH_SIZE = 500
+
+
+def snapshot_entity(snapshot):
+    """(entity_type, entity_id) a snapshot describes, or None if it has no series"""
+    if not snapshot.agency_id:
+        return None
+    if snapshot.snapshot_type == 'campaign' and snapshot.campaign_id:
+        return ('campaign', snapshot.campaign_id)
+    if snapshot.snapshot_type == 'influencer' and snapshot.influencer_id:
+        return ('influencer', snapshot.influencer_id)
+    if snapshot.snapshot_type == 'agency':
+        return ('agency', snapshot.agency_id)
+    return None
+
+
+def snapshot_points(snapshot):
+    """Unsaved MetricPoints for the numeric values of a snapshot's metrics"""
+    entity = snapshot_entity(snapshot)
+    if entity is None:
+        return []
+    entity_type, entity_id = entity
+    return [
+        MetricPoint(
+            agency_id=snapshot.agency_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            metric=metric[:50],
+            timestamp=snapshot.snapshot_date,
+            value=float(value),
+        )
+        for metric, value in (snapshot.metrics or {}).items()
+        if isinstance(value, Number) and not isinstance(value, bool)
+    ]
+
+
+def record_snapshot(snapshot):
+    """Write a snapshot's metrics to the series table; returns points written"""
+    points = snapshot_points(snapshot)
+    if points:
+        MetricPoint.objects.bulk_create(points, ignore_conflicts=True)
+    return len(points)
+
+
+def recompute_timestamp(moment=None):
+    """Series timestamp for a recompute: the start of its hour"""
+    return (moment or timezone.now()).replace(minute=0, second=0, microsecond=0)
+
+
+def record_points(entity_type, entries, timestamp=None):
+    """
+    Write [(agency_id, entity_id, metrics)] of one entity type to the series
+    at the hour of `timestamp`. The first recompute of an hour wins; later
+    ones are skipped by the insert. Returns points attempted.
+    """
+    timestamp = recompute_timestamp(timestamp)
+    points = [
+        MetricPoint(
+            agency_id=agency_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            metric=metric[:50],
+            timestamp=timestamp,
+            value=float(value),
+        )
+        for agency_id, entity_id, metrics in entries
+        for metric, value in metrics.items()
+        if isinstance(value, Number) and not isinstance(value, bool)
+    ]
+    if points:
+        MetricPoint.objects.bulk_create(points, batch_size=BACKFILL_BATCH_SIZE, ignore_conflicts=True)
+    return len(points)
+
+
+def backfill_metric_points(batch_size=BACKFILL_BATCH_SIZE, since=None):
+    """
+    Copy numeric metrics of existing snapshots into the series table in
+    batches, optionally only snapshots from the date `since` on. Safe to
+    re-run: points already present are skipped by the insert, so the point
+    count is of points attempted, not inserted. Returns (snapshots read,
+    points attempted).
+    """
+    snapshots = AnalyticsSnapshot.objects.filter(agency__isnull=False).only(
+        'id', 'snapshot_type', 'campaign_id', 'influencer_id', 'agency_id', 'metrics', 'snapshot_date',
+    ).order_by('id')
+    if since is not None:
+        snapshots = snapshots.filter(snapshot_date__date__gte=since)
+
+    read = attempted = 0
+    points = []
+    for snapshot in snapshots.iterator(chunk_size=batch_size):
+        read += 1
+        points.extend(snapshot_points(snapshot))
+        if len(points) >= batch_size:
+            MetricPoint.objects.bulk_create(points, batch_size=batch_size, ignore_conflicts=True)
+            attempted += len(points)
+            points = []
+    if points:
+        MetricPoint.objects.bulk_create(points, batch_size=batch_size, ignore_conflicts=True)
+        attempted += len(points)
+
+    logger.info(f"Backfill attempted {attempted} metric points from {read} snapshots")
+    return read, attempted
+
+
+def metric_series(agency_id, entity_type, entity_id, metrics, start=None, end=None, bucket='day'):
+    """
+    {metric: [points]} for one entity between start and end (inclusive).
+    With bucket 'day' or 'week' each point is
+    {'timestamp', 'min', 'max', 'avg', 'count'}; with bucket None points are
+    the stored {'timestamp', 'value'} rows, at most MAX_RAW_POINTS per metric.
+    """
+    if bucket is not None and bucket not in BUCKETS:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+
+    points = MetricPoint.objects.filter(
+        agency_id=agency_id, entity_type=entity_type, entity_id=entity_id, metric__in=metrics,
+    )
+    if start is not None:
+        points = points.filter(timestamp__gte=start)
+    if end is not None:
+        points = points.filter(timestamp__lte=end)
+
+    series = {metric: [] for metric in metrics}
+    if bucket is None:
+        # One capped range scan per metric, so a dense metric can't crowd out the others
+        for metric in series:
+            rows = points.filter(metric=metric).order_by('timestamp').values_list('timestamp', 'value')
+            series[metric] = [{'timestamp': timestamp, 'value': value} for timestamp, value in rows[:MAX_RAW_POINTS]]
+        return series
+
+    rows = (
+        points.annotate(bucket=BUCKETS[bucket]('timestamp'))
+        .order_by().values('metric', 'bucket')
+        .annotate(min=Min('value'), max=Max('value'), avg=Avg('value'), count=Count('id'))
+        .order_by('metric', 'bucket')
+    )
+    for row in rows:
+        series[row['metric']].append({
+            'timestamp': row['bucket'],
+            'min': row['min'],
+            'max': row['max'],
+            'avg': row['avg'],
+            'count': row['count'],
+        })
+    return series
@@ -23,9 +23,11 @@ urlpatterns = [
     # Dashboards
     path('dashboards/', views.dashboard_list, name='dashboard_list'),
     path('dashboards/<int:pk>/', views.dashboard_detail, name='dashboard_detail'),
+    path('dashboards/<int:pk>/data/', views.dashboard_data, name='dashboard_data'),
     
     # Analytics Snapshots
     path('snapshots/', views.snapshot_list, name='snapshot_list'),
+    path('snapshots/series/', views.snapshot_series, name='snapshot_series'),
     
     # Subscriptions
     path('subscriptions/', views.subscription_list, name='subscription_list'),
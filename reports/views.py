@@ -10,11 +10,11 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time, timedelta
 from django.http import FileResponse, HttpResponse
-from django.conf import settings
-import os
 
-from .models import Report, ReportTemplate, Dashboard, AnalyticsSnapshot, ReportSubscription
+from .models import Report, ReportTemplate, Dashboard, AnalyticsSnapshot, MetricPoint, ReportSubscription
 from .serializers import (
     ReportListSerializer,
     ReportDetailSerializer,
@@ -26,23 +26,23 @@ from .serializers import (
     AnalyticsSnapshotSerializer,
     ReportSubscriptionSerializer,
 )
-from agencies.models import Agency
+from .progress import get_progress
+from .widgets import WidgetError, evaluate_dashboard
+from .timeseries import metric_series
+from .report_cache import delete_report_file, request_report_generation, resume_stalled_generation
+from agencies.access import get_access_context
+
+
+def _template_accessible(template, user, agency):
+    """Same visibility rules as template_list"""
+    if template.is_public or template.created_by_id == user.id:
+        return True
+    return template.allowed_agencies.filter(pk=agency.pk).exists()
 
 
 def get_user_agency(user):
     """Helper to get agency for current user"""
-    # Try as agency owner
-    try:
-        return Agency.objects.get(user=user)
-    except Agency.DoesNotExist:
-        pass
-    
-    # Try as team member
-    membership = user.agency_memberships.filter(is_active=True).first()
-    if membership:
-        return membership.agency
-    
-    return None
+    return get_access_context(user).get_agency()
 
 
 # =============================================================================
@@ -79,6 +79,10 @@ def report_list(request):
     elif request.method == 'POST':
         serializer = ReportCreateSerializer(data=request.data)
         if serializer.is_valid():
+            template = serializer.validated_data.get('template')
+            if template and not _template_accessible(template, request.user, agency):
+                return Response({'error': 'Template not found'}, status=status.HTTP_404_NOT_FOUND)
+            
             report = serializer.save(
                 agency=agency,
                 created_by=request.user,
@@ -86,10 +90,9 @@ def report_list(request):
                 generation_started_at=timezone.now()
             )
             
-            # Trigger background report generation
+            # Reuse an identical earlier result, or trigger background generation
             try:
-                from .tasks import generate_report_task
-                generate_report_task.delay(report.id)
+                request_report_generation(report)
             except Exception:
                 pass  # Task queue may not be set up
             
@@ -122,9 +125,7 @@ def report_detail(request, pk):
         # Delete file if exists
         if report.file_path:
             try:
-                file_path = report.file_path.path if hasattr(report.file_path, 'path') else os.path.join(settings.MEDIA_ROOT, str(report.file_path))
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+                delete_report_file(report)
             except Exception:
                 pass
         
@@ -145,8 +146,8 @@ def report_download(request, pk):
     if report.status != 'completed' or not report.file_path:
         return Response({'error': 'Report not ready for download'}, status=status.HTTP_400_BAD_REQUEST)
     
-    file_path = report.file_path.path if hasattr(report.file_path, 'path') else os.path.join(settings.MEDIA_ROOT, str(report.file_path))
-    if not os.path.exists(file_path):
+    # Read through the storage backend, which may not be the local filesystem
+    if not report.file_path.storage.exists(report.file_path.name):
         return Response({'error': 'Report file not found'}, status=status.HTTP_404_NOT_FOUND)
     
     content_types = {
@@ -159,7 +160,7 @@ def report_download(request, pk):
     content_type = content_types.get(report.file_format, 'application/octet-stream')
     filename = f"{report.title}_{report.created_at.strftime('%Y%m%d')}.{report.file_format}"
     
-    response = FileResponse(open(file_path, 'rb'), content_type=content_type)
+    response = FileResponse(report.file_path.open('rb'), content_type=content_type)
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
@@ -175,10 +176,23 @@ def report_status(request, pk):
     report = get_object_or_404(Report, pk=pk, agency=agency)
     
     progress = 0
+    stage = None
+    processed = total = None
     if report.status == 'completed':
         progress = 100
     elif report.status == 'generating':
-        progress = 50
+        try:
+            # Polling waiters pick the report back up if its run was lost
+            resume_stalled_generation(report)
+        except Exception:
+            pass
+        
+        live = get_progress(report.id)
+        if live:
+            progress = live['percent']
+            stage = live['stage']
+            processed = live['processed']
+            total = live['total']
     
     generation_time = None
     if report.generation_completed_at and report.generation_started_at:
@@ -189,10 +203,16 @@ def report_status(request, pk):
         'status': report.status,
         'statusDisplay': report.get_status_display(),
         'progress': progress,
+        'stage': stage,
+        'processedCampaigns': processed,
+        'totalCampaigns': total,
         'errorMessage': report.error_message,
         'downloadUrl': f"/api/reports/{report.id}/download/" if report.status == 'completed' else None,
         'fileFormat': report.file_format,
         'generationTime': generation_time,
+        'stageDurations': report.stage_durations,
+        'rowCounts': report.row_counts,
+        'fileSize': report.file_size,
     })
 
 
@@ -219,8 +239,8 @@ def report_regenerate(request, pk):
     report.save()
     
     try:
-        from .tasks import generate_report_task
-        generate_report_task.delay(report.id)
+        # Explicit regeneration skips earlier results but still joins an identical in-flight run
+        request_report_generation(report, use_cached=False)
     except Exception:
         pass
     
@@ -347,6 +367,35 @@ def dashboard_detail(request, pk):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_data(request, pk):
+    """
+    Evaluate all widgets of a dashboard in one request.
+    Widget results are shared across viewers for the dashboard's refresh interval.
+    """
+    agency = get_user_agency(request.user)
+    if not agency:
+        return Response({'error': 'Agency not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    dashboard = get_object_or_404(
+        Dashboard.objects.distinct(),
+        Q(pk=pk) & (Q(agency=agency) | Q(shared_with=request.user))
+    )
+    
+    try:
+        widgets = evaluate_dashboard(dashboard)
+    except WidgetError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'dashboardId': dashboard.id,
+        'refreshInterval': dashboard.auto_refresh_interval,
+        'generatedAt': timezone.now(),
+        'widgets': widgets,
+    })
+
+
 # =============================================================================
 # Analytics Snapshots
 # =============================================================================
@@ -391,6 +440,68 @@ def snapshot_list(request):
         return Response({'error': 'Invalid snapshot type'}, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _parse_series_bound(value, end=False):
+    """Datetime from an ISO datetime or date query param; dates cover the whole day"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time.max if end else time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def snapshot_series(request):
+    """
+    Metric trends from snapshots, downsampled per day or week.
+    Query params: entityType (agency, campaign, influencer), entityId,
+    metrics (comma separated), start, end (default: the last year),
+    bucket (day, week or raw).
+    """
+    agency = get_user_agency(request.user)
+    if not agency:
+        return Response({'error': 'Agency not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    entity_type = request.query_params.get('entityType', 'agency')
+    if entity_type not in dict(MetricPoint.ENTITY_TYPES):
+        return Response({'error': 'Invalid entity type'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        entity_id = int(request.query_params.get('entityId', agency.id))
+    except (TypeError, ValueError):
+        return Response({'error': 'entityId must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    metrics = [metric.strip() for metric in request.query_params.get('metrics', '').split(',') if metric.strip()]
+    if not metrics:
+        return Response({'error': 'At least one metric is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        end = _parse_series_bound(request.query_params['end'], end=True) if 'end' in request.query_params else timezone.now()
+        start = _parse_series_bound(request.query_params['start']) if 'start' in request.query_params else end - timedelta(days=365)
+    except ValueError as e:
+        return Response({'error': f'Invalid date: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    bucket = request.query_params.get('bucket', 'day')
+    if bucket not in ('day', 'week', 'raw'):
+        return Response({'error': 'bucket must be day, week or raw'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    series = metric_series(
+        agency.id, entity_type, entity_id, metrics,
+        start=start, end=end, bucket=None if bucket == 'raw' else bucket,
+    )
+    return Response({
+        'entityType': entity_type,
+        'entityId': entity_id,
+        'start': start,
+        'end': end,
+        'bucket': bucket,
+        'series': series,
+    })
+
+
 # =============================================================================
 # Report Subscriptions
 # =============================================================================
@@ -414,8 +525,8 @@ def subscription_list(request):
             subscription = serializer.save(agency=agency, created_by=request.user)
             
             # Calculate next delivery
-            # subscription.calculate_next_delivery()
-            # subscription.save()
+            subscription.calculate_next_delivery()
+            subscription.save(update_fields=['next_delivery'])
             
             return Response(
                 ReportSubscriptionSerializer(subscription).data,
@@ -441,7 +552,11 @@ def subscription_detail(request, pk):
     elif request.method == 'PUT':
         serializer = ReportSubscriptionSerializer(subscription, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            subscription = serializer.save()
+            
+            # The schedule may have changed
+            subscription.calculate_next_delivery()
+            subscription.save(update_fields=['next_delivery'])
             return Response(ReportSubscriptionSerializer(subscription).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -0,0 +1,322 @@
+"""
+Dashboard widget engine
+Evaluates every widget of a dashboard in one request. Widgets over the same
+source and filters share queries: all 'metric' widgets become one
+aggregate() and all 'breakdown' widgets with the same grouping become one
+grouped query. Results are cached per widget for the dashboard's
+auto_refresh_interval, keyed by the agency and the widget definition, so a
+team viewing the same dashboard hits the database once per interval
+
+Widget config:
+    {"id": "spend", "type": "metric" | "breakdown" | "top",
+     "source": "campaigns" | "collaborations" | "content",
+     "metric": "<source metric>", "aggregate": "sum" | "avg" | "min" | "max" | "count",
+     "groupBy": "<source field>" (breakdown), "limit": 10 (breakdown, top),
+     "filters": {"<source field>": value}}
+"""
+
+import hashlib
+import json
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Avg, Count, F, Max, Min, Sum
+
+from campaigns.models import Campaign, CampaignContent, InfluencerCollaboration
+
+WIDGET_CACHE_KEY = 'dashboard_widget:{}:{}'
+MIN_WIDGET_TTL = 30
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+AGGREGATES = {'sum': Sum, 'avg': Avg, 'min': Min, 'max': Max, 'count': Count}
+WIDGET_TYPES = ('metric', 'breakdown', 'top')
+
+
+class WidgetError(Exception):
+    """Raised for a widget config that cannot be evaluated"""
+
+
+# source -> model, queryset scoped to an agency, metrics, group/filter fields and row label
+SOURCES = {
+    'campaigns': {
+        'model': Campaign,
+        'queryset': lambda agency_id: Campaign.objects.filter(agency_id=agency_id),
+        'metrics': {
+            'budget': 'total_budget',
+            'spent': 'analytics__total_spent',
+            'reach': 'analytics__total_reach',
+            'likes': 'analytics__total_likes',
+            'comments': 'analytics__total_comments',
+            'shares': 'analytics__total_shares',
+            'engagement_rate': 'analytics__avg_engagement_rate',
+            'roi': 'analytics__roi_percentage',
+            'performance_score': 'analytics__performance_score',
+        },
+        'fields': {'status': 'status', 'campaign_type': 'campaign_type', 'brand': 'brand_name'},
+        'label': 'name',
+    },
+    'collaborations': {
+        'model': InfluencerCollaboration,
+        'queryset': lambda agency_id: InfluencerCollaboration.objects.filter(campaign__agency_id=agency_id),
+        'metrics': {
+            'agreed_rate': 'agreed_rate',
+            'actual_reach': 'actual_reach',
+            'actual_engagement': 'actual_engagement',
+            'deliverables': 'deliverables_count',
+        },
+        'fields': {
+            'status': 'status', 'content_type': 'content_type', 'payment_status': 'payment_status',
+            'campaign': 'campaign_id',
+        },
+        'label': 'influencer__full_name',
+    },
+    'content': {
+        'model': CampaignContent,
+        'queryset': lambda agency_id: CampaignContent.objects.filter(collaboration__campaign__agency_id=agency_id),
+        'metrics': {
+            'likes': 'likes_count',
+            'comments': 'comments_count',
+            'shares': 'shares_count',
+            'views': 'views_count',
+        },
+        'fields': {'status': 'status', 'campaign': 'collaboration__campaign_id'},
+        'label': 'title',
+    },
+}
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def widget_cache_key(agency_id, widget):
+    encoded = json.dumps(widget, sort_keys=True, default=str)
+    return WIDGET_CACHE_KEY.format(agency_id, hashlib.sha256(encoded.encode('utf-8')).hexdigest())
+
+
+def _model_field(model, path):
+    """The model field at the end of an ORM path such as 'collaboration__campaign_id'"""
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def _coerce_filter_value(field, name, value):
+    """A filter value converted by its model field; WidgetError if it is not valid there"""
+    if isinstance(value, (dict, list)):
+        raise WidgetError(f"Invalid value for filter {name}: {value!r}")
+    try:
+        value = field.to_python(value)
+    except ValidationError:
+        raise WidgetError(f"Invalid value for filter {name}: {value!r}")
+    if field.choices and value not in dict(field.flatchoices):
+        raise WidgetError(f"Invalid value for filter {name}: {value!r}")
+    return value
+
+
+def parse_widget(widget):
+    """Validate a widget config and resolve it to ORM paths"""
+    if not isinstance(widget, dict):
+        raise WidgetError('Widget must be an object')
+    widget_type = widget.get('type', 'metric')
+    if widget_type not in WIDGET_TYPES:
+        raise WidgetError(f"Unknown widget type: {widget_type}")
+    source = SOURCES.get(widget.get('source'))
+    if source is None:
+        raise WidgetError(f"Unknown widget source: {widget.get('source')}")
+
+    aggregate = widget.get('aggregate', 'sum')
+    if aggregate not in AGGREGATES:
+        raise WidgetError(f"Unknown aggregate: {aggregate}")
+    metric = widget.get('metric')
+    if aggregate == 'count' and not metric:
+        metric_path = 'id'
+    elif metric in source['metrics']:
+        metric_path = source['metrics'][metric]
+    else:
+        raise WidgetError(f"Unknown metric for {widget['source']}: {metric}")
+
+    widget_filters = widget.get('filters') or {}
+    if not isinstance(widget_filters, dict):
+        raise WidgetError('filters must be an object')
+    filters = {}
+    for name, value in widget_filters.items():
+        if name not in source['fields']:
+            raise WidgetError(f"Cannot filter {widget['source']} by {name}")
+        path = source['fields'][name]
+        field = _model_field(source['model'], path)
+        if isinstance(value, list):
+            filters[f'{path}__in'] = [_coerce_filter_value(field, name, item) for item in value]
+        else:
+            filters[path] = _coerce_filter_value(field, name, value)
+
+    group_path = None
+    if widget_type == 'breakdown':
+        group_path = source['fields'].get(widget.get('groupBy'))
+        if group_path is None:
+            raise WidgetError(f"Cannot group {widget['source']} by {widget.get('groupBy')}")
+
+    try:
+        limit = min(max(int(widget.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except (TypeError, ValueError):
+        raise WidgetError('limit must be an integer')
+
+    return {
+        'type': widget_type,
+        'source': widget['source'],
+        'aggregate': aggregate,
+        'metric_path': metric_path,
+        'filters': filters,
+        'group_path': group_path,
+        'limit': limit,
+        'label_path': source['label'],
+    }
+
+
+def _batch_key(parsed):
+    """Widgets with the same batch key are answered by one query"""
+    filters = json.dumps(parsed['filters'], sort_keys=True, default=str)
+    if parsed['type'] == 'metric':
+        return ('metric', parsed['source'], filters)
+    if parsed['type'] == 'breakdown':
+        return ('breakdown', parsed['source'], filters, parsed['group_path'])
+    return None
+
+
+def _aggregate_expression(parsed):
+    if parsed['aggregate'] == 'count':
+        return Count(parsed['metric_path'], distinct=True)
+    return AGGREGATES[parsed['aggregate']](parsed['metric_path'])
+
+
+def _evaluate_metrics(agency_id, batch):
+    first = batch[0][1]
+    queryset = SOURCES[first['source']]['queryset'](agency_id).filter(**first['filters'])
+    values = queryset.aggregate(**{
+        f'w{index}': _aggregate_expression(parsed) for index, (_, parsed) in enumerate(batch)
+    })
+    return {
+        widget_id: {'value': _json_value(values[f'w{index}'])}
+        for index, (widget_id, parsed) in enumerate(batch)
+    }
+
+
+def _evaluate_breakdowns(agency_id, batch):
+    first = batch[0][1]
+    group_path = first['group_path']
+    rows = list(
+        SOURCES[first['source']]['queryset'](agency_id).filter(**first['filters'])
+        .order_by().values(group_path)
+        .annotate(**{f'w{index}': _aggregate_expression(parsed) for index, (_, parsed) in enumerate(batch)})
+    )
+
+    results = {}
+    for index, (widget_id, parsed) in enumerate(batch):
+        series = sorted(
+            ({'key': row[group_path], 'value': _json_value(row[f'w{index}'])} for row in rows),
+            key=lambda item: item['value'] if item['value'] is not None else float('-inf'),
+            reverse=True,
+        )
+        results[widget_id] = {'series': series[:parsed['limit']]}
+    return results
+
+
+def _evaluate_top(agency_id, parsed):
+    rows = (
+        SOURCES[parsed['source']]['queryset'](agency_id).filter(**parsed['filters'])
+        .filter(**{f"{parsed['metric_path']}__isnull": False})
+        .annotate(widget_value=F(parsed['metric_path']))
+        .order_by('-widget_value', 'pk')
+        .values('pk', parsed['label_path'], 'widget_value')[:parsed['limit']]
+    )
+    return {'rows': [
+        {'id': row['pk'], 'label': row[parsed['label_path']], 'value': _json_value(row['widget_value'])}
+        for row in rows
+    ]}
+
+
+def evaluate_widgets(agency_id, widgets):
+    """
+    Evaluate widget configs with batched queries.
+    Returns {widget id: result}; invalid widgets get {'error': ...}.
+    """
+    results = {}
+    batches = {}
+    singles = []
+    for widget_id, widget in widgets:
+        try:
+            parsed = parse_widget(widget)
+        except WidgetError as e:
+            results[widget_id] = {'error': str(e)}
+            continue
+        batch_key = _batch_key(parsed)
+        if batch_key is None:
+            singles.append((widget_id, parsed))
+        else:
+            batches.setdefault(batch_key, []).append((widget_id, parsed))
+
+    for batch_key, batch in batches.items():
+        if batch_key[0] == 'metric':
+            results.update(_evaluate_metrics(agency_id, batch))
+        else:
+            results.update(_evaluate_breakdowns(agency_id, batch))
+    for widget_id, parsed in singles:
+        results[widget_id] = _evaluate_top(agency_id, parsed)
+    return results
+
+
+def widget_ids(widgets):
+    """[(widget id, widget)]; a widget without an id is identified by its position"""
+    return [
+        (str(widget.get('id', index)) if isinstance(widget, dict) else str(index), widget)
+        for index, widget in enumerate(widgets or [])
+    ]
+
+
+def duplicate_widget_ids(widgets):
+    """Sorted widget ids used by more than one widget"""
+    seen = set()
+    duplicates = set()
+    for widget_id, _ in widget_ids(widgets):
+        if widget_id in seen:
+            duplicates.add(widget_id)
+        seen.add(widget_id)
+    return sorted(duplicates)
+
+
+def evaluate_dashboard(dashboard):
+    """
+    Results for every widget on a dashboard, served from the per-widget
+    cache where fresh. Returns [{'id', 'type', 'data', 'cached'}].
+    Raises WidgetError when widget ids are not unique.
+    """
+    duplicates = duplicate_widget_ids(dashboard.widgets)
+    if duplicates:
+        raise WidgetError(f"Duplicate widget ids: {', '.join(duplicates)}")
+    widgets = widget_ids(dashboard.widgets)
+    ttl = max(dashboard.auto_refresh_interval or 0, MIN_WIDGET_TTL)
+    keys = {widget_id: widget_cache_key(dashboard.agency_id, widget) for widget_id, widget in widgets}
+
+    cached = cache.get_many(list(keys.values()))
+    missing = [(widget_id, widget) for widget_id, widget in widgets if keys[widget_id] not in cached]
+
+    fresh = evaluate_widgets(dashboard.agency_id, missing) if missing else {}
+    if fresh:
+        cache.set_many({
+            keys[widget_id]: result for widget_id, result in fresh.items() if 'error' not in result
+        }, ttl)
+
+    return [
+        {
+            'id': widget_id,
+            'type': widget.get('type', 'metric') if isinstance(widget, dict) else None,
+            'data': fresh[widget_id] if widget_id in fresh else cached.get(keys[widget_id]),
+            'cached': widget_id not in fresh,
+        }
+        for widget_id, widget in widgets
+    ]